@@ -0,0 +1,90 @@
+"""Benchmark convert_notes_html() against markdownify on a corpus of note bodies
+
+By default the corpus is the body of every note in Notes.app; alternatively pass one or
+more directories of .html files (for example created with `notes export --format html`).
+
+Usage:
+    python benchmarks/bench_html_to_markdown.py [--repeat N] [DIRECTORY ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import statistics
+import time
+from typing import Callable
+
+from markdownify import markdownify
+
+from macnotesapp import NotesApp
+from macnotesapp.convert import convert_notes_html, html_to_markdown, is_notes_html
+
+
+def load_corpus(directories: list[str]) -> list[str]:
+    """Return list of note bodies from HTML files in directories or from Notes.app if no directories"""
+    if not directories:
+        return [str(body) for body in NotesApp().noteslist().body]
+    return [
+        path.read_text(encoding="utf-8")
+        for directory in directories
+        for path in sorted(pathlib.Path(directory).rglob("*.html"))
+    ]
+
+
+def time_converter(
+    converter: Callable[[str], str], bodies: list[str], repeat: int
+) -> float:
+    """Return best time in seconds of repeat runs of converter over all bodies"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            converter(body)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directories", nargs="*", metavar="DIRECTORY")
+    parser.add_argument("--repeat", "-r", type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = load_corpus(args.directories)
+    if not bodies:
+        raise SystemExit("No note bodies found")
+
+    supported = [body for body in bodies if is_notes_html(body)]
+
+    sizes = [len(body) for body in bodies]
+    print(
+        f"{len(bodies)} bodies, {sum(sizes) / 1024:.0f} KiB total, "
+        f"median {statistics.median(sizes):.0f} chars, max {max(sizes)} chars"
+    )
+    print(
+        f"{len(supported)} ({len(supported) / len(bodies):.0%}) use only the Notes.app HTML subset"
+    )
+
+    results = [
+        ("markdownify (all bodies)", markdownify, bodies),
+        ("html_to_markdown (all bodies)", html_to_markdown, bodies),
+        ("markdownify (subset bodies)", markdownify, supported),
+        ("convert_notes_html (subset bodies)", convert_notes_html, supported),
+    ]
+    baseline = {}
+    for label, converter, corpus in results:
+        if not corpus:
+            continue
+        elapsed = time_converter(converter, corpus, args.repeat)
+        scope = label.split("(")[1]
+        speedup = f", {baseline[scope] / elapsed:.1f}x" if scope in baseline else ""
+        baseline.setdefault(scope, elapsed)
+        print(
+            f"{label:<36} {elapsed * 1000:9.1f} ms "
+            f"{len(corpus) / elapsed:9.0f} notes/s{speedup}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Determine which strategy works for accessing note properties on this version of macOS and Notes.app
+
+Depending on the version of macOS and Notes.app, some properties can't be read via
+ScriptingBridge (and must be read with AppleScript) and some bulk selectors on lists
+of notes return nothing (and each note must be read individually). Rather than trying
+the fast path and falling back on every call, the strategy that works for each property
+is worked out once and saved in the cache directory keyed by macOS and Notes.app version.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import threading
+from typing import Any, Callable
+
+import ScriptingBridge
+
+from .logging import logger
+from .utils import get_cache_dir, get_macos_version, write_file_atomic
+
+STRATEGY_SCRIPTINGBRIDGE = "scriptingbridge"
+STRATEGY_APPLESCRIPT = "applescript"
+STRATEGY_BULK = "bulk"
+STRATEGY_PER_NOTE = "per_note"
+
+CAPABILITIES_FILENAME = "capabilities.json"
+
+
+class Capabilities:
+    """Records which access strategy works for each property
+
+    Strategies are probed the first time a property is accessed: each strategy is
+    tried in order and the first one that succeeds is saved so that later calls go
+    straight to it. A strategy fails if it raises an exception or returns None; an
+    empty value such as "" is a success.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None, key: str | None = None):
+        """Create Capabilities object
+
+        Args:
+            path: path to file to save capabilities in; default is capabilities.json in cache directory
+            key: key to save capabilities under; default is based on macOS and Notes.app version
+        """
+        self.path = (
+            pathlib.Path(path) if path else get_cache_dir() / CAPABILITIES_FILENAME
+        )
+        self._key = key
+        self._strategies: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        """Key capabilities are saved under; identifies version of macOS and Notes.app"""
+        if self._key is None:
+            notes_version = (
+                ScriptingBridge.SBApplication.applicationWithBundleIdentifier_(
+                    "com.apple.Notes"
+                ).version()
+            )
+            self._key = f"macOS {'.'.join(get_macos_version())}, Notes {notes_version}"
+        return self._key
+
+    @property
+    def strategies(self) -> dict[str, str]:
+        """Return dict of property name to strategy for properties that have been probed"""
+        with self._lock:
+            if self._strategies is None:
+                self._strategies = self._load().get(self.key, {})
+            return dict(self._strategies)
+
+    def get(self, prop: str) -> str | None:
+        """Return strategy for property prop or None if not yet known"""
+        return self.strategies.get(prop)
+
+    def set(self, prop: str, strategy: str):
+        """Set strategy for property prop and save to disk"""
+        if self.get(prop) == strategy:
+            return
+        logger.debug(f"Using {strategy} strategy for {prop} ({self.key})")
+        with self._lock:
+            self._strategies[prop] = strategy
+            data = self._load()
+            data[self.key] = self._strategies
+            self._save(data)
+
+    def reset(self):
+        """Forget all strategies for this version of macOS and Notes.app"""
+        with self._lock:
+            self._strategies = {}
+            data = self._load()
+            data.pop(self.key, None)
+            self._save(data)
+
+    def call(
+        self,
+        prop: str,
+        strategies: dict[str, Callable[[], Any]],
+        default: str | None = None,
+    ) -> Any:
+        """Return value of property prop using the strategy known to work
+
+        If the strategy for prop is not yet known, or the known strategy fails, each
+        strategy is tried in order and the first one that succeeds is saved for future
+        calls. A strategy fails if it raises an exception or returns None.
+
+        Args:
+            prop: name of property, e.g. "note.body"
+            strategies: dict of strategy name to callable returning the value of prop
+                or None if the strategy doesn't work
+            default: strategy to save and use without probing if prop has not been probed;
+                for properties where failure can't be detected; its result is always returned
+
+        Returns:
+            value of property or None if every strategy returned None
+
+        Raises:
+            Exception: if every strategy failed, the last exception raised by a strategy, if any
+        """
+        strategy = self.get(prop)
+        if strategy not in strategies and default:
+            self.set(prop, default)
+            strategy = default
+        if strategy not in strategies:
+            return self._probe(prop, strategies)
+        if default == strategy:
+            return strategies[strategy]()
+        try:
+            if (value := strategies[strategy]()) is not None:
+                return value
+            error = None
+        except Exception as e:
+            logger.debug(f"{strategy} strategy failed for {prop}: {e}")
+            error = e
+        # the known strategy failed; probe the others and save the one that works
+        return self._probe(prop, strategies, failed=strategy, error=error)
+
+    def _probe(
+        self,
+        prop: str,
+        strategies: dict[str, Callable[[], Any]],
+        failed: str | None = None,
+        error: Exception | None = None,
+    ) -> Any:
+        """Try each strategy except failed in order and save the first that succeeds; see call()
+
+        Args:
+            prop: name of property
+            strategies: dict of strategy name to callable
+            failed: strategy that has already failed for this call
+            error: exception raised by failed, if any
+        """
+        for strategy, func in strategies.items():
+            if strategy == failed:
+                continue
+            try:
+                value = func()
+            except Exception as e:
+                logger.debug(f"{strategy} strategy failed for {prop}: {e}")
+                error = e
+                continue
+            if value is not None:
+                self.set(prop, strategy)
+                return value
+        if error is not None:
+            raise error
+        return None
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        """Load all saved capabilities"""
+        if not self.path.is_file():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable capabilities file {self.path}: {e}")
+            return {}
+
+    def _save(self, data: dict[str, dict[str, str]]):
+        """Save all capabilities"""
+        try:
+            write_file_atomic(self.path, json.dumps(data, indent=2))
+        except OSError as e:
+            logger.warning(f"Could not save capabilities file {self.path}: {e}")
+
+
+_capabilities: Capabilities | None = None
+
+
+def get_capabilities() -> Capabilities:
+    """Return the shared Capabilities object"""
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = Capabilities()
+    return _capabilities
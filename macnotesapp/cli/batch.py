@@ -0,0 +1,401 @@
+"""Run many note operations read as NDJSON commands in a single process; used by `notes batch`"""
+
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Generator, Iterable, TypeVar
+
+from macnotesapp import Account, Note, NotesApp
+from macnotesapp.convert import markdown_to_html, plaintext_to_html
+from macnotesapp.notesapp import MakeNotesError
+
+from .cli_config import FORMAT_HTML, FORMAT_MARKDOWN, FORMAT_PLAINTEXT
+
+OP_ADD = "add"
+OP_EDIT = "edit"
+OP_MOVE = "move"
+OP_RENAME = "rename"
+OP_DELETE = "delete"
+OP_MKDIR = "mkdir"
+BATCH_OPERATIONS = [OP_ADD, OP_EDIT, OP_MOVE, OP_RENAME, OP_DELETE, OP_MKDIR]
+
+# max number of consecutive compatible commands run together; bounds latency of results
+BATCH_GROUP_SIZE = 100
+
+T = TypeVar("T")
+
+
+class BatchCommandError(Exception):
+    """Error running a single batch command; reported in the command's result"""
+
+
+@dataclass
+class BatchCommand:
+    """A command read from a line of input
+
+    Attributes:
+        line: line number of command in input, starting at 1
+        data: command as decoded from JSON
+        error: error message if the line could not be parsed
+    """
+
+    line: int
+    data: dict[str, Any]
+    error: str | None = None
+
+    @property
+    def op(self) -> str | None:
+        return self.data.get("op")
+
+    @property
+    def account(self) -> str | None:
+        return self.data.get("account")
+
+
+class BatchRunner:
+    """Run NDJSON batch commands against a single NotesApp
+
+    Consecutive commands that can be combined are run together: adds to the same
+    account are created with Account.make_notes() and the notes named by moves to
+    the same folder and by deletes are found with one bulk read of note ids and
+    names per account then moved or deleted with a single AppleScript call per account.
+    """
+
+    def __init__(self, notes_app: NotesApp, stop_on_error: bool = False):
+        """Create BatchRunner
+
+        Args:
+            notes_app: NotesApp to run commands with
+            stop_on_error: if True, stop after the first group of commands with an error
+        """
+        self.notes_app = notes_app
+        self.stop_on_error = stop_on_error
+        self.succeeded = 0
+        self.failed = 0
+        self._accounts: dict[str | None, Account] = {}
+        self._group_handlers: dict[
+            str, Callable[[list[BatchCommand]], list[dict[str, Any]]]
+        ] = {
+            OP_ADD: self._add,
+            OP_MOVE: self._move,
+            OP_DELETE: self._delete,
+        }
+        self._handlers: dict[str, Callable[[BatchCommand], dict[str, Any]]] = {
+            OP_EDIT: self._edit,
+            OP_RENAME: self._rename,
+            OP_MKDIR: self._mkdir,
+        }
+
+    def run(self, lines: Iterable[str]) -> Generator[dict[str, Any], None, None]:
+        """Run commands and yield a result for each, in the order the commands were read
+
+        Args:
+            lines: lines of NDJSON, one command per line; blank lines are ignored
+
+        Yields:
+            dict with "line", "op", "ok" and either the result of the command or "error"
+        """
+        commands = read_commands(lines)
+        for _, group in itertools.groupby(commands, key=_group_key):
+            while chunk := list(itertools.islice(group, BATCH_GROUP_SIZE)):
+                results = self._run_group(chunk)
+                for result in results:
+                    if result["ok"]:
+                        self.succeeded += 1
+                    else:
+                        self.failed += 1
+                    yield result
+                if self.stop_on_error and self.failed:
+                    return
+
+    def _run_group(self, commands: list[BatchCommand]) -> list[dict[str, Any]]:
+        """Run a group of compatible commands and return their results"""
+        command = commands[0]
+        if command.error:
+            return [_error(command, command.error)]
+        if handler := self._group_handlers.get(command.op):
+            try:
+                return handler(commands)
+            except Exception as e:
+                return [_error(command, e) for command in commands]
+        if handler := self._handlers.get(command.op):
+            try:
+                return [_result(command, **handler(command))]
+            except Exception as e:
+                return [_error(command, e)]
+        return [
+            _error(
+                command,
+                f"Unknown op {command.op!r}; must be one of {', '.join(BATCH_OPERATIONS)}",
+            )
+        ]
+
+    def _add(self, commands: list[BatchCommand]) -> list[dict[str, Any]]:
+        """Create new notes in one account"""
+        results: list[dict[str, Any] | None] = []
+        new_notes = []
+        for command in commands:
+            try:
+                name = _required(command, "name")
+                new_notes.append(
+                    (name, _body_html(command), command.data.get("folder"))
+                )
+                results.append(None)
+            except BatchCommandError as e:
+                results.append(_error(command, e))
+        error = None
+        try:
+            notes = self._account(commands[0].account).make_notes(new_notes)
+        except MakeNotesError as e:
+            # report the notes created before the error so they aren't added again
+            notes, error = e.notes, e
+        created = iter(notes)
+        return [
+            result
+            or (
+                _result(command, **_note_data(note))
+                if (note := next(created, None))
+                else _error(command, error)
+            )
+            for command, result in zip(commands, results)
+        ]
+
+    def _move(self, commands: list[BatchCommand]) -> list[dict[str, Any]]:
+        """Move notes to one folder"""
+        folder = commands[0].data.get("folder")
+        if not folder:
+            return [_error(command, "Missing 'folder'") for command in commands]
+        return self._apply_to_notes(
+            commands,
+            lambda account, note_ids: account.move_notes(note_ids, folder),
+            folder=folder,
+        )
+
+    def _delete(self, commands: list[BatchCommand]) -> list[dict[str, Any]]:
+        """Delete notes"""
+        return self._apply_to_notes(
+            commands, lambda account, note_ids: account.delete_notes(note_ids)
+        )
+
+    def _apply_to_notes(
+        self,
+        commands: list[BatchCommand],
+        func: Callable[[Account, list[str]], list[str | None]],
+        **fields,
+    ) -> list[dict[str, Any]]:
+        """Find the note for each command then call func once per account with the ids of the notes in that account"""
+        results: dict[int, dict[str, Any]] = {}
+        by_account: dict[str, list[tuple[int, BatchCommand, dict[str, Any]]]] = {}
+        for index, (command, data) in enumerate(
+            zip(commands, self._find_notes(commands))
+        ):
+            if isinstance(data, BatchCommandError):
+                results[index] = _error(command, data)
+            else:
+                by_account.setdefault(data["account"], []).append(
+                    (index, command, data)
+                )
+        for account_name, items in by_account.items():
+            errors = func(
+                self._account(account_name), [data["id"] for _, _, data in items]
+            )
+            for (index, command, data), error in zip(items, errors):
+                results[index] = (
+                    _error(command, error)
+                    if error
+                    else _result(command, **data, **fields)
+                )
+        return [results[index] for index in range(len(commands))]
+
+    def _edit(self, command: BatchCommand) -> dict[str, Any]:
+        """Update body and/or name of a note"""
+        note = self._find_note(command)
+        new_name = command.data.get("new_name")
+        if "body" not in command.data and not new_name:
+            raise BatchCommandError("Missing 'body' or 'new_name'")
+        body = _body_html(command) if "body" in command.data else None
+        if_unmodified_since = command.data.get("if_unmodified_since")
+        if if_unmodified_since:
+            try:
+                if_unmodified_since = datetime.datetime.fromisoformat(
+                    if_unmodified_since
+                )
+            except ValueError as e:
+                raise BatchCommandError(
+                    f"Invalid 'if_unmodified_since': {if_unmodified_since}"
+                ) from e
+        result = note.update(
+            body=body, name=new_name, if_unmodified_since=if_unmodified_since or None
+        )
+        if result.conflict:
+            raise BatchCommandError(
+                f"Note was modified at {result.modification_date.isoformat()}; not updated"
+            )
+        return _note_data(note)
+
+    def _rename(self, command: BatchCommand) -> dict[str, Any]:
+        """Rename a note"""
+        note = self._find_note(command)
+        note.name = _required(command, "new_name")
+        return _note_data(note)
+
+    def _mkdir(self, command: BatchCommand) -> dict[str, Any]:
+        """Create a folder"""
+        account = self._account(command.account)
+        folder = account.make_folder(_required(command, "folder"))
+        return {"account": account.name, "folder": folder.name}
+
+    def _account(self, name: str | None) -> Account:
+        """Return Account for name or default account if name is None; Accounts are looked up once"""
+        if name not in self._accounts:
+            try:
+                self._accounts[name] = self.notes_app.account(name)
+            except ValueError as e:
+                raise BatchCommandError(str(e)) from e
+        return self._accounts[name]
+
+    def _find_note(self, command: BatchCommand) -> Note:
+        """Return note identified by command's "id" or "note" (name)
+
+        A name must match exactly one note, ignoring case; Notes.app matches names by
+        substring so the notes it returns are filtered by their full name.
+        """
+        accounts = [command.account] if command.account else None
+        if note_id := command.data.get("id"):
+            notes = self.notes_app.notes(id=[note_id], accounts=accounts)
+        elif name := command.data.get("note"):
+            notes = [
+                note
+                for note in self.notes_app.notes(name=[name], accounts=accounts)
+                if note.name.casefold() == name.casefold()
+            ]
+        else:
+            raise BatchCommandError("Missing 'id' or 'note'")
+        return _only_note(notes, note_id or name)
+
+    def _find_notes(
+        self, commands: list[BatchCommand]
+    ) -> list[dict[str, Any] | BatchCommandError]:
+        """Return account, id and name of the note identified by each command's "id" or "note" (name)
+        or the error if the note can't be found; commands must all have the same account
+
+        The id and name of every note in the account, or in every account if commands
+        have no account, are read with one bulk request each per account rather than
+        looking up each note separately. As for _find_note(), a name must match exactly
+        one note, ignoring case.
+        """
+        account_names = (
+            [commands[0].account] if commands[0].account else self.notes_app.accounts
+        )
+        by_id: dict[str, dict[str, Any]] = {}
+        by_name: dict[str, list[dict[str, Any]]] = {}
+        for account_name in account_names:
+            noteslist = self._account(account_name).noteslist()
+            for note_id, name in zip(noteslist.id, noteslist.name):
+                data = {"account": account_name, "id": note_id, "name": name}
+                by_id[note_id] = data
+                by_name.setdefault(name.casefold(), []).append(data)
+
+        found: list[dict[str, Any] | BatchCommandError] = []
+        for command in commands:
+            try:
+                if note_id := command.data.get("id"):
+                    notes = [by_id[note_id]] if note_id in by_id else []
+                elif name := command.data.get("note"):
+                    notes = by_name.get(name.casefold(), [])
+                else:
+                    raise BatchCommandError("Missing 'id' or 'note'")
+                found.append(_only_note(notes, note_id or name))
+            except BatchCommandError as e:
+                found.append(e)
+        return found
+
+
+def read_commands(lines: Iterable[str]) -> Generator[BatchCommand, None, None]:
+    """Yield a BatchCommand for each non-blank line of NDJSON in lines"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield BatchCommand(line_number, {}, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield BatchCommand(line_number, {}, "Command must be a JSON object")
+            continue
+        yield BatchCommand(line_number, data)
+
+
+def _group_key(command: BatchCommand) -> tuple:
+    """Return key that is equal for consecutive commands that can be run together"""
+    if command.error:
+        return ("error", command.line)
+    if command.op == OP_ADD:
+        return (OP_ADD, command.account)
+    if command.op == OP_MOVE:
+        return (OP_MOVE, command.account, command.data.get("folder"))
+    if command.op == OP_DELETE:
+        return (OP_DELETE, command.account)
+    return (command.op, command.line)
+
+
+def _required(command: BatchCommand, key: str) -> Any:
+    """Return value of key in command or raise BatchCommandError if missing"""
+    if not (value := command.data.get(key)):
+        raise BatchCommandError(f"Missing '{key}'")
+    return value
+
+
+def _body_html(command: BatchCommand) -> str:
+    """Return body of command converted to HTML according to its "format" (default plaintext)"""
+    body = command.data.get("body") or ""
+    format_ = str(command.data.get("format", FORMAT_PLAINTEXT)).lower()
+    if format_ == FORMAT_MARKDOWN.lower():
+        return markdown_to_html(body)
+    if format_ == FORMAT_HTML.lower():
+        return body
+    if format_ == FORMAT_PLAINTEXT.lower():
+        return plaintext_to_html(body)
+    raise BatchCommandError(f"Invalid format {format_!r}")
+
+
+def _only_note(notes: list[T], ref: str) -> T:
+    """Return the only note in notes found for ref, an id or name, or raise BatchCommandError"""
+    if not notes:
+        raise BatchCommandError(f"Note '{ref}' not found")
+    if len(notes) > 1:
+        raise BatchCommandError(
+            f"{len(notes)} notes are named '{ref}'; use 'id' to choose one"
+        )
+    return notes[0]
+
+
+def _note_data(note: Note) -> dict[str, Any]:
+    """Return fields identifying note for a result"""
+    return {"account": note.account, "id": note.id, "name": note.name}
+
+
+def _result(command: BatchCommand, **fields) -> dict[str, Any]:
+    """Return result for a command that succeeded"""
+    return _with_ref(
+        command, {"line": command.line, "op": command.op, "ok": True, **fields}
+    )
+
+
+def _error(command: BatchCommand, error: Exception | str) -> dict[str, Any]:
+    """Return result for a command that failed"""
+    return _with_ref(
+        command,
+        {"line": command.line, "op": command.op, "ok": False, "error": str(error)},
+    )
+
+
+def _with_ref(command: BatchCommand, result: dict[str, Any]) -> dict[str, Any]:
+    """Add command's "ref" to result if it has one so callers can match results to commands"""
+    if "ref" in command.data:
+        result["ref"] = command.data["ref"]
+    return result
@@ -1,23 +1,38 @@
 """Entry point for macnotesapp CLI"""
 
+import datetime
 import json
 import os
 import pathlib
+import re
 import sys
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional
 
 import click
-import markdown2
 import questionary
 from applescript import ScriptError
-from markdownify import markdownify as html2md
 from rich.console import Console
 from rich.markdown import Markdown
+from rich.progress import Progress, SpinnerColumn, TextColumn
 
 import macnotesapp
-from macnotesapp import __version__
-from macnotesapp import NotesList
+from macnotesapp import NotesList, __version__
+from macnotesapp.conversion_cache import get_conversion_cache
+from macnotesapp.convert import markdown_to_html, plaintext_to_html
+from macnotesapp.dupes import DUPLICATE_THRESHOLD
+from macnotesapp.export import (
+    ATTACHMENTS_DIRECTORY,
+    EXPORT_FORMAT_MARKDOWN,
+    EXPORT_FORMATS,
+    export_attachments,
+    export_notes,
+)
+from macnotesapp.history import HistoryStore
+from macnotesapp.importer import find_import_files, import_notes, read_note_files
+from macnotesapp.notesapp import MakeNotesError
 
+from .batch import BatchRunner
+from .cli_completion import complete_folder_name, complete_note_name
 from .cli_config import (
     CONFIG_FILE,
     DEFAULT_EDITOR,
@@ -26,23 +41,22 @@ from .cli_config import (
     FORMAT_MARKDOWN,
     FORMAT_OPTIONS,
     FORMAT_PLAINTEXT,
-    ConfigSettings,
 )
 from .cli_help import RichHelpCommand, help
 from .cli_param_types import URLType
+from .cli_resolve import find_note, find_notes
+from .cli_session import CLISession
 from .readable import get_readable_html
 
-# extra features to support for Markdown to HTML conversion with markdown2
-MARKDOWN_EXTRAS = ["fenced-code-blocks", "footnotes", "tables"]
-
 
 @click.command(name="accounts")
 @click.option(
     "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
 )
-def accounts(json_):
+@click.pass_obj
+def accounts(obj, json_):
     """Print information about Notes accounts."""
-    account_data = get_account_data()
+    account_data = get_account_data(obj.session)
     if json_:
         print(json.dumps(account_data))
     else:
@@ -84,8 +98,19 @@ def accounts(json_):
     help="Add note to folder FOLDER.",
 )
 @click.argument("note", metavar="NOTE", required=False, default="")
+@click.pass_obj
 def add_note(
-    show, file, url, html, markdown, plaintext, edit, account_name, folder_name, note
+    obj,
+    show,
+    file,
+    url,
+    html,
+    markdown,
+    plaintext,
+    edit,
+    account_name,
+    folder_name,
+    note,
 ):
     """Add new note.
 
@@ -138,7 +163,7 @@ def add_note(
         click.echo("Only one of --file, --url can be specified.", err=True)
         raise click.Abort()
 
-    config = ConfigSettings()
+    config = obj.session.config
     format_ = config.format
     if html:
         format_ = FORMAT_HTML
@@ -184,15 +209,12 @@ def add_note(
     name, body = note_parts[0], note_parts[2]
 
     if format_ == FORMAT_MARKDOWN:
-        # convert Markdown to HTML
-        body = markdown2.markdown(body, extras=MARKDOWN_EXTRAS)
+        body = markdown_to_html(body)
     elif format_ != FORMAT_HTML:
-        # convert plain text to HTML
-        body = "".join(f"<div>{line or '<br>'}</div>\n" for line in body.split("\n"))
+        body = plaintext_to_html(body)
 
-    notes = macnotesapp.NotesApp()
     try:
-        account = notes.account(account_name)
+        account = obj.session.account(account_name)
         new_note = account.make_note(name, body, folder_name)
         if show:
             new_note.show()
@@ -201,6 +223,136 @@ def add_note(
         raise click.Abort() from e
 
 
+@click.command(name="batch")
+@click.option(
+    "--stop-on-error",
+    "-x",
+    is_flag=True,
+    help="Stop after the first command that fails.",
+)
+@click.argument(
+    "input_file", metavar="[FILE]", type=click.File("r"), default="-", required=False
+)
+@click.pass_obj
+def batch(obj, stop_on_error, input_file):
+    """Run many commands read as NDJSON from FILE or STDIN in a single process.
+
+    Each line of input is a JSON object with an "op" of add, edit, move, rename, delete, or mkdir.
+    Existing notes are identified by "id" or by name with "note"; "account" is optional.
+
+    \b
+    {"op": "add", "name": "Title", "body": "text", "format": "markdown", "folder": "Notes"}
+    {"op": "edit", "note": "Title", "body": "<div>new</div>", "format": "html"}
+    {"op": "move", "id": "x-coredata://...", "folder": "Archive"}
+    {"op": "rename", "note": "Title", "new_name": "New Title"}
+    {"op": "delete", "note": "New Title"}
+    {"op": "mkdir", "folder": "Archive", "account": "iCloud"}
+
+    "format" is plaintext (default), markdown, or html; edit also accepts "new_name" and
+    "if_unmodified_since". One line of NDJSON is written to STDOUT for each command with
+    "line", "op", "ok" and either "id"/"name" of the note or "error"; a "ref" value in a
+    command is copied to its result. Consecutive adds, moves to the same folder, and
+    deletes are run together. Exits with status 1 if any command failed.
+    """
+    runner = BatchRunner(obj.session.notesapp, stop_on_error=stop_on_error)
+    for result in runner.run(input_file):
+        print_ndjson(result)
+    if runner.failed:
+        sys.exit(1)
+
+
+@click.command(name="import")
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Import notes into account ACCOUNT.",
+)
+@click.option(
+    "--folder",
+    "-f",
+    "folder_name",
+    metavar="FOLDER",
+    type=str,
+    help="Import notes into folder FOLDER.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    metavar="N",
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to convert files (default: number of CPUs).",
+)
+@click.option(
+    "--dry-run",
+    "-n",
+    is_flag=True,
+    help="Convert files and show the notes that would be created without creating them.",
+)
+@click.argument(
+    "paths",
+    metavar="PATH",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, path_type=pathlib.Path),
+)
+@click.pass_obj
+def import_(obj, account_name, folder_name, workers, dry_run, paths):
+    """Import notes from Markdown, HTML, or plain text files.
+
+    Each PATH may be a file or a directory; directories are searched recursively
+    for files ending in .md, .markdown, .html, .htm, or .txt.
+
+    For Markdown and plain text files, the first line of the file is used as the
+    name of the note and the rest of the file as the body.
+    For HTML files, the file name is used as the name of the note.
+
+    Account and top level folder may be specified with [i]--account/-a[/] and [i]--folder/-f[/], respectively.
+    If not provided, default account and folder are used.
+    """
+    try:
+        files = find_import_files(paths)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort() from e
+    if not files:
+        click.echo("No files to import.", err=True)
+        raise click.Abort()
+
+    if dry_run:
+        for path, (name, _) in zip(files, read_note_files(files, max_workers=workers)):
+            click.echo(f"{path} -> '{name}'")
+        click.echo(f"Would import {len(files)} notes")
+        return
+
+    config = obj.session.config
+    account_name = account_name or config.account
+    folder_name = folder_name or config.folder
+    try:
+        account = obj.session.account(account_name)
+        with Progress() as progress:
+            task = progress.add_task("Importing notes", total=len(files))
+            new_notes = import_notes(
+                account,
+                files,
+                folder=folder_name,
+                max_workers=workers,
+                progress=lambda count: progress.advance(task, count),
+            )
+    except MakeNotesError as e:
+        click.echo(
+            f"Error importing notes: {e}; imported {len(e.notes)} notes before the error",
+            err=True,
+        )
+        raise click.Abort() from e
+    except (ScriptError, ValueError) as e:
+        click.echo(f"Error importing notes: {e}", err=True)
+        raise click.Abort() from e
+    click.echo(f"Imported {len(new_notes)} notes into {account_name}/{folder_name}")
+
+
 @click.command(name="list")
 @click.option(
     "--account",
@@ -220,15 +372,519 @@ def add_note(
 #     type=str,
 #     help="Limit results to folder FOLDER; may be repeated to include multiple folders.",
 # )
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    help="Output one JSON object per note (newline-delimited JSON).",
+)
 @click.argument("text", metavar="TEXT", required=False)
-def list_notes(account_name, text):
+@click.pass_obj
+def list_notes(obj, account_name, ndjson, text):
     """List notes, optionally filtering by account or text."""
-    notesapp = macnotesapp.NotesApp()
-    print_notes_list(
-        notesapp.noteslist(
-            accounts=[account_name] if account_name else None,
-            text=[text] if text else None,
+    noteslist = obj.session.notesapp.noteslist(
+        accounts=[account_name] if account_name else None,
+        text=[text] if text else None,
+    )
+    if ndjson:
+        print_notes_list_as_ndjson(noteslist)
+    else:
+        print_notes_list(noteslist)
+
+
+@click.command(name="grep")
+@click.option(
+    "--ignore-case", "-i", is_flag=True, help="Match case-insensitively."
+)
+@click.option(
+    "--context",
+    "-C",
+    metavar="NUM",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Print NUM lines of context before and after each matching line.",
+)
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    multiple=True,
+    type=str,
+    help="Search only account ACCOUNT; may be repeated to include multiple accounts.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    metavar="N",
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to search (default: number of CPUs).",
+)
+@click.argument("pattern", metavar="PATTERN")
+@click.pass_obj
+def grep(obj, ignore_case, context, account_name, workers, pattern):
+    """Search the text of notes for regular expression PATTERN.
+
+    Prints the name and id of each note with a matching line followed by the
+    matching lines, prefixed with their line number and ':' (context lines use '-').
+    Exits with status 1 if no note matches.
+    """
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        click.echo(f"Error: invalid pattern '{pattern}': {e}", err=True)
+        sys.exit(2)
+
+    noteslist = obj.session.notesapp.noteslist(accounts=list(account_name) or None)
+    found = False
+    for result in noteslist.grep(
+        pattern, ignore_case=ignore_case, max_workers=workers
+    ):
+        if found:
+            click.echo()
+        found = True
+        click.echo(f"{result.name} ({result.id})")
+        for block_number, (start, end) in enumerate(result.blocks(context)):
+            if block_number:
+                click.echo("--")
+            for index in range(start, end):
+                separator = ":" if index in result.matches else "-"
+                click.echo(f"{index + 1}{separator}{result.lines[index]}")
+        sys.stdout.flush()
+    if not found:
+        sys.exit(1)
+
+
+@click.command(name="tags")
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Limit results to account ACCOUNT.",
+)
+@click.option(
+    "--all",
+    "match_all",
+    is_flag=True,
+    help="List only notes that have all of TAGS (default is notes with any of TAGS).",
+)
+@click.option(
+    "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
+)
+@click.argument("tags", metavar="[TAG ...]", nargs=-1)
+@click.pass_obj
+def tags(obj, account_name, match_all, json_, tags):
+    """List #hashtags and @mentions used in notes or notes with TAGS.
+
+    Without TAGS, prints each tag and the number of notes with the tag.
+    With TAGS, lists notes with any of TAGS (or all of TAGS with --all).
+    A TAG without a leading # or @ is treated as a #hashtag; tags are case-insensitive.
+
+    Tags are read from an index that is updated with only the notes that changed since it was last used.
+    """
+    notesapp = obj.session.notesapp
+    if not tags:
+        tag_counts = notesapp.tags(account=account_name)
+        if json_:
+            print(json.dumps(tag_counts))
+        else:
+            for tag, count in tag_counts.items():
+                print(f"{tag}  {count}")
+        return
+
+    notes = notesapp.notes_with_tags(
+        list(tags),
+        match_all=match_all,
+        accounts=[account_name] if account_name else None,
+    )
+    if json_:
+        print_notes_as_json(notes)
+    elif notes:
+        print_notes_list(notesapp.noteslist(id=[note.id for note in notes]))
+
+
+@click.command(name="dupes")
+@click.option(
+    "--threshold",
+    "-t",
+    metavar="SIMILARITY",
+    type=click.FloatRange(min=0.0, max=1.0),
+    default=DUPLICATE_THRESHOLD,
+    show_default=True,
+    help="Minimum estimated similarity (0.0 to 1.0) of notes to report as duplicates.",
+)
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    multiple=True,
+    type=str,
+    help="Search only account ACCOUNT; may be repeated to include multiple accounts.",
+)
+@click.option(
+    "--move-to",
+    metavar="FOLDER",
+    type=str,
+    help="Move every note in each group of duplicates except the most recently modified "
+    "to folder FOLDER in the note's account; FOLDER is created if it does not exist.",
+)
+@click.option(
+    "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
+)
+@click.option(
+    "--workers",
+    "-w",
+    metavar="N",
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to compare notes (default: number of CPUs).",
+)
+@click.pass_obj
+def dupes(obj, threshold, account_name, move_to, json_, workers):
+    """Find notes whose text is nearly identical.
+
+    Prints each group of near-duplicate notes, most recently modified first,
+    with each note's estimated similarity to the first note in the group.
+    """
+    notesapp = obj.session.notesapp
+    accounts = list(account_name) or None
+    noteslist = notesapp.noteslist(accounts=accounts)
+    clusters = noteslist.duplicates(threshold=threshold, max_workers=workers)
+    names = dict(zip(noteslist.id, noteslist.name)) if clusters else {}
+
+    if json_:
+        print(
+            json.dumps(
+                [
+                    [
+                        {"id": note_id, "name": names[note_id], "similarity": score}
+                        for note_id, score in zip(cluster.ids, cluster.similarities)
+                    ]
+                    for cluster in clusters
+                ]
+            )
+        )
+    else:
+        for number, cluster in enumerate(clusters):
+            if number:
+                click.echo()
+            for note_id, score in zip(cluster.ids, cluster.similarities):
+                click.echo(f"{score:4.0%}  {names[note_id]} ({note_id})")
+
+    if not move_to or not clusters:
+        return
+
+    duplicate_ids = [note_id for cluster in clusters for note_id in cluster.ids[1:]]
+    for name in accounts or notesapp.accounts:
+        account = notesapp.account(name)
+        notes = account.notes(id=duplicate_ids)
+        if not notes:
+            continue
+        if move_to not in account.folders:
+            account.make_folder(move_to)
+        errors = account.move_notes(notes, move_to)
+        for note, error in zip(notes, errors):
+            if error:
+                click.echo(
+                    f"Error moving note '{names[note.id]}' to folder '{move_to}': {error}",
+                    err=True,
+                )
+        moved = sum(1 for error in errors if not error)
+        click.echo(
+            f"Moved {moved} duplicate note{'s' if moved != 1 else ''} to folder "
+            f"'{move_to}' in {name}",
+            err=json_,
+        )
+
+
+@click.command(name="related")
+@click.option(
+    "--count",
+    "-k",
+    metavar="K",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of related notes to list.",
+)
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Account to search for NOTE_NAME and related notes in.",
+)
+@click.option(
+    "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
+)
+@click.argument(
+    "name", metavar="NOTE_NAME", required=True, shell_complete=complete_note_name
+)
+@click.pass_obj
+def related(obj, count, account_name, json_, name):
+    """List notes related to note NOTE_NAME.
+
+    Notes are ranked by how similar their words are to the words in NOTE_NAME,
+    using an index that is updated with only the notes that changed since it was last used.
+    """
+    note = find_note(obj.session, name, account_name)
+    results = obj.session.notesapp.related(
+        note, k=count, accounts=[account_name] if account_name else None
+    )
+    if json_:
+        print(
+            json.dumps(
+                [
+                    {"id": other.id, "name": other.name, "similarity": score}
+                    for other, score in results
+                ]
+            )
+        )
+    else:
+        for other, score in results:
+            click.echo(f"{score:4.0%}  {other.name} ({other.id})")
+
+
+@click.command(name="links")
+@click.option(
+    "--orphans",
+    is_flag=True,
+    help="List notes that neither link to nor are linked from another note.",
+)
+@click.option("--dead", is_flag=True, help="List links to notes that do not exist.")
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Limit results to account ACCOUNT.",
+)
+@click.option(
+    "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
+)
+@click.argument(
+    "name", metavar="[NOTE_NAME]", required=False, shell_complete=complete_note_name
+)
+@click.pass_obj
+def links(obj, orphans, dead, account_name, json_, name):
+    """List links from and to note NOTE_NAME, or report orphan notes and dead links.
+
+    Links are read from an index that is updated with only the notes that changed since it was last used.
+    """
+    if sum(bool(option) for option in (name, orphans, dead)) != 1:
+        click.echo(
+            "Error: specify exactly one of NOTE_NAME, --orphans, --dead.", err=True
+        )
+        sys.exit(2)
+
+    notesapp = obj.session.notesapp
+    accounts = [account_name] if account_name else None
+    if orphans:
+        notes = notesapp.orphans(accounts=accounts)
+        if json_:
+            print_notes_as_json(notes)
+        elif notes:
+            print_notes_list(notesapp.noteslist(id=[note.id for note in notes]))
+        return
+
+    if dead:
+        dead_links = [
+            (note, note.name, link)
+            for note, link in notesapp.dead_links(accounts=accounts)
+        ]
+        if json_:
+            print(
+                json.dumps(
+                    [
+                        {
+                            "id": note.id,
+                            "name": note_name,
+                            "link": link.text,
+                            "identifier": link.identifier,
+                        }
+                        for note, note_name, link in dead_links
+                    ]
+                )
+            )
+        else:
+            for note, note_name, link in dead_links:
+                click.echo(
+                    f"{note_name} ({note.id}): '{link.text}' -> {link.identifier}"
+                )
+        return
+
+    note = find_note(obj.session, name, account_name)
+    outgoing = notesapp.links(note)
+    backlinks = notesapp.backlinks(note, max_age=float("inf"))
+    if json_:
+        print(
+            json.dumps(
+                {
+                    "links": [
+                        {
+                            "text": link.text,
+                            "identifier": link.identifier,
+                            "id": link.target,
+                        }
+                        for link in outgoing
+                    ],
+                    "backlinks": [
+                        {"id": other.id, "name": other.name} for other in backlinks
+                    ],
+                }
+            )
+        )
+        return
+    click.echo("Links:")
+    for link in outgoing:
+        target = link.target or f"dead link: {link.identifier}"
+        click.echo(f"  {link.text} ({target})")
+    click.echo("Backlinks:")
+    for other in backlinks:
+        click.echo(f"  {other.name} ({other.id})")
+
+
+@click.command(name="history")
+@click.option(
+    "--snapshot",
+    is_flag=True,
+    help="Record the current version of every note that changed since it was last recorded.",
+)
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Limit --snapshot and the search for NOTE_NAME to account ACCOUNT.",
+)
+@click.option(
+    "--show",
+    metavar="VERSION",
+    type=int,
+    help="Print the HTML body of version VERSION of NOTE_NAME.",
+)
+@click.option(
+    "--json", "-j", "json_", is_flag=True, help="Print output in JSON format."
+)
+@click.argument(
+    "name", metavar="[NOTE_NAME]", required=False, shell_complete=complete_note_name
+)
+@click.pass_obj
+def history(obj, snapshot, account_name, show, json_, name):
+    """Record versions of notes or list the recorded versions of note NOTE_NAME.
+
+    History is opt-in: versions are only recorded when this command or `notes restore`
+    runs, for example from a scheduled job that runs `notes history --snapshot`.
+    Versions are stored in a local database as deltas against the previous version.
+    """
+    if not snapshot and not name:
+        click.echo("Error: specify NOTE_NAME, --snapshot, or both.", err=True)
+        sys.exit(2)
+
+    store = HistoryStore()
+    if snapshot:
+        recorded = store.snapshot(
+            obj.session.notesapp, accounts=[account_name] if account_name else None
+        )
+        click.echo(
+            f"Recorded {recorded} version{'s' if recorded != 1 else ''}",
+            err=bool(name),
+        )
+    if not name:
+        return
+
+    note = find_note(obj.session, name, account_name)
+    store.snapshot_notes([note])
+    versions = store.versions(note.id)
+    if show is not None:
+        if show not in [version.version for version in versions]:
+            click.echo(f"Error: '{note.name}' has no version {show}.", err=True)
+            sys.exit(1)
+        click.echo(store.body(show))
+        return
+
+    if json_:
+        print(
+            json.dumps(
+                [
+                    {
+                        "version": version.version,
+                        "name": version.name,
+                        "modification_date": version.modification_date.isoformat(),
+                        "recorded": version.recorded.isoformat(),
+                        "size": version.size,
+                        "stored": version.stored,
+                    }
+                    for version in reversed(versions)
+                ]
+            )
+        )
+        return
+    for version in reversed(versions):
+        click.echo(
+            f"{version.version:>6}  {version.modification_date:%Y-%m-%d %H:%M:%S}  "
+            f"{version.name}  ({version.size} bytes, {version.stored} stored)"
+        )
+
+
+@click.command(name="restore")
+@click.option(
+    "--at",
+    "at",
+    metavar="TIME",
+    required=True,
+    type=click.DateTime(
+        formats=["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+    ),
+    help="Restore the version of the note that was current at TIME, "
+    "e.g. '2024-05-01 14:30'.",
+)
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation prompt.")
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    type=str,
+    help="Account to search in.",
+)
+@click.argument(
+    "name", metavar="NOTE_NAME", required=True, shell_complete=complete_note_name
+)
+@click.pass_obj
+def restore(obj, at, yes, account_name, name):
+    """Restore note NOTE_NAME to the version recorded in its history at TIME.
+
+    The current version is recorded first so the restore can itself be undone.
+
+    Example: notes restore "Shopping" --at "2024-05-01 14:30"
+    """
+    note = find_note(obj.session, name, account_name)
+    store = HistoryStore()
+    store.snapshot_notes([note])
+    version = store.version_at(note.id, at)
+    if version is None:
+        click.echo(
+            f"Error: no version of '{note.name}' was recorded at or before {at}.",
+            err=True,
         )
+        sys.exit(1)
+    if not yes:
+        if not click.confirm(
+            f"Restore '{note.name}' to version {version.version} "
+            f"modified {version.modification_date:%Y-%m-%d %H:%M:%S}?"
+        ):
+            click.echo("Aborted.")
+            sys.exit(0)
+    note.body = store.body(version)
+    store.snapshot_notes([note])
+    click.echo(
+        f"Restored '{version.name}' to version {version.version} "
+        f"modified {version.modification_date:%Y-%m-%d %H:%M:%S}"
     )
 
 
@@ -247,11 +903,32 @@ def list_notes(account_name, text):
     "If --plaintext or --markdown is also specified, "
     "the note body in the resulting JSON will be in the specified format.",
 )
-@click.argument("name", metavar="NOTE_NAME", required=True)
-def cat_notes(name, plaintext, markdown, html, json_):
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    help="Output notes as newline-delimited JSON, one compact object per note, "
+    "written as soon as each note is read. "
+    "Body format follows the same rules as --json.",
+)
+@click.option(
+    "--strip-data",
+    "-S",
+    "strip_data",
+    is_flag=True,
+    help="Replace inline data: URIs (for example, pasted images) in the HTML body "
+    "with short 'macnotesapp-inline:HASH' placeholders.",
+)
+@click.argument(
+    "name", metavar="NOTE_NAME", required=True, shell_complete=complete_note_name
+)
+@click.pass_obj
+def cat_notes(obj, name, plaintext, markdown, html, json_, ndjson, strip_data):
     """Print one or more notes to STDOUT"""
-    notesapp = macnotesapp.NotesApp()
-    notes = notesapp.notes(name=[name])
+    if json_ and ndjson:
+        click.echo("Only one of --json and --ndjson can be specified.", err=True)
+        raise click.Abort()
+
+    notes = find_notes(obj.session, name)
     output = (
         "plaintext"
         if plaintext
@@ -263,23 +940,26 @@ def cat_notes(name, plaintext, markdown, html, json_):
     )
 
     if json_:
-        print_notes_as_json(notes, plaintext=plaintext)
+        print_notes_as_json(notes, plaintext=plaintext, strip_data=strip_data)
+    elif ndjson:
+        print_notes_as_ndjson(notes, plaintext=plaintext, strip_data=strip_data)
     else:
         for note in notes:
-            print_note(note, output=output)
+            print_note(note, output=output, strip_data=strip_data)
 
 
 @click.command(name="config")
-def config():
+@click.pass_obj
+def config(obj):
     """Configure default settings for account, editor, etc."""
-    notes = macnotesapp.NotesApp()
-    config = ConfigSettings()
+    session = obj.session
+    config = session.config
     settings = config.read()
 
     # account
-    accounts = notes.accounts
+    accounts = session.accounts
     account = settings.get("account")
-    account = account if account and account in accounts else notes.default_account
+    account = account if account and account in accounts else session.default_account
     settings["account"] = questionary.select(
         "Select default account for new notes added with `notes add`: ",
         choices=accounts,
@@ -287,7 +967,7 @@ def config():
     ).ask()
 
     # folder
-    account = notes.account(settings["account"])
+    account = session.account(settings["account"])
     folders = account.folders
     folder = settings.get("folder")
     folder = folder if folder and folder in folders else account.default_folder
@@ -321,23 +1001,171 @@ def config():
     click.echo(f"Settings saved to {CONFIG_FILE}")
 
 
+@click.command(name="export")
+@click.option(
+    "--format",
+    "-f",
+    "format_",
+    type=click.Choice(EXPORT_FORMATS, case_sensitive=False),
+    default=EXPORT_FORMAT_MARKDOWN,
+    show_default=True,
+    help="Format of exported notes.",
+)
+@click.option(
+    "--account",
+    "-a",
+    "account_name",
+    metavar="ACCOUNT",
+    multiple=True,
+    type=str,
+    help="Export only notes in account ACCOUNT; may be repeated to include multiple accounts.",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help="Skip notes whose modification date has not changed since the last export to DIRECTORY.",
+)
+@click.option(
+    "--keep-deleted",
+    is_flag=True,
+    help="Keep files exported for notes that have since been deleted from Notes.app.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    metavar="N",
+    type=click.IntRange(min=1),
+    help="Number of worker processes used to convert notes (default: number of CPUs).",
+)
+@click.option(
+    "--attachments",
+    "-A",
+    is_flag=True,
+    help=f"Also export note attachments to DIRECTORY/{ATTACHMENTS_DIRECTORY}; "
+    "identical attachments are only stored once.",
+)
+@click.argument(
+    "directory",
+    metavar="DIRECTORY",
+    type=click.Path(file_okay=False, writable=True, path_type=pathlib.Path),
+)
+@click.pass_obj
+def export(
+    obj,
+    format_,
+    account_name,
+    incremental,
+    keep_deleted,
+    workers,
+    attachments,
+    directory,
+):
+    """Export notes to DIRECTORY as Markdown or HTML files.
+
+    Notes are written to DIRECTORY/ACCOUNT/FOLDER/NAME.md (or .html).
+    A manifest of exported notes is saved in DIRECTORY; if an export is
+    interrupted, running the same command again resumes where it left off.
+    With --incremental, notes that have not changed since the last export are skipped.
+    Files exported for notes that have since been deleted from Notes.app are removed
+    unless --keep-deleted is given.
+
+    With --attachments, attachments are saved to DIRECTORY/_attachments/objects by
+    hash of their contents and DIRECTORY/_attachments/manifest.json maps each note
+    to its attachments.
+    """
+    notesapp = obj.session.notesapp
+    with Progress(
+        SpinnerColumn(), TextColumn("Exporting notes: {task.completed}")
+    ) as progress:
+        task = progress.add_task("export", total=None)
+        results = export_notes(
+            notesapp,
+            directory,
+            format=format_.lower(),
+            accounts=list(account_name) or None,
+            incremental=incremental,
+            max_workers=workers,
+            progress=lambda count: progress.advance(task, count),
+            prune=not keep_deleted,
+        )
+    click.echo(
+        f"Exported {results.exported} notes to {directory}, "
+        f"skipped {results.skipped} unchanged notes"
+        + (f", removed {results.deleted} deleted notes" if results.deleted else "")
+    )
+
+    if attachments:
+        with Progress(
+            SpinnerColumn(), TextColumn("Exporting attachments: {task.completed}")
+        ) as progress:
+            task = progress.add_task("attachments", total=None)
+            attachment_results = export_attachments(
+                notesapp.noteslist(accounts=list(account_name) or None),
+                directory / ATTACHMENTS_DIRECTORY,
+                progress=lambda count: progress.advance(task, count),
+            )
+        click.echo(
+            f"Exported {attachment_results.saved} attachments, "
+            f"{attachment_results.duplicates} duplicates, "
+            f"skipped {attachment_results.skipped} previously exported attachments"
+            + (
+                f", {attachment_results.errors} errors"
+                if attachment_results.errors
+                else ""
+            )
+        )
+
+
 @click.command(name="dump")
 @click.option("--selected", "-s", is_flag=True, help="Dump only selected notes.")
 @click.option("--no-body", "-B", is_flag=True, help="Do not dump note body.")
-def dump(selected, no_body):
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    help="Dump notes as newline-delimited JSON, one compact object per note.",
+)
+@click.option(
+    "--strip-data",
+    "-S",
+    "strip_data",
+    is_flag=True,
+    help="Replace inline data: URIs (for example, pasted images) in the HTML body "
+    "with short 'macnotesapp-inline:HASH' placeholders.",
+)
+@click.pass_obj
+def dump(obj, selected, no_body, ndjson, strip_data):
     """Dump all notes or selection of notes for debugging"""
-    notesapp = macnotesapp.NotesApp()
-    if selected:
+    notesapp = obj.session.notesapp
+    if ndjson:
+        if selected:
+            notes_data = (
+                note.asdict(strip_inline_data=strip_data, body=not no_body)
+                for note in notesapp.selection
+            )
+        else:
+            notes_data = (
+                {"account": account, **notesdict}
+                for account in notesapp.accounts
+                for notesdict in notesapp.noteslist(accounts=[account]).iterdicts(
+                    strip_inline_data=strip_data, body=not no_body
+                )
+            )
+        for note_data in notes_data:
+            print_ndjson(note_data)
+    elif selected:
         for note in notesapp.selection:
-            dump_note(note, no_body=no_body)
+            dump_note(note, no_body=no_body, strip_data=strip_data)
     else:
         for account in notesapp.accounts:
             noteslist = notesapp.noteslist(accounts=[account])
-            dump_notes_list(noteslist, account)
+            dump_notes_list(noteslist, account, no_body=no_body, strip_data=strip_data)
 
 
 @click.command(name="rename")
-@click.argument("old_name", metavar="OLD_NAME")
+@click.argument(
+    "old_name", metavar="OLD_NAME", shell_complete=complete_note_name
+)
 @click.argument("new_name", metavar="NEW_NAME")
 @click.option(
     "--account",
@@ -347,24 +1175,22 @@ def dump(selected, no_body):
     type=str,
     help="Account to search in.",
 )
-def rename_note(old_name, new_name, account_name):
+@click.pass_obj
+def rename_note(obj, old_name, new_name, account_name):
     """Rename a note.
 
     Example: notes rename "Old Title" "New Title"
     """
-    notes_app = macnotesapp.NotesApp()
-    matching_notes = notes_app.notes(name=[old_name], accounts=[account_name] if account_name else None)
-    if not matching_notes:
-        click.echo(f"Error: Note '{old_name}' not found.", err=True)
-        sys.exit(1)
-    note = matching_notes[0]
+    note = find_note(obj.session, old_name, account_name)
     old = note.name
     note.name = new_name
     click.echo(f"Renamed '{old}' -> '{new_name}'")
 
 
 @click.command(name="delete")
-@click.argument("note_name", metavar="NOTE_NAME")
+@click.argument(
+    "note_name", metavar="NOTE_NAME", shell_complete=complete_note_name
+)
 @click.option("--yes", "-y", is_flag=True, help="Skip confirmation prompt.")
 @click.option(
     "--account",
@@ -374,17 +1200,13 @@ def rename_note(old_name, new_name, account_name):
     type=str,
     help="Account to search in.",
 )
-def delete_note(note_name, yes, account_name):
+@click.pass_obj
+def delete_note(obj, note_name, yes, account_name):
     """Delete a note.
 
     Example: notes delete "Old Note"
     """
-    notes_app = macnotesapp.NotesApp()
-    matching_notes = notes_app.notes(name=[note_name], accounts=[account_name] if account_name else None)
-    if not matching_notes:
-        click.echo(f"Error: Note '{note_name}' not found.", err=True)
-        sys.exit(1)
-    note = matching_notes[0]
+    note = find_note(obj.session, note_name, account_name)
     if not yes:
         if not click.confirm(f"Delete '{note.name}'?"):
             click.echo("Aborted.")
@@ -394,7 +1216,9 @@ def delete_note(note_name, yes, account_name):
 
 
 @click.command(name="edit")
-@click.argument("note_name", metavar="NOTE_NAME")
+@click.argument(
+    "note_name", metavar="NOTE_NAME", shell_complete=complete_note_name
+)
 @click.option("--body", "-b", help="Set body directly without opening editor.")
 @click.option("--html", "-h", "use_html", is_flag=True, help="Treat body as HTML.")
 @click.option("--markdown", "-m", "use_markdown", is_flag=True, help="Treat body as Markdown.")
@@ -406,38 +1230,52 @@ def delete_note(note_name, yes, account_name):
     type=str,
     help="Account to search in.",
 )
-def edit_note(note_name, body, use_html, use_markdown, account_name):
+@click.option(
+    "--if-unmodified-since",
+    "if_unmodified_since",
+    metavar="DATETIME",
+    type=click.DateTime(
+        formats=[
+            "%Y-%m-%d",
+            "%Y-%m-%dT%H:%M:%S",
+            "%Y-%m-%d %H:%M:%S",
+            "%Y-%m-%dT%H:%M:%S.%f",
+        ]
+    ),
+    help="Only update the note if it has not been modified since DATETIME "
+    "(ISO format in local time, e.g. the modification_date from `notes cat --json`). "
+    "If the note has been modified, it is not changed and the command exits with an error.",
+)
+@click.pass_obj
+def edit_note(
+    obj,
+    note_name, body, use_html, use_markdown, account_name, if_unmodified_since
+):
     """Edit an existing note's body.
 
     Example: notes edit "My Note" --body "New content"
     """
-    notes_app = macnotesapp.NotesApp()
-    matching_notes = notes_app.notes(name=[note_name], accounts=[account_name] if account_name else None)
-    if not matching_notes:
-        click.echo(f"Error: Note '{note_name}' not found.", err=True)
-        sys.exit(1)
-    note = matching_notes[0]
+    note = find_note(obj.session, note_name, account_name)
     original_name = note.name
 
     if body:
         if use_markdown:
-            body = markdown2.markdown(body, extras=MARKDOWN_EXTRAS)
+            body = markdown_to_html(body)
         elif not use_html:
             # Plain text - wrap in basic HTML
             body = f"<div>{body}</div>"
-        note.body = body
+        update_note_body(note, body, if_unmodified_since)
         click.echo(f"Updated '{original_name}'")
     else:
         # Open in editor
         import tempfile
-        config = ConfigSettings()
-        settings = config.read()
-        editor = settings.get("editor", DEFAULT_EDITOR)
+        editor = obj.session.config.editor
         if editor.startswith("$"):
-            editor = os.environ.get(editor[1:], "vim")
+            # environment variable is not set
+            editor = "vim"
 
         # Export current content as markdown for editing
-        current_md = html2md(note.body)
+        current_md = get_conversion_cache().markdown(note)
         with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
             f.write(current_md)
             temp_path = f.name
@@ -453,15 +1291,38 @@ def edit_note(note_name, body, use_html, use_markdown, account_name):
         with open(temp_path, "r") as f:
             new_content = f.read()
 
-        new_html = markdown2.markdown(new_content, extras=MARKDOWN_EXTRAS)
-        note.body = new_html
+        new_html = markdown_to_html(new_content)
         os.unlink(temp_path)
+        update_note_body(note, new_html, if_unmodified_since)
         click.echo(f"Updated '{note.name}'")
 
 
+def update_note_body(
+    note: macnotesapp.Note, body: str, if_unmodified_since: Optional[datetime.datetime]
+):
+    """Set body of note; if if_unmodified_since is set, exit with error if note was modified since then"""
+    result = note.update(body=body, if_unmodified_since=if_unmodified_since)
+    if result.conflict:
+        click.echo(
+            f"Error: Note '{note.name}' was modified at "
+            f"{result.modification_date.isoformat()}, "
+            f"after {if_unmodified_since.isoformat()}; not updated.",
+            err=True,
+        )
+        sys.exit(1)
+
+
 @click.command(name="move")
-@click.argument("note_name", metavar="NOTE_NAME")
-@click.option("--folder", "-f", required=True, help="Destination folder.")
+@click.argument(
+    "note_name", metavar="NOTE_NAME", shell_complete=complete_note_name
+)
+@click.option(
+    "--folder",
+    "-f",
+    required=True,
+    help="Destination folder.",
+    shell_complete=complete_folder_name,
+)
 @click.option(
     "--account",
     "-a",
@@ -470,17 +1331,13 @@ def edit_note(note_name, body, use_html, use_markdown, account_name):
     type=str,
     help="Account to search in.",
 )
-def move_note(note_name, folder, account_name):
+@click.pass_obj
+def move_note(obj, note_name, folder, account_name):
     """Move a note to a different folder.
 
     Example: notes move "My Note" --folder "Archive"
     """
-    notes_app = macnotesapp.NotesApp()
-    matching_notes = notes_app.notes(name=[note_name], accounts=[account_name] if account_name else None)
-    if not matching_notes:
-        click.echo(f"Error: Note '{note_name}' not found.", err=True)
-        sys.exit(1)
-    note = matching_notes[0]
+    note = find_note(obj.session, note_name, account_name)
     old_folder = note.folder
     note.move(folder)
     click.echo(f"Moved '{note.name}' from '{old_folder}' to '{folder}'")
@@ -496,20 +1353,22 @@ def move_note(note_name, folder, account_name):
     type=str,
     help="Account to create folder in.",
 )
-def make_folder(folder_name, account_name):
+@click.pass_obj
+def make_folder(obj, folder_name, account_name):
     """Create a new folder.
 
     Example: notes mkdir "Archive"
     """
-    notes_app = macnotesapp.NotesApp()
-    account_name = account_name or notes_app.default_account
-    account = notes_app.account(account_name)
+    account_name = account_name or obj.session.default_account
+    account = obj.session.account(account_name)
     account.make_folder(folder_name)
     click.echo(f"Created folder '{folder_name}' in {account_name}")
 
 
 @click.command(name="rmdir")
-@click.argument("folder_name", metavar="FOLDER_NAME")
+@click.argument(
+    "folder_name", metavar="FOLDER_NAME", shell_complete=complete_folder_name
+)
 @click.option("--yes", "-y", is_flag=True, help="Skip confirmation prompt.")
 @click.option(
     "--account",
@@ -519,14 +1378,14 @@ def make_folder(folder_name, account_name):
     type=str,
     help="Account to delete folder from.",
 )
-def remove_folder(folder_name, yes, account_name):
+@click.pass_obj
+def remove_folder(obj, folder_name, yes, account_name):
     """Delete a folder.
 
     Example: notes rmdir "Old Folder"
     """
-    notes_app = macnotesapp.NotesApp()
-    account_name = account_name or notes_app.default_account
-    account = notes_app.account(account_name)
+    account_name = account_name or obj.session.default_account
+    account = obj.session.account(account_name)
     if folder_name not in account.folders:
         click.echo(f"Error: Folder '{folder_name}' not found in {account_name}.", err=True)
         sys.exit(1)
@@ -540,9 +1399,10 @@ def remove_folder(folder_name, yes, account_name):
 
 # Click CLI object & context settings
 class CLI_Obj:
-    def __init__(self, debug=False, group=None):
+    def __init__(self, debug=False, group=None, session=None):
         self.debug = debug
         self.group = group
+        self.session = session or CLISession()
 
 
 CTX_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -564,25 +1424,24 @@ def cli_main(ctx, debug):
 
 
 # add the commands to the main group
-for command in [accounts, add_note, cat_notes, config, list_notes, dump, help,
-                rename_note, delete_note, edit_note, move_note, make_folder, remove_folder]:
+for command in [accounts, add_note, batch, cat_notes, config, list_notes, dump, export, help, import_,
+                rename_note, delete_note, edit_note, move_note, make_folder, remove_folder, tags,
+                grep, dupes, related, links, history, restore]:
     cli_main.add_command(command)
 
 
-def get_account_data() -> Dict:
+def get_account_data(session: CLISession) -> Dict:
     """Get dict of account data for Notes accounts"""
-    notes = macnotesapp.NotesApp()
-    accounts = notes.accounts
-    account_data = {}
-    for account_name in accounts:
-        account = notes.account(account_name)
-        account_data[account_name] = {
-            "id": account.id,
-            "name": account_name,
-            "notes_count": len(account),
-            "default_folder": account.default_folder,
+    return {
+        summary.name: {
+            "id": summary.id,
+            "name": summary.name,
+            "notes_count": summary.notes_count,
+            "folders_count": summary.folders_count,
+            "default_folder": summary.default_folder,
         }
-    return account_data
+        for summary in session.notesapp.account_summaries()
+    }
 
 
 def print_notes_list(noteslist: NotesList):
@@ -615,48 +1474,115 @@ def print_notes_list(noteslist: NotesList):
         print(format_str.format(folder, name, body))
 
 
-def print_note(note: macnotesapp.Note, output: str):
+def print_note(note: macnotesapp.Note, output: str, strip_data: bool = False):
     """Print a note to STDOUT
 
     Args:
         note: Note to print
         output: Output format (plaintext, markdown, html, rich)
+        strip_data: If True, replace inline data: URIs in HTML body with placeholders
     """
 
     console = Console()
+    conversion_cache = get_conversion_cache()
     # print note, not JSON
     if output == "plaintext":
-        console.print(note.plaintext)
+        console.print(conversion_cache.plaintext(note))
     elif output == "rich":
-        console.print(Markdown(html2md(note.body)))
+        console.print(Markdown(conversion_cache.markdown(note)))
     elif output == "markdown":
-        console.print(html2md(note.body))
+        console.print(conversion_cache.markdown(note))
     elif output == "html":
-        console.print(note.body)
+        console.print(note.stripped_body if strip_data else note.body)
 
 
-def print_notes_as_json(notes: Iterable[macnotesapp.Note], plaintext: bool = False):
+def print_notes_as_json(
+    notes: Iterable[macnotesapp.Note], plaintext: bool = False, strip_data: bool = False
+):
     """Print notes as JSON to STDOUT
 
     Args:
         notes: Notes to print
         plaintext: If True, print plaintext of note body instead of HTML
+        strip_data: If True, replace inline data: URIs in HTML body with placeholders
     """
 
-    json_list = []
-    for note in notes:
-        json_data = note.asdict()
-        if plaintext:
-            json_data["body"] = json_data["plaintext"]
-        del json_data["plaintext"]
-        json_data["creation_date"] = json_data["creation_date"].isoformat()
-        json_data["modification_date"] = json_data["modification_date"].isoformat()
-        json_list.append(json_data)
+    json_list = [
+        note_json_data(note, plaintext=plaintext, strip_data=strip_data)
+        for note in notes
+    ]
     console = Console()
     console.print(json.dumps(json_list, indent=4))
 
 
-def dump_note(note: macnotesapp.Note, no_body: bool = False):
+def print_notes_as_ndjson(
+    notes: Iterable[macnotesapp.Note], plaintext: bool = False, strip_data: bool = False
+):
+    """Print notes as newline-delimited JSON to STDOUT, one note per line
+
+    Each note is written (and flushed) as soon as its data has been read
+    so output can be streamed to another process without buffering every note.
+
+    Args:
+        notes: Notes to print
+        plaintext: If True, print plaintext of note body instead of HTML
+        strip_data: If True, replace inline data: URIs in HTML body with placeholders
+    """
+    for note in notes:
+        print_ndjson(note_json_data(note, plaintext=plaintext, strip_data=strip_data))
+
+
+def print_notes_list_as_ndjson(noteslist: NotesList):
+    """Print note list to STDOUT as newline-delimited JSON, one note per line"""
+    for note_id, folder, name, plaintext in zip(
+        noteslist.id, noteslist.folder, noteslist.name, noteslist.plaintext
+    ):
+        print_ndjson(
+            {"id": note_id, "folder": folder, "name": name, "plaintext": plaintext}
+        )
+
+
+def note_json_data(
+    note: macnotesapp.Note, plaintext: bool = False, strip_data: bool = False
+) -> Dict:
+    """Return dict of note data suitable for serializing to JSON
+
+    Args:
+        note: Note to serialize
+        plaintext: If True, body will contain plaintext of note body instead of HTML
+        strip_data: If True, replace inline data: URIs in HTML body with placeholders
+    """
+    json_data = note.asdict(strip_inline_data=strip_data)
+    if plaintext:
+        json_data["body"] = json_data["plaintext"]
+    del json_data["plaintext"]
+    json_data["creation_date"] = json_data["creation_date"].isoformat()
+    json_data["modification_date"] = json_data["modification_date"].isoformat()
+    return json_data
+
+
+def print_ndjson(data: Dict):
+    """Write data to STDOUT as a single line of compact JSON and flush
+
+    Writes directly to STDOUT, bypassing rich rendering.
+    datetime values are serialized in ISO 8601 format.
+    """
+    sys.stdout.write(
+        json.dumps(data, separators=(",", ":"), default=_json_default) + "\n"
+    )
+    sys.stdout.flush()
+
+
+def _json_default(obj):
+    """Serialize objects not handled by json.dumps"""
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_note(
+    note: macnotesapp.Note, no_body: bool = False, strip_data: bool = False
+):
     """Dump note data to STDOUT for debugging purposes"""
     print(f"{note.id=}")
     print(f"{note.name=}")
@@ -666,15 +1592,21 @@ def dump_note(note: macnotesapp.Note, no_body: bool = False):
     print(f"{note.modification_date=}")
     print(f"{note.password_protected=}")
     if not no_body:
-        print(f"{note.body=}")
+        if strip_data:
+            print(f"{note.stripped_body=}")
+        else:
+            print(f"{note.body=}")
         print(f"{note.plaintext=}")
 
 
 def dump_notes_list(
-    noteslist: macnotesapp.NotesList, account: str, no_body: bool = False
+    noteslist: macnotesapp.NotesList,
+    account: str,
+    no_body: bool = False,
+    strip_data: bool = False,
 ):
     """Dump NotesList data to STDOUT for debugging purposes"""
-    notesdicts = noteslist.asdict()
+    notesdicts = noteslist.iterdicts(strip_inline_data=strip_data, body=not no_body)
     for notesdict in notesdicts:
         print(f"note.id={notesdict['id']}")
         print(f"note.name={notesdict['name']}")
@@ -0,0 +1,45 @@
+"""Shell completion of note and folder names for the CLI
+
+Completions are served from the on-disk NameIndex as it is; completing never queries
+Notes.app, which could block the shell while the whole library is read. The index is
+refreshed by commands that look up notes by name (see cli_resolve).
+"""
+
+from __future__ import annotations
+
+import click
+from click.shell_completion import CompletionItem
+
+from macnotesapp.logging import logger
+from macnotesapp.name_index import NameIndex
+
+
+def complete_note_name(
+    ctx: click.Context, param: click.Parameter, incomplete: str
+) -> list[CompletionItem]:
+    """Return completions for a note name argument"""
+    if not (index := _name_index()):
+        return []
+    account = ctx.params.get("account_name")
+    return [CompletionItem(name) for name in index.complete_name(incomplete, account)]
+
+
+def complete_folder_name(
+    ctx: click.Context, param: click.Parameter, incomplete: str
+) -> list[CompletionItem]:
+    """Return completions for a folder name argument or option"""
+    if not (index := _name_index()):
+        return []
+    account = ctx.params.get("account_name")
+    return [
+        CompletionItem(folder) for folder in index.complete_folder(incomplete, account)
+    ]
+
+
+def _name_index() -> NameIndex | None:
+    """Return NameIndex as last saved or None if it can't be loaded; errors must not break the shell"""
+    try:
+        return NameIndex()
+    except Exception as e:
+        logger.debug(f"Could not load name index for completion: {e}")
+        return None
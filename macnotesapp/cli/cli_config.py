@@ -34,14 +34,32 @@ DEFAULT_EDITOR = "$EDITOR"
 class ConfigSettings:
     config_file = CONFIG_FILE
 
-    def __init__(self):
+    def __init__(self, notesapp: NotesApp | None = None):
+        """Create ConfigSettings
+
+        Args:
+            notesapp: NotesApp used to look up default account and folder; created when needed if not provided
+        """
+        self._notesapp = notesapp
+        self._data: dict[str, str] | None = None
+        self._mtime: int | None = None
         if not self.config_file.is_file():
             self._create_config_file()
 
+    @property
+    def notesapp(self) -> NotesApp:
+        """NotesApp used to look up default account and folder"""
+        if self._notesapp is None:
+            self._notesapp = NotesApp()
+        return self._notesapp
+
     def read(self) -> dict[str, str]:
-        """Read data from config file"""
-        data = toml.load(self.config_file)
-        return data.get("defaults", {})
+        """Read data from config file; the file is only parsed again if it has been modified"""
+        mtime = self.config_file.stat().st_mtime_ns
+        if self._data is None or mtime != self._mtime:
+            self._data = toml.load(self.config_file).get("defaults", {})
+            self._mtime = mtime
+        return dict(self._data)
 
     def write(self, settings: dict[str, str]):
         """Write settings dict to config file"""
@@ -50,12 +68,13 @@ class ConfigSettings:
             self._create_config_file()
         with open(self.config_file, "w") as fp:
             toml.dump(data, fp)
+        self._data = None
 
     @property
     def account(self):
         """Return default account"""
         data = self.read()
-        return data.get("account", NotesApp().default_account)
+        return data.get("account") or self.notesapp.default_account
 
     @property
     def folder(self):
@@ -63,8 +82,7 @@ class ConfigSettings:
         data = self.read()
         if folder := data.get("folder"):
             return folder
-        notes = NotesApp()
-        return notes.account(notes.default_account).default_folder
+        return self.notesapp.account().default_folder
 
     @property
     def format(self):
@@ -85,9 +103,8 @@ class ConfigSettings:
     def _create_config_file(self):
         config_dir = self.config_file.parent
         config_dir.mkdir(exist_ok=True)
-        notes = NotesApp()
-        account = notes.default_account
-        folder = notes.account(account).default_folder
+        account = self.notesapp.default_account
+        folder = self.notesapp.account(account).default_folder
         config_defaults = {
             "defaults": {
                 "editor": DEFAULT_EDITOR,
@@ -0,0 +1,100 @@
+"""Resolve note names given on the command line to notes using the NameIndex"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+
+import click
+import questionary
+
+from macnotesapp import Note
+from macnotesapp.name_index import MATCH_EXACT, NameIndex, NameMatch, get_name_index
+
+from .cli_session import CLISession
+
+
+def find_notes(
+    session: CLISession, name: str, account_name: str | None = None
+) -> list[Note]:
+    """Return notes whose names best match name: all exact matches or, if none, all of the best kind of match
+
+    Exits with an error if no note matches.
+    """
+    matches = _best_matches(session, name, account_name)
+    return [_note_for_match(session, match) for match in matches]
+
+
+def find_note(session: CLISession, name: str, account_name: str | None = None) -> Note:
+    """Return the note named name
+
+    If exactly one note has the name (case-insensitive), it is returned. Otherwise the
+    user is asked to choose from the ranked candidates (prefix, substring, or fuzzy
+    matches); if STDIN is not a terminal, the candidates are listed and the command
+    exits with an error rather than guessing.
+    """
+    matches = _best_matches(session, name, account_name)
+    if len(matches) == 1 and matches[0].kind == MATCH_EXACT:
+        return _note_for_match(session, matches[0])
+
+    if not sys.stdin.isatty():
+        click.echo(
+            f"Error: '{name}' does not uniquely identify a note; candidates:", err=True
+        )
+        for match in matches:
+            click.echo(f"  {_describe(match)}", err=True)
+        sys.exit(1)
+
+    choice = questionary.select(
+        f"Select note for '{name}':",
+        choices=[
+            questionary.Choice(_describe(match), value=match) for match in matches
+        ],
+    ).ask()
+    if choice is None:
+        click.echo("Aborted.")
+        sys.exit(0)
+    return _note_for_match(session, choice)
+
+
+def _best_matches(
+    session: CLISession, name: str, account_name: str | None
+) -> list[NameMatch]:
+    """Return matches of the best kind for name, refreshing the index if nothing matches"""
+    index = get_name_index(session.notesapp)
+    matches = _verified_matches(session, index, name, account_name)
+    if not matches:
+        # the note may have been added or renamed since the index was refreshed
+        index.refresh(session.notesapp)
+        matches = _verified_matches(session, index, name, account_name)
+    if not matches:
+        click.echo(f"Error: Note '{name}' not found.", err=True)
+        sys.exit(1)
+    return [match for match in matches if match.kind == matches[0].kind]
+
+
+def _verified_matches(
+    session: CLISession, index: NameIndex, name: str, account_name: str | None
+) -> list[NameMatch]:
+    """Return matches for name in index; if the best exact match is stale, return no matches"""
+    matches = index.match(name, account_name)
+    if matches and matches[0].kind == MATCH_EXACT:
+        try:
+            current_name = _note_for_match(session, matches[0]).name
+        except Exception:
+            current_name = None
+        if not current_name or current_name.casefold() != matches[0].name.casefold():
+            return []
+    return matches
+
+
+def _note_for_match(session: CLISession, match: NameMatch) -> Note:
+    return session.account(match.account).note(match.id)
+
+
+def _describe(match: NameMatch) -> str:
+    """Return description of match for listing candidates"""
+    modified = datetime.datetime.fromtimestamp(match.modified).strftime(
+        "%Y-%m-%d %H:%M"
+    )
+    return f"{match.name}  ({match.account}, modified {modified}, {match.kind} match)"
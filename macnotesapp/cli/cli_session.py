@@ -0,0 +1,62 @@
+"""State shared by the commands run in a single invocation of the CLI"""
+
+from __future__ import annotations
+
+from macnotesapp import Account, NotesApp
+
+from .cli_config import ConfigSettings
+
+
+class CLISession:
+    """Holds one NotesApp, config snapshot, and memoized accounts and folders for a CLI invocation
+
+    Every command in an invocation (including each command run by `notes batch`) uses
+    the same session so Notes.app is only connected to once, the config file is only
+    parsed again if it changes, and each account and folder is only looked up once.
+    """
+
+    def __init__(self, notesapp: NotesApp | None = None):
+        """Create CLISession
+
+        Args:
+            notesapp: NotesApp to use; created when first needed if not provided
+        """
+        self._notesapp = notesapp
+        self._config: ConfigSettings | None = None
+        self._default_account: str | None = None
+        self._accounts: list[str] | None = None
+
+    @property
+    def notesapp(self) -> NotesApp:
+        """NotesApp shared by all commands in the session"""
+        if self._notesapp is None:
+            self._notesapp = NotesApp()
+        return self._notesapp
+
+    @property
+    def config(self) -> ConfigSettings:
+        """ConfigSettings for the session"""
+        if self._config is None:
+            self._config = ConfigSettings(self.notesapp)
+        return self._config
+
+    @property
+    def default_account(self) -> str:
+        """Name of default account"""
+        if self._default_account is None:
+            self._default_account = self.notesapp.default_account
+        return self._default_account
+
+    @property
+    def accounts(self) -> list[str]:
+        """Names of all accounts"""
+        if self._accounts is None:
+            self._accounts = self.notesapp.accounts
+        return list(self._accounts)
+
+    def account(self, name: str | None = None) -> Account:
+        """Return Account for account name or default account if name is None
+
+        Account objects (and the folders looked up through them) are memoized by the session's NotesApp.
+        """
+        return self.notesapp.account(name or self.default_account)
@@ -0,0 +1,262 @@
+"""Persistent cache of Markdown and plaintext renderings of notes
+
+Converting a note's HTML body to Markdown requires fetching the body from Notes.app
+and running the converter; rendering the same unchanged note again is wasted work.
+Renderings are stored in a SQLite database in the cache directory keyed by note id and
+format and are only used if the note's modification date and the converter version
+match. The least recently used renderings are evicted when the cache exceeds its size limit.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from .convert import CONVERTER_VERSION, html_to_markdown
+from .logging import logger
+from .utils import get_cache_dir
+
+if TYPE_CHECKING:
+    from .notesapp import Note
+
+CONVERSION_CACHE_FILENAME = "conversions.sqlite"
+
+# default max total size in bytes of cached renderings
+CONVERSION_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+# when the cache is over its size limit, evict entries until it is this fraction of the limit
+CONVERSION_CACHE_EVICT_TO = 0.9
+
+FORMAT_MARKDOWN = "markdown"
+FORMAT_PLAINTEXT = "plaintext"
+
+# max number of SQL variables used in a single query
+_SQL_CHUNK_SIZE = 500
+
+
+def converter_version() -> str:
+    """Return version string of the converters; cached renderings from other versions are not used"""
+    try:
+        markdownify_version = version("markdownify")
+    except PackageNotFoundError:
+        markdownify_version = "unknown"
+    return f"{CONVERTER_VERSION}+markdownify-{markdownify_version}"
+
+
+class ConversionCache:
+    """On-disk LRU cache of renderings of notes keyed by note id, format, modification date and converter version"""
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        max_size: int = CONVERSION_CACHE_MAX_SIZE,
+    ):
+        """Create ConversionCache
+
+        Args:
+            path: path to SQLite database; default is conversions.sqlite in cache directory
+            max_size: max total size in bytes of cached renderings
+        """
+        self.path = (
+            pathlib.Path(path) if path else get_cache_dir() / CONVERSION_CACHE_FILENAME
+        )
+        self.max_size = max_size
+        self.version = converter_version()
+        self.hits = 0
+        self.misses = 0
+        self._last_access = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=10, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS conversions (
+                note_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                modification_date REAL NOT NULL,
+                version TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (note_id, format)
+            )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS conversions_accessed ON conversions (accessed)"
+        )
+
+    def get(self, note_id: str, modification_date: datetime, format: str) -> str | None:
+        """Return cached rendering of note or None if not cached or note has changed"""
+        return self.get_many([(note_id, modification_date)], format).get(note_id)
+
+    def get_many(
+        self, notes: Iterable[tuple[str, datetime]], format: str
+    ) -> dict[str, str]:
+        """Return dict of note id to cached rendering for each (note id, modification date) in notes that is cached"""
+        wanted = {
+            note_id: modification_date.timestamp()
+            for note_id, modification_date in notes
+            if note_id and modification_date
+        }
+        found = {}
+        note_ids = list(wanted)
+        with self._lock:
+            for start in range(0, len(note_ids), _SQL_CHUNK_SIZE):
+                chunk = note_ids[start : start + _SQL_CHUNK_SIZE]
+                rows = self._conn.execute(
+                    "SELECT note_id, modification_date, content FROM conversions "
+                    f"WHERE format = ? AND version = ? AND note_id IN ({_placeholders(chunk)})",
+                    [format, self.version, *chunk],
+                )
+                found.update(
+                    (note_id, content)
+                    for note_id, modification_date, content in rows
+                    if modification_date == wanted[note_id]
+                )
+            if found:
+                self._touch(list(found), format)
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put(self, note_id: str, modification_date: datetime, format: str, content: str):
+        """Store rendering of note"""
+        self.put_many([(note_id, modification_date, content)], format)
+
+    def put_many(self, renderings: Iterable[tuple[str, datetime, str]], format: str):
+        """Store (note id, modification date, rendering) for each item in renderings"""
+        rows = [
+            (
+                note_id,
+                format,
+                modification_date.timestamp(),
+                self.version,
+                content,
+                len(content.encode("utf-8")),
+            )
+            for note_id, modification_date, content in renderings
+            if note_id and modification_date
+        ]
+        if not rows:
+            return
+        with self._lock:
+            now = self._now()
+            rows = [(*row, now) for row in rows]
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+            self._evict()
+
+    def get_or_convert(
+        self,
+        note_id: str,
+        modification_date: datetime,
+        format: str,
+        convert: Callable[[], str],
+    ) -> str:
+        """Return cached rendering of note or call convert() to render it and cache the result"""
+        if (content := self.get(note_id, modification_date, format)) is not None:
+            return content
+        content = convert()
+        self.put(note_id, modification_date, format, content)
+        return content
+
+    def markdown(self, note: Note) -> str:
+        """Return body of note as Markdown; the body is only fetched and converted if not cached"""
+        return self.get_or_convert(
+            note.id,
+            note.modification_date,
+            FORMAT_MARKDOWN,
+            lambda: html_to_markdown(note.body),
+        )
+
+    def plaintext(self, note: Note) -> str:
+        """Return plaintext of note; plaintext is only fetched from Notes.app if not cached"""
+        return self.get_or_convert(
+            note.id,
+            note.modification_date,
+            FORMAT_PLAINTEXT,
+            lambda: note.plaintext,
+        )
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of cached renderings"""
+        with self._lock:
+            return self._size()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+
+    def clear(self):
+        """Remove all cached renderings"""
+        with self._lock:
+            self._conn.execute("DELETE FROM conversions")
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+
+    def _touch(self, note_ids: list[str], format: str):
+        """Update last access time of renderings"""
+        now = self._now()
+        self._conn.executemany(
+            "UPDATE conversions SET accessed = ? WHERE note_id = ? AND format = ?",
+            [(now, note_id, format) for note_id in note_ids],
+        )
+
+    def _now(self) -> float:
+        """Return current time for access times; strictly increasing so LRU order is exact"""
+        self._last_access = max(time.time(), self._last_access + 1e-6)
+        return self._last_access
+
+    def _size(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM conversions"
+        ).fetchone()[0]
+
+    def _evict(self):
+        """Evict least recently used renderings if cache is larger than max_size"""
+        size = self._size()
+        if size <= self.max_size:
+            return
+        target = self.max_size * CONVERSION_CACHE_EVICT_TO
+        evict = []
+        for note_id, format, entry_size in self._conn.execute(
+            "SELECT note_id, format, size FROM conversions ORDER BY accessed"
+        ).fetchall():
+            if size <= target:
+                break
+            evict.append((note_id, format))
+            size -= entry_size
+        logger.debug(f"Evicting {len(evict)} renderings from conversion cache")
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "DELETE FROM conversions WHERE note_id = ? AND format = ?", evict
+        )
+        self._conn.execute("COMMIT")
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join("?" * len(values))
+
+
+_conversion_cache: ConversionCache | None = None
+
+
+def get_conversion_cache() -> ConversionCache:
+    """Return the shared ConversionCache"""
+    global _conversion_cache
+    if _conversion_cache is None:
+        _conversion_cache = ConversionCache()
+    return _conversion_cache
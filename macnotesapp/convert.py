@@ -0,0 +1,276 @@
+"""Convert note bodies between HTML and other formats"""
+
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+
+import markdown2
+from markdownify import markdownify
+
+# version of convert_notes_html() output; increment when the Markdown it produces changes
+# so renderings saved by the conversion cache are regenerated
+CONVERTER_VERSION = "1"
+
+# extra features to support for Markdown to HTML conversion with markdown2
+MARKDOWN_EXTRAS = ["fenced-code-blocks", "footnotes", "tables"]
+
+# tags Notes.app uses in note bodies that convert_notes_html() handles;
+# a body containing any other tag is converted with markdownify
+NOTES_HTML_BLOCK_TAGS = {"div", "h1", "h2", "h3", "ul", "ol", "li"}
+NOTES_HTML_INLINE_TAGS = {"b", "i", "u", "tt", "a", "br", "img", "object", "span"}
+NOTES_HTML_TAGS = (
+    NOTES_HTML_BLOCK_TAGS | NOTES_HTML_INLINE_TAGS | {"html", "body", "strong", "em"}
+)
+
+# Markdown emphasis for inline tags
+_EMPHASIS = {"b": "**", "strong": "**", "i": "*", "em": "*", "tt": "`"}
+
+_INLINE_TAGS = {*_EMPHASIS, "a"}
+
+# bullets used for unordered lists at each level of nesting (same as markdownify)
+_BULLETS = "*+-"
+
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+_TAG = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)")
+
+
+class UnsupportedHTMLError(ValueError):
+    """HTML contains a tag not in the subset of HTML used by Notes.app"""
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert HTML body of a note to Markdown
+
+    Bodies that only use the HTML tags Notes.app produces are converted with
+    convert_notes_html(); anything else is converted with markdownify.
+
+    Args:
+        html: HTML to convert
+
+    Returns:
+        Markdown text
+    """
+    if is_notes_html(html):
+        try:
+            return convert_notes_html(html)
+        except UnsupportedHTMLError:
+            pass
+    return markdownify(html)
+
+
+def is_notes_html(html: str) -> bool:
+    """Return True if html only uses tags in NOTES_HTML_TAGS and can be converted with convert_notes_html()"""
+    return {tag.lower() for tag in _TAG.findall(html)} <= NOTES_HTML_TAGS
+
+
+def convert_notes_html(html: str) -> str:
+    """Convert HTML body of a note to Markdown in a single pass
+
+    Only handles the subset of HTML used by Notes.app (see NOTES_HTML_TAGS):
+    each <div> is a paragraph, <h1>/<h2> are underlined headings and <h3> an ATX
+    heading, lists are indented by nesting level, <b>/<i>/<tt> become **bold**,
+    *italic* and `code`, <u> is dropped (Markdown has no underline) and <a>/<img>
+    become links and images.
+
+    Args:
+        html: HTML to convert
+
+    Returns:
+        Markdown text
+
+    Raises:
+        UnsupportedHTMLError: if html contains a tag not in NOTES_HTML_TAGS
+    """
+    converter = _NotesHTMLConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
+
+
+def markdown_to_html(text: str) -> str:
+    """Convert Markdown text to HTML suitable for the body of a note"""
+    return markdown2.markdown(text, extras=MARKDOWN_EXTRAS)
+
+
+def plaintext_to_html(text: str) -> str:
+    """Convert plain text to HTML suitable for the body of a note; each line becomes a <div>"""
+    return "".join(f"<div>{line or '<br>'}</div>\n" for line in text.split("\n"))
+
+
+class _NotesHTMLConverter(HTMLParser):
+    """HTMLParser that converts the HTML subset used by Notes.app to Markdown as it parses
+
+    Text is collected into the current line; each block tag ends the line and
+    appends it to the list of blocks. List items are joined with a single newline
+    in the same list and all other blocks with a blank line.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._blocks: list[tuple[str, int | None]] = []
+        self._line: list[str] = []
+        self._inline: list[tuple[str, int, dict[str, str | None]]] = []
+        self._lists: list[list] = []
+        self._item_prefix: str | None = None
+        self._list_count = 0
+        self._code = 0
+
+    def markdown(self) -> str:
+        """Return the converted Markdown"""
+        self._end_line()
+        parts = []
+        previous_list = None
+        for text, list_number in self._blocks:
+            if parts:
+                same_list = list_number is not None and list_number == previous_list
+                parts.append("\n" if same_list else "\n\n")
+            parts.append(text)
+            previous_list = list_number
+        return "".join(parts)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if tag not in NOTES_HTML_TAGS:
+            raise UnsupportedHTMLError(f"Unsupported tag <{tag}>")
+        if tag in NOTES_HTML_BLOCK_TAGS:
+            self._end_line()
+            if tag in ("ul", "ol"):
+                if not self._lists:
+                    self._list_count += 1
+                self._lists.append([tag, 0])
+            elif tag == "li" and self._lists:
+                self._lists[-1][1] += 1
+                tag_, count = self._lists[-1]
+                marker = (
+                    f"{count}. "
+                    if tag_ == "ol"
+                    else f"{_BULLETS[(len(self._lists) - 1) % len(_BULLETS)]} "
+                )
+                self._item_prefix = self._list_indent() + marker
+            elif tag in ("h1", "h2", "h3"):
+                self._inline.append((tag, 0, {}))
+        elif tag == "br":
+            self._line.append("  \n")
+        elif tag == "img":
+            attributes = dict(attrs)
+            alt = _escape(attributes.get("alt") or "")
+            self._line.append(f"![{alt}]({attributes.get('src') or ''})")
+        elif tag in _INLINE_TAGS:
+            self._start_inline(tag, dict(attrs))
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self.handle_starttag(tag, attrs)
+        if tag not in ("br", "img"):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag not in NOTES_HTML_TAGS:
+            raise UnsupportedHTMLError(f"Unsupported tag </{tag}>")
+        if tag in ("h1", "h2", "h3"):
+            self._end_heading(tag)
+        elif tag in NOTES_HTML_BLOCK_TAGS:
+            self._end_line()
+            if tag in ("ul", "ol") and self._lists:
+                self._lists.pop()
+            if tag == "li":
+                self._item_prefix = None
+        elif tag in _INLINE_TAGS:
+            self._end_inline(tag)
+
+    def handle_data(self, data: str):
+        text = _WHITESPACE.sub(" ", data)
+        if not self._line or self._line[-1].endswith((" ", "\n")):
+            text = text.lstrip(" ")
+        if text:
+            self._line.append(text if self._code else _escape(text))
+
+    def _start_inline(self, tag: str, attrs: dict[str, str | None]):
+        """Start emphasis or link at current position in line"""
+        self._inline.append((tag, len(self._line), attrs))
+        if tag == "tt":
+            self._code += 1
+
+    def _end_inline(self, tag: str):
+        """Wrap text since matching start tag in Markdown for tag"""
+        for index in range(len(self._inline) - 1, -1, -1):
+            if self._inline[index][0] == tag:
+                break
+        else:
+            return
+        _, start, attrs = self._inline.pop(index)
+        if tag == "tt":
+            self._code -= 1
+        text = "".join(self._line[start:])
+        del self._line[start:]
+        core = text.strip(" \n")
+        if not core:
+            self._line.append(text)
+            return
+        leading = text[: len(text) - len(text.lstrip(" \n"))]
+        trailing = text[len(text.rstrip(" \n")) :]
+        if tag == "a":
+            href = attrs.get("href")
+            if not href:
+                markdown = core
+            elif core == _escape(href):
+                markdown = f"<{href}>"
+            else:
+                markdown = f"[{core}]({href})"
+        elif any(
+            t == tag or _EMPHASIS.get(t) == _EMPHASIS[tag] for t, *_ in self._inline
+        ):
+            # already inside same emphasis
+            markdown = core
+        else:
+            markdown = f"{_EMPHASIS[tag]}{core}{_EMPHASIS[tag]}"
+        self._line.append(f"{leading}{markdown}{trailing}")
+
+    def _end_heading(self, tag: str):
+        """End heading and add it to blocks"""
+        self._inline = [item for item in self._inline if item[0] != tag]
+        text = self._line_text().strip()
+        self._line = []
+        if not text:
+            return
+        text = " ".join(line.strip() for line in text.split("\n"))
+        if tag == "h3":
+            self._blocks.append((f"### {text}", None))
+        else:
+            self._blocks.append(
+                (f"{text}\n{('=' if tag == 'h1' else '-') * len(text)}", None)
+            )
+
+    def _end_line(self):
+        """Add current line to blocks if it has any text"""
+        # emphasis or a link can't span blocks in Markdown so any still open
+        # are closed at the end of the line and reopened on the next line
+        still_open = [item for item in self._inline if item[0] in _INLINE_TAGS]
+        for tag, *_ in reversed(still_open):
+            self._end_inline(tag)
+        # strip spaces and line breaks from <br> at start and end of line
+        text = self._line_text().strip(" \n")
+        self._line = []
+        for tag, _, attrs in still_open:
+            self._start_inline(tag, attrs)
+        if not text:
+            return
+        if self._lists:
+            indent = self._list_indent() + "  " * bool(self._item_prefix is None)
+            prefix = self._item_prefix if self._item_prefix is not None else indent
+            self._item_prefix = None
+            text = prefix + text.replace("\n", "\n" + " " * len(prefix))
+            self._blocks.append((text, self._list_count))
+        else:
+            self._blocks.append((text, None))
+
+    def _line_text(self) -> str:
+        return "".join(self._line)
+
+    def _list_indent(self) -> str:
+        """Return indent for items of the innermost list"""
+        return "  " * (len(self._lists) - 1)
+
+
+def _escape(text: str) -> str:
+    """Escape characters in text that would be interpreted as Markdown emphasis (as markdownify does)"""
+    return text.replace("*", r"\*").replace("_", r"\_")
@@ -0,0 +1,176 @@
+"""Find near-duplicate notes with MinHash signatures and locality-sensitive hashing
+
+Comparing every pair of notes is quadratic so each note's plaintext is reduced to a
+MinHash signature of its character shingles: the fraction of positions at which two
+signatures agree estimates the Jaccard similarity of the notes' shingle sets.
+Signatures use one-permutation hashing (each shingle is hashed once and assigned to
+one of the signature's bins) so computing them is linear in the length of the text.
+Signatures are split into bands and notes that share all the values of any band are
+candidate duplicates; only candidates are compared and pairs at least as similar as
+the threshold are merged into clusters with union-find.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .utils import executor_chunksize
+
+# number of values in each MinHash signature
+MINHASH_SIZE = 128
+
+# number of LSH bands signatures are split into; MINHASH_SIZE must be a multiple.
+# Notes with similarity s become candidates with probability 1 - (1 - s^r)^b where
+# r = MINHASH_SIZE / LSH_BANDS rows per band: > 0.99 for s = 0.8 and < 0.05 for s = 0.4
+LSH_BANDS = 16
+
+# number of characters in each shingle
+SHINGLE_SIZE = 5
+
+# default min estimated similarity for notes to be reported as duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# number of notes below which signatures are computed in the calling process
+DUPES_PROCESS_POOL_THRESHOLD = 500
+
+_EMPTY = (1 << 64) - 1
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class DuplicateCluster:
+    """A group of notes whose plaintext is nearly identical
+
+    Attributes:
+        ids: ids of notes in the cluster in the order they were passed to find_duplicates()
+        similarities: estimated similarity of each note to the first note in the cluster (1.0 for the first)
+    """
+
+    ids: list[str]
+    similarities: list[float] = field(default_factory=list)
+
+
+def minhash_signature(text: str, size: int = MINHASH_SIZE) -> list[int] | None:
+    """Return MinHash signature of the shingles of text or None if text is too short to have a shingle
+
+    Text is case-folded and runs of whitespace are collapsed before shingling.
+    """
+    text = _WHITESPACE.sub(" ", text or "").strip().casefold()
+    if len(text) < SHINGLE_SIZE:
+        return None
+    bins = [_EMPTY] * size
+    for shingle in {
+        text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)
+    }:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        index = value % size
+        value //= size
+        if value < bins[index]:
+            bins[index] = value
+    # densify: an empty bin takes the value of the next non-empty bin (wrapping
+    # around), offset by the distance to it, so that short texts that leave bins
+    # empty still have signatures that can be compared position by position
+    if _EMPTY in bins:
+        offset = _EMPTY // size + 1
+        filled = [bins[i] for i in range(size)]
+        for i in range(size):
+            if filled[i] == _EMPTY:
+                distance = 1
+                while filled[(i + distance) % size] == _EMPTY:
+                    distance += 1
+                bins[i] = filled[(i + distance) % size] + distance * offset
+    return bins
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Return estimated Jaccard similarity of two MinHash signatures"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def find_duplicates(
+    ids: list[str],
+    texts: list[str],
+    threshold: float = DUPLICATE_THRESHOLD,
+    max_workers: int | None = None,
+) -> list[DuplicateCluster]:
+    """Return clusters of near-duplicate texts
+
+    Args:
+        ids: id of each text
+        texts: plaintext of each note
+        threshold: min estimated similarity for two texts to be duplicates
+        max_workers: max number of worker processes used to compute signatures
+
+    Returns:
+        list of DuplicateCluster, each with at least two notes, largest first
+    """
+    if len(texts) < DUPES_PROCESS_POOL_THRESHOLD:
+        signatures = [minhash_signature(text) for text in texts]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            signatures = list(
+                executor.map(
+                    minhash_signature,
+                    texts,
+                    chunksize=executor_chunksize(len(texts)),
+                )
+            )
+
+    parents = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i, j in _candidate_pairs(signatures):
+        if similarity(signatures[i], signatures[j]) >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                # the root is the earliest text so it is first in the cluster
+                parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    members: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        if signatures[i] is not None:
+            members.setdefault(find(i), []).append(i)
+    clusters = [
+        DuplicateCluster(
+            ids=[ids[i] for i in indices],
+            similarities=[
+                similarity(signatures[indices[0]], signatures[i]) for i in indices
+            ],
+        )
+        for indices in members.values()
+        if len(indices) > 1
+    ]
+    return sorted(clusters, key=lambda cluster: len(cluster.ids), reverse=True)
+
+
+def _candidate_pairs(
+    signatures: list[list[int] | None], bands: int = LSH_BANDS
+) -> Iterable[tuple[int, int]]:
+    """Yield each pair (i, j), i < j, of signatures that share all values of at least one band"""
+    rows = len(next((s for s in signatures if s is not None), [])) // bands
+    if not rows:
+        return
+    seen = set()
+    for band in range(bands):
+        buckets: dict[tuple[int, ...], list[int]] = {}
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                key = tuple(signature[band * rows : (band + 1) * rows])
+                buckets.setdefault(key, []).append(i)
+        for bucket in buckets.values():
+            for n, i in enumerate(bucket):
+                for j in bucket[n + 1 :]:
+                    if (i, j) not in seen:
+                        seen.add((i, j))
+                        yield i, j
@@ -0,0 +1,516 @@
+"""Export notes from Notes.app to a directory tree of Markdown or HTML files"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from .conversion_cache import FORMAT_MARKDOWN, get_conversion_cache
+from .convert import html_to_markdown
+from .logging import logger
+from .notesapp import Attachment, NotesApp, NotesList
+from .utils import PROCESS_POOL_THRESHOLD, executor_chunksize, write_file_atomic
+
+EXPORT_FORMAT_MARKDOWN = "markdown"
+EXPORT_FORMAT_HTML = "html"
+EXPORT_FORMATS = [EXPORT_FORMAT_MARKDOWN, EXPORT_FORMAT_HTML]
+EXPORT_EXTENSIONS = {EXPORT_FORMAT_MARKDOWN: ".md", EXPORT_FORMAT_HTML: ".html"}
+
+MANIFEST_FILENAME = ".macnotesapp_export.json"
+MANIFEST_VERSION = 1
+
+# number of notes written between manifest checkpoints
+CHECKPOINT_INTERVAL = 100
+
+# if fewer than 1/N of the notes in an account need exporting,
+# fetch their bodies one at a time instead of fetching the whole body column
+BULK_BODY_FRACTION = 10
+
+ATTACHMENTS_DIRECTORY = "_attachments"
+ATTACHMENTS_MANIFEST_FILENAME = "manifest.json"
+
+# default number of threads used to save attachments
+ATTACHMENT_WORKERS = 4
+
+# characters that are not safe to use in file or directory names
+_UNSAFE_FILENAME_CHARS = re.compile(r'[/\\:*?"<>|\x00-\x1f]')
+# most file systems, including APFS, limit a file name to 255 bytes of UTF-8
+MAX_FILENAME_BYTES = 255
+
+
+@dataclass
+class ExportResults:
+    """Results of an export"""
+
+    exported: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.exported + self.skipped
+
+
+@dataclass
+class AttachmentExportResults:
+    """Results of an attachment export"""
+
+    saved: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: int = 0
+
+
+class ExportManifest:
+    """Checkpoint manifest recording which notes have been exported to a directory
+
+    The manifest is stored as JSON in the export directory and is saved periodically
+    during an export so that an interrupted export can be resumed.
+    """
+
+    def __init__(self, directory: str | os.PathLike, format: str):
+        self.directory = pathlib.Path(directory)
+        self.path = self.directory / MANIFEST_FILENAME
+        self.format = format
+        self.complete = False
+        self.notes: dict[str, dict[str, str]] = {}
+        self._load()
+
+    def is_current(self, note_id: str, modification_date: datetime) -> bool:
+        """Return True if note was already exported with same modification date and file still exists"""
+        if not (record := self.notes.get(note_id)):
+            return False
+        return (
+            record["modification_date"] == modification_date.isoformat()
+            and (self.directory / record["path"]).is_file()
+        )
+
+    def path_for(self, note_id: str) -> str | None:
+        """Return path, relative to export directory, that note was previously exported to"""
+        if record := self.notes.get(note_id):
+            return record["path"]
+        return None
+
+    def record(self, note_id: str, path: str, modification_date: datetime):
+        """Record that note was exported to path"""
+        self.notes[note_id] = {
+            "path": path,
+            "modification_date": modification_date.isoformat(),
+        }
+
+    def remove(self, note_id: str) -> str | None:
+        """Remove note from manifest and return path, relative to export directory, it was exported to"""
+        if record := self.notes.pop(note_id, None):
+            return record["path"]
+        return None
+
+    def save(self, complete: bool = False):
+        """Save manifest to export directory
+
+        Args:
+            complete: True if export finished; False if this is a checkpoint
+        """
+        self.complete = complete
+        data = {
+            "version": MANIFEST_VERSION,
+            "format": self.format,
+            "complete": complete,
+            "notes": self.notes,
+        }
+        write_file_atomic(self.path, json.dumps(data))
+
+    def _load(self):
+        """Load manifest from export directory if it exists and matches the export format"""
+        if not self.path.is_file():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable export manifest {self.path}: {e}")
+            return
+        if data.get("version") != MANIFEST_VERSION or data.get("format") != self.format:
+            # exported with a different format; everything needs to be exported again
+            return
+        self.complete = data.get("complete", False)
+        self.notes = data.get("notes", {})
+
+
+def export_notes(
+    notesapp: NotesApp,
+    directory: str | os.PathLike,
+    format: str = EXPORT_FORMAT_MARKDOWN,
+    accounts: list[str] | None = None,
+    incremental: bool = False,
+    max_workers: int | None = None,
+    progress: Callable[[int], None] | None = None,
+    use_cache: bool = True,
+    prune: bool = True,
+) -> ExportResults:
+    """Export notes to directory as one file per note laid out as account/folder/name
+
+    Notes are fetched in bulk for each account, converted in a process pool, and
+    each file is written atomically. A checkpoint manifest is saved in directory
+    as the export proceeds; if a previous export to directory was interrupted,
+    notes already exported are skipped.
+
+    When the export completes, files previously exported for notes that are no longer
+    in an exported account are deleted (unless prune is False) so the directory
+    matches Notes.app. Only files recorded in the manifest are deleted and an account
+    that lists no notes is left alone in case it could not be read.
+
+    Args:
+        notesapp: NotesApp instance
+        directory: directory to export to; will be created if necessary
+        format: one of EXPORT_FORMATS
+        accounts: optional list of account names to export; default is all accounts
+        incremental: if True, skip notes whose modification date has not changed since last export
+        max_workers: max number of worker processes used for conversion
+        progress: optional callable called with number of notes processed after each note
+        use_cache: if True, use Markdown from the conversion cache for unchanged notes
+            and add newly converted notes to the cache
+        prune: if True, delete files of notes that were deleted from Notes.app since they were exported
+
+    Returns:
+        ExportResults with count of notes exported, skipped, and deleted
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format {format}; must be one of {EXPORT_FORMATS}")
+
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = ExportManifest(directory, format)
+
+    # if the last export was interrupted, resume it; otherwise only skip unchanged notes
+    # if doing an incremental export
+    skip_current = incremental or (bool(manifest.notes) and not manifest.complete)
+    results = ExportResults()
+    # keys of paths used by exported notes; see _path_key()
+    used_paths = {_path_key(record["path"]) for record in manifest.notes.values()}
+    since_checkpoint = 0
+    # ids of notes in exported accounts and directories of accounts that listed notes
+    listed_ids: set[str] = set()
+    listed_accounts: set[str] = set()
+    conversion_cache = (
+        get_conversion_cache()
+        if use_cache and format == EXPORT_FORMAT_MARKDOWN
+        else None
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for account_name in accounts or notesapp.accounts:
+            noteslist = notesapp.noteslist(accounts=[account_name])
+            ids = noteslist.id
+            names = noteslist.name
+            folders = noteslist.folder
+            modification_dates = noteslist.modification_date
+            listed_ids.update(ids)
+            if ids:
+                listed_accounts.add(_path_key(sanitize_filename(account_name)))
+
+            to_export = [
+                i
+                for i, note_id in enumerate(ids)
+                if not (
+                    skip_current and manifest.is_current(note_id, modification_dates[i])
+                )
+            ]
+            results.skipped += len(ids) - len(to_export)
+            if progress and len(ids) > len(to_export):
+                progress(len(ids) - len(to_export))
+            if not to_export:
+                continue
+
+            cached = (
+                conversion_cache.get_many(
+                    ((ids[i], modification_dates[i]) for i in to_export),
+                    FORMAT_MARKDOWN,
+                )
+                if conversion_cache is not None
+                else {}
+            )
+            to_convert = [i for i in to_export if ids[i] not in cached]
+            bodies = (
+                _fetch_bodies(notesapp, account_name, noteslist, ids, to_convert)
+                if to_convert
+                else []
+            )
+            converted = iter(_convert_bodies(executor, bodies, format))
+            new_renderings = []
+            for i in to_export:
+                note_id = ids[i]
+                if note_id in cached:
+                    content = cached[note_id]
+                else:
+                    content = next(converted)
+                    new_renderings.append((note_id, modification_dates[i], content))
+                previous_path = manifest.path_for(note_id)
+                if previous_path:
+                    used_paths.discard(_path_key(previous_path))
+                relative_path = _unique_path(
+                    used_paths,
+                    account_name,
+                    folders[i],
+                    names[i] or note_id.rsplit("/", 1)[-1],
+                    EXPORT_EXTENSIONS[format],
+                )
+                used_key = _path_key(relative_path)
+                used_paths.add(used_key)
+                # if the note was renamed or moved since last export, delete the old file;
+                # if the paths differ only in case they may name the same file so delete
+                # it before writing rather than after
+                renamed = previous_path is not None and previous_path != relative_path
+                if renamed and _path_key(previous_path) == used_key:
+                    _remove_exported_file(directory, previous_path)
+                write_file_atomic(directory / relative_path, content)
+                if renamed and _path_key(previous_path) != used_key:
+                    _remove_exported_file(directory, previous_path)
+                manifest.record(note_id, relative_path, modification_dates[i])
+                results.exported += 1
+                if progress:
+                    progress(1)
+
+                since_checkpoint += 1
+                if since_checkpoint >= CHECKPOINT_INTERVAL:
+                    manifest.save()
+                    since_checkpoint = 0
+            if conversion_cache is not None:
+                conversion_cache.put_many(new_renderings, FORMAT_MARKDOWN)
+
+    if prune:
+        deleted_paths = [
+            manifest.remove(note_id)
+            for note_id, record in list(manifest.notes.items())
+            if note_id not in listed_ids
+            and _path_key(pathlib.Path(record["path"]).parts[0]) in listed_accounts
+        ]
+        # never delete a file that a note still in Notes.app was exported to
+        live_paths = {_path_key(record["path"]) for record in manifest.notes.values()}
+        for path in deleted_paths:
+            if _path_key(path) not in live_paths:
+                _remove_exported_file(directory, path)
+        results.deleted += len(deleted_paths)
+    manifest.save(complete=True)
+    return results
+
+
+def export_attachments(
+    noteslist: NotesList,
+    directory: str | os.PathLike,
+    max_workers: int = ATTACHMENT_WORKERS,
+    progress: Callable[[int], None] | None = None,
+) -> AttachmentExportResults:
+    """Export attachments of all notes in noteslist to a content-addressed directory
+
+    Attachments are saved on a bounded thread pool and stored by SHA-256 hash of
+    their contents as directory/objects/ab/abcdef....ext so attachments shared by
+    many notes are only stored once. directory/manifest.json maps each note ID to
+    its attachments. Attachments already recorded in the manifest are skipped.
+
+    Args:
+        noteslist: NotesList of notes whose attachments should be exported
+        directory: directory to export attachments to; will be created if necessary
+        max_workers: max number of threads used to save attachments
+        progress: optional callable called with number of attachments processed after each attachment
+
+    Returns:
+        AttachmentExportResults with count of attachments saved, deduplicated, skipped, and failed
+    """
+    directory = pathlib.Path(directory)
+    objects_directory = directory / "objects"
+    objects_directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / ATTACHMENTS_MANIFEST_FILENAME
+    manifest = _load_attachments_manifest(manifest_path)
+    exported = {
+        record["id"]: record
+        for records in manifest["notes"].values()
+        for record in records
+        if (directory / record["path"]).is_file()
+    }
+
+    results = AttachmentExportResults()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for note_id, attachments in zip(noteslist.id, noteslist.attachments):
+            manifest["notes"][note_id] = []
+            for attachment in attachments:
+                if attachment.id in exported:
+                    manifest["notes"][note_id].append(exported[attachment.id])
+                    results.skipped += 1
+                    if progress:
+                        progress(1)
+                    continue
+                future = executor.submit(_save_attachment, attachment, directory)
+                futures[future] = note_id
+
+        for future, note_id in futures.items():
+            try:
+                record, is_duplicate = future.result()
+            except Exception as e:
+                logger.warning(f"Error saving attachment for note {note_id}: {e}")
+                results.errors += 1
+            else:
+                manifest["notes"][note_id].append(record)
+                if is_duplicate:
+                    results.duplicates += 1
+                else:
+                    results.saved += 1
+            if progress:
+                progress(1)
+
+    write_file_atomic(manifest_path, json.dumps(manifest))
+    return results
+
+
+def _save_attachment(
+    attachment: Attachment, directory: pathlib.Path
+) -> tuple[dict[str, str], bool]:
+    """Save attachment into content-addressed objects directory
+
+    Returns:
+        tuple of manifest record for attachment and True if attachment contents were already stored
+    """
+    name = attachment.name or attachment.id.rsplit("/", 1)[-1]
+    temp_directory = tempfile.mkdtemp(dir=directory, prefix=".")
+    try:
+        # Attachment.save() uses the attachment name as the file name
+        saved_path = pathlib.Path(attachment.save(temp_directory))
+        digest = _hash_file(saved_path)
+        relative_path = str(
+            pathlib.Path("objects", digest[:2], f"{digest}{saved_path.suffix.lower()}")
+        )
+        object_path = directory / relative_path
+        is_duplicate = object_path.exists()
+        if not is_duplicate:
+            object_path.parent.mkdir(exist_ok=True)
+            os.replace(saved_path, object_path)
+    finally:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+    return {
+        "id": attachment.id,
+        "name": name,
+        "sha256": digest,
+        "path": relative_path,
+    }, is_duplicate
+
+
+def _hash_file(path: pathlib.Path) -> str:
+    """Return SHA-256 hex digest of file contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        while chunk := fp.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_attachments_manifest(path: pathlib.Path) -> dict[str, Any]:
+    """Load attachments manifest from path or return a new empty manifest"""
+    if path.is_file():
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable attachments manifest {path}: {e}")
+    return {"version": MANIFEST_VERSION, "notes": {}}
+
+
+def sanitize_filename(name: str, reserve: int = 0) -> str:
+    """Return name with characters that are unsafe for file names replaced with '_'
+
+    Args:
+        name: name to sanitize
+        reserve: number of bytes to leave free for a suffix such as an extension;
+            name is truncated to MAX_FILENAME_BYTES - reserve bytes of UTF-8
+    """
+    name = _UNSAFE_FILENAME_CHARS.sub("_", name).strip().lstrip(".")
+    encoded = name.encode("utf-8")
+    if len(encoded) > MAX_FILENAME_BYTES - reserve:
+        # drop any character split by the cut
+        name = encoded[: MAX_FILENAME_BYTES - reserve].decode("utf-8", "ignore")
+    return name or "_"
+
+
+def _path_key(path: str) -> str:
+    """Return key for path that is the same for paths that name the same file
+    on a case-insensitive, normalization-insensitive file system such as APFS"""
+    return unicodedata.normalize("NFC", path).casefold()
+
+
+def _unique_path(
+    used_paths: set[str], account: str, folder: str | None, name: str, ext: str
+) -> str:
+    """Return path relative to export directory for a note that does not collide with a used path
+
+    Args:
+        used_paths: keys, as returned by _path_key(), of paths already used
+        account: account name
+        folder: folder name
+        name: note name
+        ext: file extension including the leading '.'
+    """
+    parent = pathlib.Path(sanitize_filename(account), sanitize_filename(folder or "_"))
+    suffix = ext
+    count = 1
+    while True:
+        stem = sanitize_filename(name, reserve=len(suffix.encode("utf-8")))
+        path = str(parent / f"{stem}{suffix}")
+        if _path_key(path) not in used_paths:
+            return path
+        count += 1
+        suffix = f" ({count}){ext}"
+
+
+def _remove_exported_file(directory: pathlib.Path, relative_path: str):
+    """Delete exported file and any folders left empty, up to directory"""
+    path = directory / relative_path
+    path.unlink(missing_ok=True)
+    for parent in path.parents:
+        if parent == directory:
+            break
+        try:
+            parent.rmdir()
+        except OSError:
+            # not empty
+            break
+
+
+def _fetch_bodies(
+    notesapp: NotesApp,
+    account_name: str,
+    noteslist,
+    ids: list[str],
+    indices: list[int],
+) -> list[str]:
+    """Return bodies of notes at indices of noteslist
+
+    Fetches the whole body column in one call unless only a small fraction of the
+    notes are needed in which case the bodies are fetched individually.
+    """
+    if len(indices) * BULK_BODY_FRACTION >= len(ids):
+        bodies = noteslist.body
+        return [bodies[i] for i in indices]
+    account = notesapp.account(account_name)
+    return [account.note(ids[i]).body for i in indices]
+
+
+def _convert_bodies(
+    executor: ProcessPoolExecutor, bodies: list[str], format: str
+) -> Iterable[str]:
+    """Yield converted bodies in order, converting in executor if there are enough to be worthwhile"""
+    if format == EXPORT_FORMAT_HTML:
+        return bodies
+    if len(bodies) < PROCESS_POOL_THRESHOLD:
+        return map(html_to_markdown, bodies)
+    return executor.map(
+        html_to_markdown, bodies, chunksize=executor_chunksize(len(bodies))
+    )
@@ -0,0 +1,126 @@
+"""Search the plaintext of notes with a regular expression
+
+NSPredicate can only search for substrings so notes are searched locally: the plaintext
+of the notes is read once (see NotesList.grep()) and searched line by line, in a pool
+of worker processes if there is enough text for it to be worthwhile.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Generator, Iterable
+
+# total characters of text below which notes are searched in the calling process
+GREP_PROCESS_POOL_THRESHOLD = 2_000_000
+
+# number of notes sent to a worker process at a time
+GREP_CHUNK_SIZE = 64
+
+
+@dataclass
+class GrepResult:
+    """Lines of a note that matched a pattern
+
+    Attributes:
+        id: id of note
+        name: name of note
+        lines: lines of the note's plaintext
+        matches: indices into lines of lines that matched, in order
+    """
+
+    id: str
+    name: str
+    lines: list[str]
+    matches: list[int]
+
+    def blocks(self, context: int = 0) -> list[tuple[int, int]]:
+        """Return list of (start, end) ranges of lines to show for matches with context lines before and after
+
+        Overlapping or adjacent ranges are merged as grep does.
+        """
+        blocks = []
+        for index in self.matches:
+            start = max(0, index - context)
+            end = min(len(self.lines), index + context + 1)
+            if blocks and start <= blocks[-1][1]:
+                blocks[-1] = (blocks[-1][0], max(blocks[-1][1], end))
+            else:
+                blocks.append((start, end))
+        return blocks
+
+
+def grep_texts(
+    pattern: str | re.Pattern,
+    ids: list[str],
+    names: list[str],
+    texts: list[str],
+    ignore_case: bool = False,
+    max_workers: int | None = None,
+) -> Generator[GrepResult, None, None]:
+    """Search texts for pattern, yielding a GrepResult for each text with a matching line as soon as it is found
+
+    Args:
+        pattern: regular expression to search for
+        ids: id of the note for each text
+        names: name of the note for each text
+        texts: plaintext of each note
+        ignore_case: if True, match case-insensitively
+        max_workers: max number of worker processes; default is number of CPUs
+
+    Yields:
+        GrepResult for each note with at least one matching line, in the order of texts
+
+    Raises:
+        re.error: if pattern is not a valid regular expression
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags | flags
+    # raise any error in pattern here rather than in a worker
+    re.compile(pattern, flags)
+
+    texts = [text or "" for text in texts]
+    chunks = [
+        texts[start : start + GREP_CHUNK_SIZE]
+        for start in range(0, len(texts), GREP_CHUNK_SIZE)
+    ]
+    if sum(len(text) for text in texts) < GREP_PROCESS_POOL_THRESHOLD:
+        results = (_grep_chunk(pattern, flags, chunk) for chunk in chunks)
+        yield from _results(ids, names, texts, results)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            _grep_chunk,
+            [pattern] * len(chunks),
+            [flags] * len(chunks),
+            chunks,
+        )
+        yield from _results(ids, names, texts, results)
+
+
+def _results(
+    ids: list[str],
+    names: list[str],
+    texts: list[str],
+    chunk_matches: Iterable[list[list[int]]],
+) -> Generator[GrepResult, None, None]:
+    """Yield GrepResult for each text with matches from the matching line indices of each chunk"""
+    index = 0
+    for matches in chunk_matches:
+        for note_matches in matches:
+            if note_matches:
+                yield GrepResult(
+                    ids[index], names[index], texts[index].splitlines(), note_matches
+                )
+            index += 1
+
+
+def _grep_chunk(pattern: str, flags: int, texts: list[str]) -> list[list[int]]:
+    """Return indices of lines that match pattern for each text; runs in a worker process"""
+    regex = re.compile(pattern, flags)
+    return [
+        [i for i, line in enumerate(text.splitlines()) if regex.search(line)]
+        for text in texts
+    ]
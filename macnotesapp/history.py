@@ -0,0 +1,352 @@
+"""Local history of the names and bodies of notes
+
+Notes.app does not expose earlier versions of a note so, when asked to, the history store
+records the current version of notes whose modification date changed since they were
+last recorded. Versions are stored in a SQLite database in the data directory. Each
+version is stored as a compressed delta against the previous version of the note so the
+store grows with the size of the edits rather than with the size of the note; every
+HISTORY_MAX_CHAIN versions (or when the delta would be no smaller) a version is stored in
+full so reading any version applies at most HISTORY_MAX_CHAIN deltas.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable
+
+from .logging import logger
+from .utils import get_data_dir
+
+if TYPE_CHECKING:
+    from .notesapp import Note, NotesApp
+
+HISTORY_FILENAME = "history.sqlite"
+
+# max number of deltas between a version and the nearest version stored in full
+HISTORY_MAX_CHAIN = 16
+
+# max number of SQL variables used in a single query
+_SQL_CHUNK_SIZE = 500
+
+# bodies are diffed in chunks that end at a line break or the end of an HTML tag
+_CHUNK = re.compile(r"[^\n>]*[\n>]|[^\n>]+$")
+
+
+@dataclass(frozen=True)
+class NoteVersion:
+    """A recorded version of a note
+
+    Attributes:
+        version: id of version; versions recorded later have larger ids
+        note_id: id of note
+        name: name of note in this version
+        modification_date: modification date of note in this version
+        recorded: when this version was recorded
+        size: size in bytes of the body of this version
+        stored: number of bytes used to store this version
+    """
+
+    version: int
+    note_id: str
+    name: str
+    modification_date: datetime
+    recorded: datetime
+    size: int
+    stored: int
+
+
+def make_delta(old: str, new: str) -> bytes:
+    """Return compressed delta that turns old into new (see apply_delta())
+
+    The delta is a list of [start, end] ranges of old to copy and strings to insert.
+    """
+    old_chunks, new_chunks = _CHUNK.findall(old), _CHUNK.findall(new)
+    offsets = [0]
+    for chunk in old_chunks:
+        offsets.append(offsets[-1] + len(chunk))
+    ops: list[list[int] | str] = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(
+        None, old_chunks, new_chunks, autojunk=False
+    ).get_opcodes():
+        if tag == "equal":
+            ops.append([offsets[i1], offsets[i2]])
+        elif j1 < j2:
+            ops.append("".join(new_chunks[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    """Return text produced by applying delta from make_delta() to old"""
+    return "".join(
+        op if isinstance(op, str) else old[op[0] : op[1]]
+        for op in json.loads(zlib.decompress(delta))
+    )
+
+
+class HistoryStore:
+    """SQLite store of versions of notes, each stored as a delta against the previous version"""
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        """Create HistoryStore
+
+        Args:
+            path: path to SQLite database; default is history.sqlite in data directory
+        """
+        self.path = pathlib.Path(path) if path else get_data_dir() / HISTORY_FILENAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=10, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS notes (
+                note_id TEXT PRIMARY KEY,
+                account TEXT,
+                modification_date REAL NOT NULL,
+                head INTEGER NOT NULL
+            )""")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS versions (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                modification_date REAL NOT NULL,
+                recorded REAL NOT NULL,
+                base INTEGER,
+                depth INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                checksum TEXT NOT NULL
+            )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS versions_note ON versions (note_id, version)"
+        )
+
+    def snapshot(self, notesapp: NotesApp, accounts: list[str] | None = None) -> int:
+        """Record the current version of every note modified since it was last recorded
+
+        Only the id and modification date of every note are read; the name and body are
+        read in bulk for the notes that changed.
+
+        Args:
+            notesapp: NotesApp to read notes from
+            accounts: if provided, only record notes in these accounts
+
+        Returns:
+            number of versions recorded
+        """
+        recorded = 0
+        for account in accounts or notesapp.accounts:
+            noteslist = notesapp.noteslist(accounts=[account])
+            ids = noteslist.id
+            dates = noteslist.modification_date
+            cursors = self._cursors(ids)
+            changed = {
+                note_id
+                for note_id, date in zip(ids, dates)
+                if date and cursors.get(note_id) != date.timestamp()
+            }
+            if not changed:
+                continue
+            if len(changed) * 2 < len(ids):
+                noteslist = notesapp.noteslist(id=list(changed), accounts=[account])
+                ids = noteslist.id
+                dates = noteslist.modification_date
+            for note_id, name, body, date in zip(
+                ids, noteslist.name, noteslist.body, dates
+            ):
+                if note_id in changed:
+                    recorded += self.record(note_id, name, body, date, account)
+        logger.debug(f"Recorded {recorded} versions in {self.path.name}")
+        return recorded
+
+    def snapshot_notes(self, notes: Iterable[Note]) -> int:
+        """Record the current version of each of notes if it was modified since it was last recorded
+
+        Returns:
+            number of versions recorded
+        """
+        recorded = 0
+        for note in notes:
+            date = note.modification_date
+            if self._cursors([note.id]).get(note.id) != date.timestamp():
+                recorded += self.record(note.id, note.name, note.body, date)
+        return recorded
+
+    def record(
+        self,
+        note_id: str,
+        name: str,
+        body: str,
+        modification_date: datetime,
+        account: str | None = None,
+    ) -> bool:
+        """Record a version of a note unless its name and body are the same as the last recorded version
+
+        Args:
+            note_id: id of note
+            name: name of note
+            body: HTML body of note
+            modification_date: modification date of note
+            account: name of account note is in, if known
+
+        Returns:
+            True if a new version was recorded
+        """
+        if body is None:
+            return False
+        name = name or ""
+        checksum = hashlib.sha256(f"{name}\0{body}".encode("utf-8")).hexdigest()
+        timestamp = modification_date.timestamp()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                head = self._conn.execute(
+                    "SELECT head FROM notes WHERE note_id = ?", (note_id,)
+                ).fetchone()
+                row = (
+                    self._conn.execute(
+                        "SELECT depth, checksum FROM versions WHERE version = ?",
+                        (head[0],),
+                    ).fetchone()
+                    if head
+                    else None
+                )
+                if row and row[1] == checksum:
+                    self._conn.execute(
+                        "UPDATE notes SET modification_date = ? WHERE note_id = ?",
+                        (timestamp, note_id),
+                    )
+                    self._conn.execute("COMMIT")
+                    return False
+
+                base, depth = None, 0
+                data = zlib.compress(body.encode("utf-8"), 9)
+                if row and row[0] < HISTORY_MAX_CHAIN:
+                    delta = make_delta(self._body(head[0]), body)
+                    if len(delta) < len(data):
+                        base, depth, data = head[0], row[0] + 1, delta
+                version = self._conn.execute(
+                    "INSERT INTO versions (note_id, name, modification_date, recorded, "
+                    "base, depth, data, size, checksum) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        note_id,
+                        name,
+                        timestamp,
+                        time.time(),
+                        base,
+                        depth,
+                        data,
+                        len(body.encode("utf-8")),
+                        checksum,
+                    ),
+                ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO notes (note_id, account, modification_date, head) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT (note_id) DO UPDATE SET "
+                    "account = COALESCE(excluded.account, account), "
+                    "modification_date = excluded.modification_date, head = excluded.head",
+                    (note_id, account, timestamp, version),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def versions(self, note_id: str) -> list[NoteVersion]:
+        """Return recorded versions of note, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, note_id, name, modification_date, recorded, size, "
+                "LENGTH(data) FROM versions WHERE note_id = ? ORDER BY version",
+                (note_id,),
+            ).fetchall()
+        return [
+            NoteVersion(
+                version,
+                note_id,
+                name,
+                datetime.fromtimestamp(modification_date),
+                datetime.fromtimestamp(recorded),
+                size,
+                stored,
+            )
+            for version, note_id, name, modification_date, recorded, size, stored in rows
+        ]
+
+    def version_at(self, note_id: str, when: datetime) -> NoteVersion | None:
+        """Return the version of note that was current at when or None if no version was recorded by then"""
+        versions = [
+            version
+            for version in self.versions(note_id)
+            if version.modification_date <= when
+        ]
+        return versions[-1] if versions else None
+
+    def body(self, version: int | NoteVersion) -> str:
+        """Return body of a recorded version
+
+        Raises:
+            KeyError: if version does not exist
+        """
+        if isinstance(version, NoteVersion):
+            version = version.version
+        with self._lock:
+            return self._body(version)
+
+    @property
+    def size(self) -> int:
+        """Total number of bytes used to store versions"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM versions"
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+
+    def _body(self, version: int) -> str:
+        """Return body of version by applying the chain of deltas from the nearest version stored in full"""
+        chain = []
+        while True:
+            row = self._conn.execute(
+                "SELECT base, data FROM versions WHERE version = ?", (version,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(version)
+            base, data = row
+            if base is None:
+                body = zlib.decompress(data).decode("utf-8")
+                break
+            chain.append(data)
+            version = base
+        for delta in reversed(chain):
+            body = apply_delta(body, delta)
+        return body
+
+    def _cursors(self, note_ids: list[str]) -> dict[str, float]:
+        """Return dict of note id to modification date timestamp when note was last recorded"""
+        cursors = {}
+        with self._lock:
+            for start in range(0, len(note_ids), _SQL_CHUNK_SIZE):
+                chunk = note_ids[start : start + _SQL_CHUNK_SIZE]
+                cursors.update(
+                    self._conn.execute(
+                        "SELECT note_id, modification_date FROM notes "
+                        f"WHERE note_id IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                )
+        return cursors
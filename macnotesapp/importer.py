@@ -0,0 +1,134 @@
+"""Import notes into Notes.app from directories of Markdown, HTML, or plain text files"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Generator, Iterable
+
+from .convert import markdown_to_html, plaintext_to_html
+from .notesapp import Account, Note
+from .utils import PROCESS_POOL_THRESHOLD, executor_chunksize
+
+IMPORT_FORMAT_MARKDOWN = "markdown"
+IMPORT_FORMAT_HTML = "html"
+IMPORT_FORMAT_PLAINTEXT = "plaintext"
+
+# file extensions that can be imported and the format of each
+IMPORT_EXTENSIONS = {
+    ".md": IMPORT_FORMAT_MARKDOWN,
+    ".markdown": IMPORT_FORMAT_MARKDOWN,
+    ".html": IMPORT_FORMAT_HTML,
+    ".htm": IMPORT_FORMAT_HTML,
+    ".txt": IMPORT_FORMAT_PLAINTEXT,
+}
+
+_MARKDOWN_HEADING = re.compile(r"^#+\s*")
+
+
+def find_import_files(paths: Iterable[str | os.PathLike]) -> list[pathlib.Path]:
+    """Return sorted list of importable files in paths, searching directories recursively
+
+    Args:
+        paths: files or directories to search
+
+    Returns:
+        list of paths to files with an extension in IMPORT_EXTENSIONS
+    """
+    files = []
+    for path in paths:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    p
+                    for p in path.rglob("*")
+                    if p.is_file()
+                    and not p.name.startswith(".")
+                    and p.suffix.lower() in IMPORT_EXTENSIONS
+                )
+            )
+        elif path.suffix.lower() in IMPORT_EXTENSIONS:
+            files.append(path)
+        else:
+            raise ValueError(f"Unsupported file type: {path}")
+    return files
+
+
+def read_note_file(path: str | os.PathLike) -> tuple[str, str]:
+    """Read a file and convert it to name and HTML body of a note
+
+    For Markdown and plain text files, the first line is used as the name of the note
+    (as with `notes add`) and the remainder as the body; leading '#' characters are
+    removed from a Markdown name. HTML files use the file name (without extension)
+    as the name of the note and the entire file as the body.
+
+    Args:
+        path: path to file to read
+
+    Returns:
+        tuple of name, HTML body
+    """
+    path = pathlib.Path(path)
+    format_ = IMPORT_EXTENSIONS[path.suffix.lower()]
+    text = path.read_text(encoding="utf-8", errors="replace").strip()
+    if format_ == IMPORT_FORMAT_HTML:
+        return path.stem, text
+    name, _, body = text.partition("\n")
+    if format_ == IMPORT_FORMAT_MARKDOWN:
+        return _MARKDOWN_HEADING.sub("", name).strip() or path.stem, markdown_to_html(
+            body
+        )
+    return name.strip() or path.stem, plaintext_to_html(body)
+
+
+def import_notes(
+    account: Account,
+    paths: Iterable[str | os.PathLike],
+    folder: str | None = None,
+    max_workers: int | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> list[Note]:
+    """Import files as new notes in account
+
+    Files are read and converted to HTML in a process pool and the resulting notes
+    are inserted in a single batch with Account.make_notes() as conversions complete.
+
+    Args:
+        account: Account to create notes in
+        paths: files to import; see find_import_files() to find files in a directory
+        folder: optional folder to create notes in; if None, uses default folder
+        max_workers: max number of worker processes used for conversion
+        progress: optional callable called with number of notes created after each note
+
+    Returns:
+        list of Note objects for new notes in same order as paths
+    """
+    return account.make_notes(
+        read_note_files(paths, max_workers=max_workers),
+        folder=folder,
+        progress=progress,
+    )
+
+
+def read_note_files(
+    paths: Iterable[str | os.PathLike], max_workers: int | None = None
+) -> Generator[tuple[str, str], None, None]:
+    """Yield (name, HTML body) for each file in paths, in order, as it is converted (see read_note_file())
+
+    Files are converted in a process pool if there are enough to be worthwhile.
+
+    Args:
+        paths: files to read
+        max_workers: max number of worker processes used for conversion
+    """
+    paths = list(paths)
+    if len(paths) < PROCESS_POOL_THRESHOLD:
+        yield from map(read_note_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(
+            read_note_file, paths, chunksize=executor_chunksize(len(paths))
+        )
@@ -0,0 +1,125 @@
+"""Strip inline data: URIs (for example, pasted images) from note bodies
+
+Notes with pasted images can contain multi-megabyte base64 data: URIs in their HTML body.
+strip_inline_data() replaces each data: URI with a short placeholder containing a stable
+hash of the data so bodies can be processed with memory proportional to their text;
+extract_inline_data() decodes a single item of inline data on demand.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+import urllib.parse
+from dataclasses import dataclass
+from typing import Generator
+
+# scheme of the URI that replaces a data: URI in a stripped body: macnotesapp-inline:<hash>
+INLINE_DATA_SCHEME = "macnotesapp-inline"
+
+# number of characters of data hashed at a time so large data is never copied in one piece
+_HASH_CHUNK_SIZE = 64 * 1024
+
+_DATA_URI_START = re.compile(
+    r"(?<![\w-])data:([\w.+-]+/[\w.+-]+)?((?:;[\w.+-]+(?:=[\w.+-]+)?)*),"
+)
+_DATA_URI_END = re.compile(r"[\"'\s<>)]")
+
+
+@dataclass(frozen=True)
+class InlineData:
+    """An item of inline data found in a note body
+
+    Attributes:
+        hash: hash of the encoded data; stable for the same data
+        mime_type: MIME type of the data, e.g. "image/png"
+        size: length of the encoded data in characters
+        base64: True if the data is base64 encoded
+    """
+
+    hash: str
+    mime_type: str
+    size: int
+    base64: bool
+
+    @property
+    def placeholder(self) -> str:
+        """URI that replaces the data: URI in a stripped body"""
+        return f"{INLINE_DATA_SCHEME}:{self.hash}"
+
+
+def iter_inline_data(
+    html: str,
+) -> Generator[tuple[InlineData, int, int, int], None, None]:
+    """Yield (InlineData, start, data_start, end) for each data: URI in html
+
+    start and end are the offsets in html of the data: URI and data_start the offset
+    of the encoded data; the data itself is hashed in chunks and never copied whole.
+    """
+    pos = 0
+    while match := _DATA_URI_START.search(html, pos):
+        data_start = match.end()
+        end_match = _DATA_URI_END.search(html, data_start)
+        end = end_match.start() if end_match else len(html)
+        params = match[2].split(";")
+        hasher = hashlib.blake2b(digest_size=16)
+        for chunk_start in range(data_start, end, _HASH_CHUNK_SIZE):
+            hasher.update(
+                html[chunk_start : min(chunk_start + _HASH_CHUNK_SIZE, end)].encode(
+                    "utf-8"
+                )
+            )
+        yield InlineData(
+            hash=hasher.hexdigest(),
+            mime_type=match[1] or "text/plain",
+            size=end - data_start,
+            base64="base64" in params,
+        ), match.start(), data_start, end
+        pos = end
+
+
+def strip_inline_data(html: str) -> tuple[str, list[InlineData]]:
+    """Replace every data: URI in html with a placeholder
+
+    Args:
+        html: HTML body of a note
+
+    Returns:
+        tuple of stripped HTML and list of InlineData for each data: URI replaced,
+        in the order they appear
+    """
+    parts = []
+    items = []
+    pos = 0
+    for item, start, _, end in iter_inline_data(html):
+        parts.append(html[pos:start])
+        parts.append(item.placeholder)
+        items.append(item)
+        pos = end
+    if not items:
+        return html, items
+    parts.append(html[pos:])
+    return "".join(parts), items
+
+
+def extract_inline_data(html: str, hash: str) -> bytes:
+    """Return decoded bytes of the inline data in html with hash
+
+    Args:
+        html: HTML body of a note
+        hash: InlineData.hash of the data to extract
+
+    Returns:
+        decoded data
+
+    Raises:
+        KeyError: if html does not contain inline data with hash
+    """
+    for item, _, data_start, end in iter_inline_data(html):
+        if item.hash == hash:
+            data = html[data_start:end]
+            if item.base64:
+                return base64.b64decode(data)
+            return urllib.parse.unquote_to_bytes(data)
+    raise KeyError(f"No inline data with hash {hash}")
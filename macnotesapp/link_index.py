@@ -0,0 +1,188 @@
+"""On-disk index of links between notes
+
+Links to other notes appear in the body HTML of a note as anchors with an applenotes:
+(or older notes://) URL that identifies the target note by a UUID that is not exposed by
+scripting, so a link is resolved to a note by its identifier if it is a note id and
+otherwise by its text, which Notes.app sets to the name of the target note. Once a link
+is resolved the target's id is stored with the link so the link still resolves after
+the target is renamed. Bodies are only read for notes that are new or were modified
+since the index was last refreshed; backlinks are built in memory when it is loaded.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import urllib.parse
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .local_index import LocalIndex
+
+if TYPE_CHECKING:
+    from .notesapp import NotesApp, NotesList
+
+LINK_INDEX_FILENAME = "link_index.json"
+
+_ANCHOR = re.compile(
+    r"<a\b[^>]*?\bhref\s*=\s*([\"'])(.*?)\1[^>]*>(.*?)</a\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG = re.compile(r"<[^>]+>")
+
+
+@dataclass(frozen=True)
+class NoteLink:
+    """A link from a note to another note
+
+    Attributes:
+        identifier: identifier of the target note in the link URL
+        text: text of the link
+        target: id of the note the link resolves to or None if it is a dead link
+    """
+
+    identifier: str
+    text: str
+    target: str | None = None
+
+
+def note_link_identifier(url: str) -> str | None:
+    """Return identifier of the note a Notes.app note link URL points to or None if url is not a note link"""
+    url = html.unescape(url).strip()
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.casefold()
+    if scheme == "x-coredata":
+        return url
+    if scheme not in ("applenotes", "notes"):
+        return None
+    if identifier := urllib.parse.parse_qs(parts.query).get("identifier"):
+        identifier = identifier[0]
+    elif parts.path.casefold().startswith("note/"):
+        # applenotes:note/UUID?ownerIdentifier=...
+        identifier = parts.path[5:]
+    else:
+        return None
+    return identifier.strip("/").upper() or None
+
+
+def extract_note_links(body: str) -> list[NoteLink]:
+    """Return unresolved links to other notes in body HTML, in order, without duplicates"""
+    links = {}
+    for _, url, text in _ANCHOR.findall(body or ""):
+        if identifier := note_link_identifier(url):
+            text = html.unescape(_TAG.sub("", text)).strip()
+            links.setdefault((identifier, text), NoteLink(identifier, text))
+    return list(links.values())
+
+
+class LinkIndex(LocalIndex):
+    """Index of links between notes and the backlinks to each note"""
+
+    filename = LINK_INDEX_FILENAME
+    version = 1
+
+    def links(self, note_id: str) -> list[NoteLink]:
+        """Return links in note note_id to other notes with their resolved targets"""
+        return [
+            NoteLink(identifier, text, target)
+            for identifier, text, target in self.notes.get(note_id, {}).get("links", [])
+        ]
+
+    def backlinks(self, note_id: str) -> list[str]:
+        """Return ids of notes that link to note note_id, most recently modified first"""
+        return self._by_modified(self._backlinks.get(note_id, set()))
+
+    def orphans(self, account: str | None = None) -> list[str]:
+        """Return ids of notes that neither link to nor are linked from another note, most recently modified first
+
+        Args:
+            account: if provided, only return notes in this account
+        """
+        return self._by_modified(
+            note_id
+            for note_id, entry in self.notes.items()
+            if (account is None or entry["account"] == account)
+            and not self._backlinks.get(note_id)
+            and not any(
+                target and target != note_id for _, _, target in entry.get("links", [])
+            )
+        )
+
+    def dead_links(self, account: str | None = None) -> list[tuple[str, NoteLink]]:
+        """Return (note id, link) for each link that does not resolve to a note
+
+        Args:
+            account: if provided, only return links in notes in this account
+        """
+        return [
+            (note_id, link)
+            for note_id in self._by_modified(
+                note_id
+                for note_id, entry in self.notes.items()
+                if account is None or entry["account"] == account
+            )
+            for link in self.links(note_id)
+            if link.target is None
+        ]
+
+    def _by_modified(self, note_ids: Iterable[str]) -> list[str]:
+        """Return note_ids sorted most recently modified first"""
+        return sorted(
+            note_ids, key=lambda note_id: self.notes[note_id]["modified"], reverse=True
+        )
+
+    def _index(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        return {
+            note_id: {
+                "name": data["name"],
+                "links": [
+                    [link.identifier, link.text, None]
+                    for link in extract_note_links(data["body"])
+                ],
+            }
+            for note_id, data in self._fetch(
+                notesapp, account, noteslist, ids, changed, ["name", "body"]
+            ).items()
+        }
+
+    def _rebuild(self):
+        """Resolve links whose target is unknown or deleted and build backlinks"""
+        names: dict[str, list[str]] = {}
+        for note_id, entry in self.notes.items():
+            names.setdefault(entry.get("name", "").casefold(), []).append(note_id)
+        self._backlinks: dict[str, set[str]] = {}
+        for note_id, entry in self.notes.items():
+            for link in entry.get("links", []):
+                identifier, text, target = link
+                if target not in self.notes:
+                    if identifier in self.notes:
+                        target = identifier
+                    elif (
+                        text and len(candidates := names.get(text.casefold(), [])) == 1
+                    ):
+                        target = candidates[0]
+                    else:
+                        target = None
+                    link[2] = target
+                if target and target != note_id:
+                    self._backlinks.setdefault(target, set()).add(note_id)
+
+
+def get_link_index(notesapp: NotesApp, max_age: float = 0) -> LinkIndex:
+    """Return LinkIndex loaded from the cache directory, refreshing it first if it is older than max_age seconds
+
+    Args:
+        notesapp: NotesApp used to refresh the index
+        max_age: max age in seconds of index before it is refreshed; by default it is always refreshed
+    """
+    index = LinkIndex()
+    if index.age > max_age:
+        index.refresh(notesapp)
+    return index
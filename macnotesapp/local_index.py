@@ -0,0 +1,190 @@
+"""Base class for on-disk indexes of notes that are kept up to date incrementally
+
+Reading a property of every note from Notes.app is slow so indexes of note properties
+are stored as JSON in the cache directory. LocalIndex.refresh() only reads the id and
+modification date of every note (one bulk request per account) and fetches the
+properties a subclass indexes only for notes that are new or have been modified since
+the last refresh; notes that no longer exist are removed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import time
+from typing import TYPE_CHECKING, Any
+
+from .logging import logger
+from .utils import get_cache_dir, write_file_atomic
+
+if TYPE_CHECKING:
+    from .notesapp import NotesApp, NotesList
+
+
+class LocalIndex:
+    """Base class for an on-disk index of notes
+
+    Subclasses set filename and version and implement _index() to return the data to
+    store for each new or modified note; _rebuild() builds in-memory lookup structures
+    from notes after the index is loaded or refreshed. Subclasses whose lookup
+    structures are costly to build can save them with the index by implementing
+    _dump_lookups() and _load_lookups() in which case _rebuild() is skipped on load.
+
+    Attributes:
+        notes: dict of note id to entry; every entry has "account" and "modified"
+            (timestamp of modification date) in addition to the data from _index()
+        folders: dict of account name to list of folder names
+        updated: timestamp of last refresh or 0 if never refreshed
+    """
+
+    filename = "index.json"
+    version = 1
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        """Create LocalIndex and load it from disk if it exists
+
+        Args:
+            path: path to index file; default is filename in cache directory
+        """
+        self.path = pathlib.Path(path) if path else get_cache_dir() / self.filename
+        self.notes: dict[str, dict[str, Any]] = {}
+        self.folders: dict[str, list[str]] = {}
+        self.updated = 0.0
+        if not self._load():
+            self._rebuild()
+
+    @property
+    def age(self) -> float:
+        """Seconds since index was last refreshed"""
+        return time.time() - self.updated
+
+    def refresh(self, notesapp: NotesApp) -> int:
+        """Update index with notes that were added, modified, or deleted since the last refresh and save it
+
+        Args:
+            notesapp: NotesApp to read notes from
+
+        Returns:
+            number of notes that were added or updated in the index
+        """
+        seen = set()
+        indexed = 0
+        folders = {}
+        for account in notesapp.accounts:
+            noteslist = notesapp.noteslist(accounts=[account])
+            ids = noteslist.id
+            modified = dict(
+                zip(ids, (date.timestamp() for date in noteslist.modification_date))
+            )
+            seen.update(ids)
+            changed = [
+                note_id
+                for note_id in ids
+                if (entry := self.notes.get(note_id)) is None
+                or entry["modified"] != modified[note_id]
+            ]
+            if changed:
+                entries = self._index(notesapp, account, noteslist, ids, changed)
+                for note_id in changed:
+                    self.notes[note_id] = {
+                        "account": account,
+                        "modified": modified[note_id],
+                        **entries.get(note_id, {}),
+                    }
+                indexed += len(changed)
+            folders[account] = notesapp.account(account).folders
+        for note_id in set(self.notes) - seen:
+            del self.notes[note_id]
+        self.folders = folders
+        self.updated = time.time()
+        self._rebuild()
+        self.save()
+        logger.debug(f"Refreshed {self.path.name}: {indexed} notes indexed")
+        return indexed
+
+    def save(self):
+        """Save index to disk"""
+        data = {
+            "version": self.version,
+            "updated": self.updated,
+            "folders": self.folders,
+            "notes": self.notes,
+            **self._dump_lookups(),
+        }
+        write_file_atomic(self.path, json.dumps(data))
+
+    def _index(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """Return dict of note id to data to store for each note in changed
+
+        Args:
+            notesapp: NotesApp to read notes from
+            account: name of account notes are in
+            noteslist: NotesList of all notes in account
+            ids: ids of all notes in account in same order as noteslist
+            changed: ids of notes that are new or modified
+        """
+        raise NotImplementedError
+
+    def _rebuild(self):
+        """Build in-memory lookup structures from notes"""
+
+    def _dump_lookups(self) -> dict[str, Any]:
+        """Return lookup structures to save with the index"""
+        return {}
+
+    def _load_lookups(self, data: dict[str, Any]) -> bool:
+        """Load lookup structures saved by _dump_lookups() from data; return False if they must be rebuilt"""
+        return False
+
+    def _fetch(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+        properties: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """Return dict of note id to dict of NotesList properties for each note in changed
+
+        If most notes changed, properties are read for every note in noteslist;
+        otherwise only the changed notes are read.
+        """
+        if len(changed) * 2 < len(ids):
+            noteslist = notesapp.noteslist(id=list(changed), accounts=[account])
+            ids = noteslist.id
+        values = [getattr(noteslist, prop) for prop in properties]
+        wanted = set(changed)
+        return {
+            note_id: dict(zip(properties, note_values))
+            for note_id, *note_values in zip(ids, *values)
+            if note_id in wanted
+        }
+
+    def _load(self) -> bool:
+        """Load index from disk if it exists and has the current version
+
+        Returns:
+            True if lookup structures were loaded too; False if they must be rebuilt
+        """
+        if not self.path.is_file():
+            return False
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index {self.path}: {e}")
+            return False
+        if data.get("version") != self.version:
+            return False
+        self.updated = data.get("updated", 0.0)
+        self.folders = data.get("folders", {})
+        self.notes = data.get("notes", {})
+        return self._load_lookups(data)
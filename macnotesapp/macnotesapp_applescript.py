@@ -159,6 +159,26 @@ on notesGetAccounts()
 	end tell
 end notesGetAccounts
 
+on notesGetAccountSummaries()
+	(* Get summary of every account
+	
+	Returns:
+		list of {id, name, count of notes, count of folders, name of default folder} for each account;
+		name of default folder is "" if it can't be read
+	*)
+	set accountSummaries to {}
+	tell application "Notes"
+		repeat with theAccount in accounts
+			set defaultFolderName to ""
+			try
+				set defaultFolderName to name of default folder of theAccount
+			end try
+			copy {id of theAccount, name of theAccount, count of notes of theAccount, count of folders of theAccount, defaultFolderName} to end of accountSummaries
+		end repeat
+	end tell
+	return accountSummaries
+end notesGetAccountSummaries
+
 on notesMakeNoteWithAccount(accountName, folderName, noteName, noteBody)
 	(* Create a new note in specified account and folder
 	
@@ -270,6 +290,35 @@ on noteSetBody(accountName, noteID, noteBody)
 	end tell
 end noteSetBody
 
+on noteUpdateIfUnmodified(accountName, noteID, sinceDate, setName, noteName, setBody, noteBody)
+	(* Set name and/or body of noteID in accountName only if note has not been modified since sinceDate
+	
+	Args:
+		sinceDate: date; note is not changed if its modification date is later than sinceDate
+		setName: true if name should be set to noteName
+		setBody: true if body should be set to noteBody
+		
+	Returns:
+		list of {updated, modification date}; updated is false if note was modified after sinceDate
+	*)
+	tell application "Notes"
+		tell account accountName
+			set theNote to note id (noteID)
+			set modDate to modification date of theNote
+			if modDate > sinceDate then
+				return {false, modDate}
+			end if
+			if setBody then
+				set body of theNote to noteBody
+			end if
+			if setName then
+				set name of theNote to noteName
+			end if
+			return {true, modification date of theNote}
+		end tell
+	end tell
+end noteUpdateIfUnmodified
+
 on noteGetPlainText(accountName, noteID)
 	(* Get plain text contents of noteID in accountName *)
 	tell application "Notes"
@@ -325,6 +374,38 @@ on noteAddAttachment(accountName, noteID, attachmentPath)
 	end tell
 end noteAddAttachment
 
+on noteAddAttachments(accountName, noteID, attachmentPaths)
+	(* Add attachments to noteID in accountName
+	
+	Args:
+		attachmentPaths: list of POSIX paths of files to attach
+		
+	Returns:
+		list of ids of new attachments in same order as attachmentPaths;
+		if the id of a new attachment can't be read, the error message is returned in its place
+		(the error message contains the attachment id)
+	*)
+	set attachmentFiles to {}
+	repeat with attachmentPath in attachmentPaths
+		copy POSIX file (attachmentPath as string) to end of attachmentFiles
+	end repeat
+	set attachmentIDs to {}
+	tell application "Notes"
+		tell account accountName
+			set theNote to note id (noteID)
+			repeat with attachmentFile in attachmentFiles
+				set theAttachment to make new attachment at theNote with data (contents of attachmentFile)
+				try
+					copy (id of theAttachment) to end of attachmentIDs
+				on error errMsg
+					copy errMsg to end of attachmentIDs
+				end try
+			end repeat
+		end tell
+	end tell
+	return attachmentIDs
+end noteAddAttachments
+
 (******** Folder Class *********)
 
 on noteGetAttachments(accountName, noteID)
@@ -565,6 +646,59 @@ on noteMove(noteID, folderName, accountName)
 	end tell
 end noteMove
 
+on accountMoveNotes(accountName, noteIDs, folderName)
+	(* Move notes in accountName to folderName
+	
+	Args:
+		noteIDs: list of ids of notes to move
+		
+	Returns:
+		list with an empty string for each note moved or the error message if the note
+		could not be moved, in same order as noteIDs
+	*)
+	set moveResults to {}
+	tell application "Notes"
+		tell account accountName
+			set targetFolder to first folder whose name is folderName
+			repeat with noteID in noteIDs
+				try
+					move note id (noteID as string) to targetFolder
+					copy "" to end of moveResults
+				on error errMsg
+					copy errMsg to end of moveResults
+				end try
+			end repeat
+		end tell
+	end tell
+	return moveResults
+end accountMoveNotes
+
+on accountDeleteNotes(accountName, noteIDs)
+	(* Delete notes in accountName
+	
+	Args:
+		noteIDs: list of ids of notes to delete
+		
+	Returns:
+		list with an empty string for each note deleted or the error message if the note
+		could not be deleted, in same order as noteIDs
+	*)
+	set deleteResults to {}
+	tell application "Notes"
+		tell account accountName
+			repeat with noteID in noteIDs
+				try
+					delete note id (noteID as string)
+					copy "" to end of deleteResults
+				on error errMsg
+					copy errMsg to end of deleteResults
+				end try
+			end repeat
+		end tell
+	end tell
+	return deleteResults
+end accountDeleteNotes
+
 on folderCreate(accountName, folderName)
 	(* Create new folder in account *)
 	tell application "Notes"
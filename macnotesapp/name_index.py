@@ -0,0 +1,308 @@
+"""On-disk index of note names and folders for fast name lookups and shell completion"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Iterable, Iterator
+
+from .local_index import LocalIndex
+from .notesapp import NotesApp, NotesList
+
+NAME_INDEX_FILENAME = "name_index.json"
+
+# max age in seconds of the name index before get_name_index() refreshes it
+NAME_INDEX_MAX_AGE = 60
+
+# kinds of NameMatch in order of rank
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_SUBSTRING = "substring"
+MATCH_FUZZY = "fuzzy"
+MATCH_KINDS = [MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_FUZZY]
+
+# sorts after every character so key + _MAX_CHAR is an upper bound for all keys starting with key
+_MAX_CHAR = chr(0x10FFFF)
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """A note whose name matches a name looked up in a NameIndex
+
+    Attributes:
+        id: id of note
+        name: name of note
+        account: name of account note is in
+        modified: timestamp of note's modification date
+        kind: how the name matched: MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, or MATCH_FUZZY
+        distance: edit distance between the names for MATCH_FUZZY; otherwise 0
+    """
+
+    id: str
+    name: str
+    account: str
+    modified: float
+    kind: str
+    distance: int = 0
+
+
+class _SortedNames:
+    """Parallel lists of case-folded names, names, account names and note ids sorted by case-folded name
+
+    Keeping the case-folded names in their own list lets prefix queries bisect it
+    directly; the lists are saved with the index so loading it doesn't sort them again.
+    """
+
+    fields = ["keys", "names", "accounts", "ids"]
+
+    def __init__(
+        self,
+        keys: list[str],
+        names: list[str],
+        accounts: list[str],
+        ids: list[str],
+    ):
+        if not len(keys) == len(names) == len(accounts) == len(ids):
+            raise ValueError("sorted name lists differ in length")
+        self.keys = keys
+        self.names = names
+        self.accounts = accounts
+        self.ids = ids
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[tuple[str, str, str]]) -> _SortedNames:
+        """Return _SortedNames for (name, account, id) entries"""
+        rows = sorted(
+            (name.casefold(), name, account, id_) for name, account, id_ in entries
+        )
+        if not rows:
+            return cls([], [], [], [])
+        return cls(*(list(column) for column in zip(*rows)))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list[str]]) -> _SortedNames:
+        """Return _SortedNames saved by asdict()"""
+        return cls(*(data[field] for field in cls.fields))
+
+    def asdict(self) -> dict[str, list[str]]:
+        """Return lists as a dict that can be saved as JSON"""
+        return {field: getattr(self, field) for field in self.fields}
+
+    @cached_property
+    def by_length(self) -> dict[int, list[int]]:
+        """Dict of length to indexes of case-folded names with that length"""
+        by_length: dict[int, list[int]] = {}
+        for i, key in enumerate(self.keys):
+            by_length.setdefault(len(key), []).append(i)
+        return by_length
+
+    def prefix(self, prefix: str, account: str | None) -> list[str]:
+        """Return sorted unique names starting with prefix (case-insensitive)"""
+        key = prefix.casefold()
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + _MAX_CHAR, start)
+        matches = []
+        for i in range(start, end):
+            if account is not None and self.accounts[i] != account:
+                continue
+            name = self.names[i]
+            if not matches or matches[-1] != name:
+                matches.append(name)
+        return matches
+
+
+class NameIndex(LocalIndex):
+    """Index of note names and folders
+
+    Names are kept in a sorted array of case-folded names so prefix queries are a
+    binary search rather than a scan of every note; the sorted arrays are saved with
+    the index so a completion is a load and a binary search without a sort.
+    """
+
+    filename = NAME_INDEX_FILENAME
+    version = 1
+
+    def complete_name(self, prefix: str, account: str | None = None) -> list[str]:
+        """Return sorted list of unique note names starting with prefix (case-insensitive)
+
+        Args:
+            prefix: prefix to match
+            account: if provided, only return names of notes in this account
+        """
+        return self._names.prefix(prefix, account)
+
+    def complete_folder(self, prefix: str, account: str | None = None) -> list[str]:
+        """Return sorted list of unique folder names starting with prefix (case-insensitive)
+
+        Args:
+            prefix: prefix to match
+            account: if provided, only return folders in this account
+        """
+        return self._folders.prefix(prefix, account)
+
+    def match(
+        self, name: str, account: str | None = None, max_distance: int | None = None
+    ) -> list[NameMatch]:
+        """Return notes whose name matches name (case-insensitive), best matches first
+
+        Notes with exactly the same name rank first, then names starting with name, then
+        names containing name; most recently modified notes rank first within each kind.
+        Only if no name contains name are names within max_distance edits of name
+        (fuzzy matches) returned, closest first.
+
+        Args:
+            name: name to look up
+            account: if provided, only match notes in this account
+            max_distance: max edit distance for fuzzy matches; default is 1 per 4 characters of name (at least 1)
+
+        Returns:
+            list of NameMatch
+        """
+        key = name.casefold()
+        if not key:
+            return []
+        names = self._names
+        matches = []
+        for i, note_key in enumerate(names.keys):
+            if account is not None and names.accounts[i] != account:
+                continue
+            if note_key == key:
+                kind = MATCH_EXACT
+            elif note_key.startswith(key):
+                kind = MATCH_PREFIX
+            elif key in note_key:
+                kind = MATCH_SUBSTRING
+            else:
+                continue
+            matches.append(self._match(i, kind))
+        if not matches:
+            max_distance = (
+                max(1, len(key) // 4) if max_distance is None else max_distance
+            )
+            for i in self._fuzzy_candidates(key, account, max_distance):
+                distance = edit_distance(key, names.keys[i], max_distance)
+                if distance <= max_distance:
+                    matches.append(self._match(i, MATCH_FUZZY, distance))
+        return sorted(
+            matches,
+            key=lambda match: (
+                MATCH_KINDS.index(match.kind),
+                match.distance,
+                -match.modified,
+            ),
+        )
+
+    def _fuzzy_candidates(
+        self, key: str, account: str | None, max_distance: int
+    ) -> Iterator[int]:
+        """Yield indexes of names that may be within max_distance edits of key
+
+        Only names whose length differs by at most max_distance are considered and of
+        those, names missing more than max_distance of the distinct characters of key
+        are skipped as each edit removes at most one of them.
+        """
+        names = self._names
+        characters = set(key)
+        for length in range(len(key) - max_distance, len(key) + max_distance + 1):
+            for i in names.by_length.get(length, ()):
+                if account is not None and names.accounts[i] != account:
+                    continue
+                if len(characters.difference(names.keys[i])) > max_distance:
+                    continue
+                yield i
+
+    def _match(self, i: int, kind: str, distance: int = 0) -> NameMatch:
+        """Return NameMatch for the note at index i of the sorted names"""
+        names = self._names
+        note_id = names.ids[i]
+        return NameMatch(
+            note_id,
+            names.names[i],
+            names.accounts[i],
+            self.notes[note_id]["modified"],
+            kind,
+            distance,
+        )
+
+    def _index(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        return self._fetch(notesapp, account, noteslist, ids, changed, ["name"])
+
+    def _rebuild(self):
+        self._names = _SortedNames.from_entries(
+            (entry["name"], entry["account"], note_id)
+            for note_id, entry in self.notes.items()
+            if entry.get("name")
+        )
+        self._folders = _SortedNames.from_entries(
+            (folder, account, "")
+            for account, folders in self.folders.items()
+            for folder in folders
+        )
+
+    def _dump_lookups(self) -> dict[str, Any]:
+        return {
+            "sorted_names": self._names.asdict(),
+            "sorted_folders": self._folders.asdict(),
+        }
+
+    def _load_lookups(self, data: dict[str, Any]) -> bool:
+        try:
+            self._names = _SortedNames.from_dict(data["sorted_names"])
+            self._folders = _SortedNames.from_dict(data["sorted_folders"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Return edit distance between a and b counting insertions, deletions, substitutions
+    and transpositions of adjacent characters as one edit each
+
+    Computation stops early once the distance must be more than max_distance in which
+    case max_distance + 1 is returned.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if (
+                previous_previous is not None
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[len(b)], max_distance + 1)
+
+
+def get_name_index(
+    notesapp: NotesApp | None = None, max_age: float = NAME_INDEX_MAX_AGE
+) -> NameIndex:
+    """Return NameIndex loaded from the cache directory, refreshing it first if it is older than max_age seconds
+
+    Args:
+        notesapp: NotesApp used to refresh the index; created if needed and not provided
+        max_age: max age in seconds of index before it is refreshed
+    """
+    index = NameIndex()
+    if index.age > max_age:
+        index.refresh(notesapp or NotesApp())
+    return index
@@ -2,20 +2,53 @@
 
 from __future__ import annotations
 
+import hashlib
+import itertools
 import os
 import pathlib
+import random
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from functools import cached_property
-from typing import Any, Generator, Optional
+from typing import Any, Callable, Generator, Iterable, Optional, TypeVar
 
 import AppKit
 import applescript
 import ScriptingBridge
 
 from ._version import __version__
+from .capabilities import (
+    STRATEGY_APPLESCRIPT,
+    STRATEGY_BULK,
+    STRATEGY_PER_NOTE,
+    STRATEGY_SCRIPTINGBRIDGE,
+    get_capabilities,
+)
+from .conversion_cache import FORMAT_PLAINTEXT, get_conversion_cache
+from .dupes import DUPLICATE_THRESHOLD, DuplicateCluster, find_duplicates
+from .grep import GrepResult, grep_texts
+from .inline_data import (
+    InlineData,
+    extract_inline_data,
+    iter_inline_data,
+    strip_inline_data,
+)
+from .link_index import NoteLink, get_link_index
+from .logging import logger
+from .query_cache import (
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL,
+    QueryCache,
+    invalidate_queries,
+    query_key,
+)
+from .related_index import get_related_index
 from .script_loader import run_script
+from .singleflight import get_singleflight
+from .tag_index import get_tag_index
 from .utils import NSDate_to_datetime, OSType, get_macos_version
+from .writequeue import WRITE_BEHIND_WINDOW, WRITE_BEHIND_WORKERS, WriteBehindQueue
 
 # Note: string values returned from ScriptingBridge are PyObjC unicode objects and must
 # be cast to str to ensure they work correctly with other functions
@@ -23,6 +56,54 @@ from .utils import NSDate_to_datetime, OSType, get_macos_version
 
 MAC_OS_VERSION = int(get_macos_version()[0])
 
+T = TypeVar("T")
+
+# Policies for verifying writes to Note.name and Note.body
+# ScriptingBridge writes sometimes silently fail so by default, the value is read back after
+# writing and if it differs, the value is written again with AppleScript
+WRITE_VERIFY_ALWAYS = "always"
+WRITE_VERIFY_NEVER = "never"
+WRITE_VERIFY_SAMPLED = "sampled"
+WRITE_VERIFY_POLICIES = [WRITE_VERIFY_ALWAYS, WRITE_VERIFY_NEVER, WRITE_VERIFY_SAMPLED]
+
+_write_verify_policy = WRITE_VERIFY_ALWAYS
+_write_verify_sample_rate = 0.1
+
+
+def set_write_verify(policy: str, sample_rate: float = 0.1):
+    """Set policy for verifying writes to Note.name and Note.body
+
+    Args:
+        policy: one of WRITE_VERIFY_ALWAYS, WRITE_VERIFY_NEVER, WRITE_VERIFY_SAMPLED
+        sample_rate: fraction of writes to verify if policy is WRITE_VERIFY_SAMPLED
+    """
+    global _write_verify_policy, _write_verify_sample_rate
+    if policy not in WRITE_VERIFY_POLICIES:
+        raise ValueError(
+            f"Invalid write verify policy {policy}; must be one of {WRITE_VERIFY_POLICIES}"
+        )
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError(f"sample_rate must be between 0 and 1, not {sample_rate}")
+    _write_verify_policy = policy
+    _write_verify_sample_rate = sample_rate
+
+
+def get_write_verify() -> tuple[str, float]:
+    """Return tuple of policy for verifying writes and sample rate"""
+    return _write_verify_policy, _write_verify_sample_rate
+
+
+def _should_verify_write() -> bool:
+    """Return True if a write should be verified according to write verify policy"""
+    if _write_verify_policy == WRITE_VERIFY_SAMPLED:
+        return random.random() < _write_verify_sample_rate
+    return _write_verify_policy == WRITE_VERIFY_ALWAYS
+
+
+def content_hash(text: str) -> str:
+    """Return hash of text used to detect whether note content has changed"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
 
 class AppleScriptError(Exception):
     """Error raised when AppleScript fails to execute"""
@@ -38,6 +119,49 @@ class ScriptingBridgeError(Exception):
         super().__init__(*message)
 
 
+class MakeNotesError(ScriptingBridgeError):
+    """Error raised when Account.make_notes() fails after creating some or none of the notes
+
+    Attributes:
+        notes: list of Note objects for the notes that were created before the error,
+            in the order they were given
+    """
+
+    def __init__(self, *message, notes: list["Note"] | None = None):
+        super().__init__(*message)
+        self.notes = notes or []
+
+
+@dataclass
+class UpdateResult:
+    """Result of Note.update()
+
+    Attributes:
+        updated: True if note was updated; False if note was modified since if_unmodified_since
+        modification_date: modification date of note after the update (or of the conflicting
+            modification if not updated); None if not checked
+    """
+
+    updated: bool
+    modification_date: datetime | None = None
+
+    @property
+    def conflict(self) -> bool:
+        """True if note was not updated because it was modified since if_unmodified_since"""
+        return not self.updated
+
+
+@dataclass
+class AccountSummary:
+    """Summary of a Notes.app account returned by NotesApp.account_summaries()"""
+
+    id: str
+    name: str
+    notes_count: int
+    folders_count: int
+    default_folder: str | None
+
+
 def parse_id_from_object(obj: ScriptingBridge.SBObject) -> str:
     """Parse the ID from the object representation when it can't be determined by ScriptingBridge"""
 
@@ -54,11 +178,29 @@ def parse_id_from_object(obj: ScriptingBridge.SBObject) -> str:
 class NotesApp:
     """Represents Notes.app instance"""
 
-    def __init__(self):
-        """create new NotesApp object"""
+    def __init__(
+        self,
+        query_cache_ttl: float = QUERY_CACHE_TTL,
+        query_cache_size: int = QUERY_CACHE_MAX_ENTRIES,
+    ):
+        """create new NotesApp object
+
+        Args:
+            query_cache_ttl: seconds results of notes() are cached; 0 to disable caching
+            query_cache_size: max number of results of notes() cached
+        """
         self._app = ScriptingBridge.SBApplication.applicationWithBundleIdentifier_(
             "com.apple.Notes"
         )
+        self._accounts: dict[str, Account] = {}
+        self._query_cache = QueryCache(
+            ttl=query_cache_ttl, max_entries=query_cache_size
+        )
+
+    @property
+    def query_cache(self) -> QueryCache:
+        """QueryCache for results of notes()"""
+        return self._query_cache
 
     @property
     def app(self):
@@ -83,9 +225,13 @@ class NotesApp:
         password_protected: bool | None = None,
         id: list[str] | None = None,
         accounts: list[str] | None = None,
+        fresh: bool = False,
     ) -> list["Note"]:
         """Return Note object for all notes contained in Notes.app or notes filtered by property.
 
+        Results are cached for a few seconds (see query_cache) until a note or folder
+        in one of the accounts is changed through this library.
+
         Args:
             name: list of note names to filter by
             body: list of note bodies to filter by
@@ -93,22 +239,37 @@ class NotesApp:
             password_protected: filter by password protected notes
             id: list of note ids to filter by
             accounts: list of account names to filter by
+            fresh: if True, query Notes.app even if the result is cached
 
         Returns:
             list of Note objects
         """
-        # TODO: should this be a generator?
-        account_list = self.app.accounts()
-        if accounts:
-            format_str = "name == %@" + " OR name == %@ " * (len(accounts) - 1)
-            predicate = AppKit.NSPredicate.predicateWithFormat_(format_str, accounts)
-            account_list = account_list.filteredArrayUsingPredicate_(predicate)
-        notes = []
-        for account in account_list:
-            notes.extend(
-                Account(account).notes(name, body, text, password_protected, id)
+
+        def query() -> list["Note"]:
+            # TODO: should this be a generator?
+            notes = []
+            for account in self._account_list(accounts):
+                notes.extend(
+                    Account(account, self).notes(
+                        name, body, text, password_protected, id
+                    )
+                )
+            return notes
+
+        key = query_key(
+            "notes",
+            name=name,
+            body=body,
+            text=text,
+            password_protected=password_protected,
+            id=id,
+            accounts=accounts,
+        )
+        return list(
+            self._query_cache.get_or_query(
+                key, accounts, lambda: get_singleflight().do(key, query), fresh=fresh
             )
-        return notes
+        )
 
     def noteslist(
         self,
@@ -121,6 +282,9 @@ class NotesApp:
     ) -> "NotesList":
         """Return NoteList object for all notes contained in account or notes filtered by property.
 
+        Results are not cached: a NotesList only holds the query and each property read
+        from it is a request to Notes.app, so a cached NotesList would save nothing.
+
         Args:
             name: list of note names to filter by
             body: list of note bodies to filter by
@@ -132,28 +296,34 @@ class NotesApp:
         Returns:
             NotesList object
         """
-        account_list = self.app.accounts()
-        if accounts:
-            format_str = "name == %@" + " OR name == %@ " * (len(accounts) - 1)
-            predicate = AppKit.NSPredicate.predicateWithFormat_(format_str, accounts)
-            account_list = account_list.filteredArrayUsingPredicate_(predicate)
         noteslists = [
-            Account(account)._noteslist(
+            Account(account, self)._noteslist(
                 name=name,
                 body=body,
                 text=text,
                 password_protected=password_protected,
                 id=id,
             )
-            for account in account_list
+            for account in self._account_list(accounts)
         ]
         return NotesList(*noteslists)
 
+    def _account_list(
+        self, accounts: list[str] | None
+    ) -> ScriptingBridge.SBElementArray:
+        """Return SBElementArray of accounts with names in accounts or all accounts if accounts is None"""
+        account_list = self.app.accounts()
+        if accounts:
+            format_str = "name == %@" + " OR name == %@ " * (len(accounts) - 1)
+            predicate = AppKit.NSPredicate.predicateWithFormat_(format_str, accounts)
+            account_list = account_list.filteredArrayUsingPredicate_(predicate)
+        return account_list
+
     @property
     def selection(self) -> list["Note"]:
         """Return lit of Note objects for selected notes"""
         notes = self.app.selection()
-        return [Note(note) for note in notes]
+        return [Note(note, notes_app=self) for note in notes]
 
     @property
     def version(self) -> str:
@@ -174,12 +344,30 @@ class NotesApp:
             newly created Note object
         """
         # reference: https://developer.apple.com/documentation/scriptingbridge/sbobject/1423973-initwithproperties
-        account = Account(self.app.defaultAccount())
-        note = account.make_note(name, body)
-        if attachments:
-            for attachment in attachments:
-                note.add_attachment(attachment)
-        return note
+        account = Account(self.app.defaultAccount(), self)
+        return account.make_note(name, body, attachments=attachments)
+
+    def account_summaries(self) -> list[AccountSummary]:
+        """Return id, name, note count, folder count and default folder of every account
+
+        All accounts are summarized with a single AppleScript call using count events
+        so notes and folders are not fetched.
+
+        Returns:
+            list of AccountSummary, one for each account
+        """
+        return [
+            AccountSummary(
+                id=str(account_id),
+                name=str(name),
+                notes_count=int(notes_count),
+                folders_count=int(folders_count),
+                default_folder=str(default_folder) or None,
+            )
+            for account_id, name, notes_count, folders_count, default_folder in run_script(
+                "notesGetAccountSummaries"
+            )
+        ]
 
     def account(self, account: Optional[str] = None) -> "Account":
         """Return Account object for account or default account if account is None.
@@ -189,14 +377,189 @@ class NotesApp:
 
         Returns:
             Account object
+
+        Note:
+            Account objects are memoized by name for the lifetime of the NotesApp object
         """
         account = account or self.default_account
+        if account_obj := self._accounts.get(account):
+            return account_obj
         predicate = AppKit.NSPredicate.predicateWithFormat_("name == %@", account)
         accounts = self.app.accounts().filteredArrayUsingPredicate_(predicate)
         if not accounts:
             raise ValueError(f"Could not find account {account}")
-        account_obj = accounts[0]
-        return Account(account_obj)
+        account_obj = Account(accounts[0], self)
+        self._accounts[account] = account_obj
+        return account_obj
+
+    def tags(self, account: str | None = None, max_age: float = 0) -> dict[str, int]:
+        """Return dict of #hashtags and @mentions in notes to number of notes with each tag
+
+        Tags are read from the tag index in the cache directory; the index is first
+        refreshed by reading the plaintext of notes added or modified since it was last
+        refreshed, unless it was refreshed less than max_age seconds ago.
+
+        Args:
+            account: if provided, only count notes in this account
+            max_age: max age in seconds of the tag index before it is refreshed
+
+        Returns:
+            dict of lower case tag (including the leading # or @) to count of notes, sorted by tag
+        """
+        return get_tag_index(self, max_age).tags(account)
+
+    def notes_with_tags(
+        self,
+        tags: list[str],
+        match_all: bool = False,
+        accounts: list[str] | None = None,
+        max_age: float = 0,
+    ) -> list["Note"]:
+        """Return notes with any of tags or, if match_all is True, with all of tags
+
+        Notes are found with the tag index (see tags()) rather than by searching the text of every note.
+
+        Args:
+            tags: tags to find; case-insensitive and a tag without a leading # or @ is treated as a #hashtag
+            match_all: if True, only return notes with all of tags
+            accounts: if provided, only return notes in these accounts
+            max_age: max age in seconds of the tag index before it is refreshed
+
+        Returns:
+            list of Note objects, most recently modified first
+        """
+        index = get_tag_index(self, max_age)
+        entries = sorted(
+            (
+                (index.notes[note_id], note_id)
+                for note_id in index.note_ids(tags, match_all=match_all)
+                if not accounts or index.notes[note_id]["account"] in accounts
+            ),
+            key=lambda item: item[0]["modified"],
+            reverse=True,
+        )
+        return [
+            self.account(entry["account"]).note(note_id) for entry, note_id in entries
+        ]
+
+    def related(
+        self,
+        note: "Note",
+        k: int = 10,
+        accounts: list[str] | None = None,
+        max_age: float = 0,
+    ) -> list[tuple["Note", float]]:
+        """Return notes whose words are most similar to note's
+
+        Notes are compared by the cosine similarity of TF-IDF vectors of the words in
+        their name and plaintext, read from the related index in the cache directory.
+        The index is first refreshed with the notes added or modified since it was last
+        refreshed, unless it was refreshed less than max_age seconds ago.
+
+        Args:
+            note: note to find related notes for
+            k: max number of notes to return
+            accounts: if provided, only return notes in these accounts
+            max_age: max age in seconds of the related index before it is refreshed
+
+        Returns:
+            list of (Note, similarity) tuples, most similar first
+        """
+        index = get_related_index(self, max_age)
+        return [
+            (self.account(index.notes[note_id]["account"]).note(note_id), score)
+            for note_id, score in index.related(note.id, k, accounts)
+        ]
+
+    def links(self, note: "Note", max_age: float = 0) -> list[NoteLink]:
+        """Return links from note to other notes
+
+        Links are read from the link index in the cache directory; the index is first
+        refreshed by reading the body of notes added or modified since it was last
+        refreshed, unless it was refreshed less than max_age seconds ago.
+
+        Args:
+            note: note to return links for
+            max_age: max age in seconds of the link index before it is refreshed
+
+        Returns:
+            list of NoteLink; target is the id of the linked note or None if the link is dead
+        """
+        return get_link_index(self, max_age).links(note.id)
+
+    def backlinks(self, note: "Note", max_age: float = 0) -> list["Note"]:
+        """Return notes that link to note, most recently modified first
+
+        Args:
+            note: note to return backlinks for
+            max_age: max age in seconds of the link index before it is refreshed
+        """
+        index = get_link_index(self, max_age)
+        return [
+            self.account(index.notes[note_id]["account"]).note(note_id)
+            for note_id in index.backlinks(note.id)
+        ]
+
+    def orphans(
+        self, accounts: list[str] | None = None, max_age: float = 0
+    ) -> list["Note"]:
+        """Return notes that neither link to nor are linked from another note, most recently modified first
+
+        Args:
+            accounts: if provided, only return notes in these accounts
+            max_age: max age in seconds of the link index before it is refreshed
+        """
+        index = get_link_index(self, max_age)
+        return [
+            self.account(account).note(note_id)
+            for account in accounts or self.accounts
+            for note_id in index.orphans(account)
+        ]
+
+    def dead_links(
+        self, accounts: list[str] | None = None, max_age: float = 0
+    ) -> list[tuple["Note", NoteLink]]:
+        """Return (note, link) for each link from a note to a note that does not exist
+
+        Args:
+            accounts: if provided, only return links in notes in these accounts
+            max_age: max age in seconds of the link index before it is refreshed
+        """
+        index = get_link_index(self, max_age)
+        return [
+            (self.account(account).note(note_id), link)
+            for account in accounts or self.accounts
+            for note_id, link in index.dead_links(account)
+        ]
+
+    def write_behind(
+        self,
+        window: float = WRITE_BEHIND_WINDOW,
+        max_workers: int = WRITE_BEHIND_WORKERS,
+        on_error: Callable[["Note", Exception], None] | None = None,
+    ) -> WriteBehindQueue:
+        """Return a WriteBehindQueue for making frequent updates to notes
+
+        Updates queued with WriteBehindQueue.update() are written on a background thread;
+        repeated updates to the same note within window seconds are coalesced into one write.
+
+        Args:
+            window: seconds to hold an update before writing it
+            max_workers: max number of notes to write concurrently
+            on_error: optional callable called with note and exception if a write fails
+
+        Returns:
+            WriteBehindQueue; call close() or use as a context manager to write remaining updates
+
+        Example:
+            with notesapp.write_behind(window=2.0) as queue:
+                for line in log_lines:
+                    text += f"<div>{line}</div>"
+                    queue.update(note, body=text)
+        """
+        return WriteBehindQueue(
+            window=window, max_workers=max_workers, on_error=on_error
+        )
 
     def activate(self) -> None:
         """Activate Notes.app"""
@@ -215,42 +578,79 @@ class NotesApp:
         for account in self.app.accounts():
             notes = account.notes()
             for note in notes:
-                yield Note(note)
+                yield Note(note, notes_app=self)
 
 
 class Account:
     """Notes.app Account object"""
 
-    def __init__(self, account: ScriptingBridge.SBObject):
-        """Initialize Account object"""
+    def __init__(self, account: ScriptingBridge.SBObject, notes_app: NotesApp):
+        """Initialize Account object
+
+        Args:
+            account: ScriptingBridge account object
+            notes_app: NotesApp instance account belongs to
+        """
         self._account = account
+        self._notes_app = notes_app
+        self._name: str | None = None
+        self._folder_objs: dict[str, ScriptingBridge.SBObject] = {}
 
     @property
     def name(self) -> str:
         """Return name of account"""
-        return str(self._account.name())
+        # account names can't be changed by scripting so name is only fetched once
+        if self._name is None:
+            self._name = str(self._account.name())
+        return self._name
         # return str(self._run_script("accountName"))
 
     @property
     def folders(self) -> list[str]:
         """Return list of folder names in account"""
-        if folders := self._account.folders():
-            return [str(f.name()) for f in folders]
-        return [str(f) for f in self._run_script("accountGetFolderNames")]
+        return get_capabilities().call(
+            "account.folders",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    [str(f.name()) for f in folders]
+                    if (folders := self._account.folders())
+                    else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: [
+                    str(f) for f in self._run_script("accountGetFolderNames")
+                ],
+            },
+        )
 
     @property
     def default_folder(self) -> str:
         """Return name of default folder for account"""
-        if default_folder := self._account.defaultFolder():
-            return str(default_folder.name())
-        return str(self._run_script("accountGetDefaultFolder"))
+        return get_capabilities().call(
+            "account.default_folder",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    str(default_folder.name())
+                    if (default_folder := self._account.defaultFolder())
+                    else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: str(
+                    self._run_script("accountGetDefaultFolder")
+                ),
+            },
+        )
 
     @cached_property
     def id(self) -> str:
         """Return ID of account"""
-        if id_ := self._account.id():
-            return str(id_)
-        return str(self._run_script("accountID"))
+        return get_capabilities().call(
+            "account.id",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    str(id_) if (id_ := self._account.id()) else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: str(self._run_script("accountID")),
+            },
+        )
 
     def notes(
         self,
@@ -272,6 +672,30 @@ class Account:
         Returns:
             list of Note objects
         """
+        key = query_key(
+            "account.notes",
+            account=self.name,
+            name=name,
+            body=body,
+            text=text,
+            password_protected=password_protected,
+            id=id,
+        )
+        return list(
+            get_singleflight().do(
+                key, lambda: self._notes(name, body, text, password_protected, id)
+            )
+        )
+
+    def _notes(
+        self,
+        name: list[str] | None,
+        body: list[str] | None,
+        text: list[str] | None,
+        password_protected: bool | None,
+        id: list[str] | None,
+    ) -> list["Note"]:
+        """Return Note object for notes in account filtered by property; see notes()"""
         # TODO: should this be a generator?
         notes = self._account.notes()
         format_strings = []
@@ -306,7 +730,7 @@ class Account:
             format_str = "(" + ") AND (".join(or_strings) + ")"
             predicate = AppKit.NSPredicate.predicateWithFormat_(format_str, *args)
             notes = notes.filteredArrayUsingPredicate_(predicate)
-        return [Note(note) for note in notes.get()]
+        return [Note(note, self.name, self._notes_app) for note in notes.get()]
 
     def noteslist(
         self,
@@ -330,6 +754,19 @@ class Account:
         notes = self._noteslist(name, body, text, password_protected, id)
         return NotesList(notes)
 
+    def note(self, note_id: str) -> "Note":
+        """Return Note object for note with ID note_id in this account.
+
+        Args:
+            note_id: ID of note
+
+        Returns:
+            Note object
+        """
+        return Note(
+            self._account.notes().objectWithID_(note_id), self.name, self._notes_app
+        )
+
     def folder(self, folder: str) -> "Folder":
         """Return Folder object for folder with name folder."""
         folder_obj = self._folder_for_name(folder)
@@ -362,19 +799,15 @@ class Account:
             FileNotFoundError: if attachment file could not be found
         """
 
-        # reference: https://developer.apple.com/documentation/scriptingbridge/sbobject/1423973-initwithproperties
-        notes_app = NotesApp()
+        if attachments:
+            for attachment in attachments:
+                if not os.path.exists(attachment):
+                    raise FileNotFoundError(f"File {attachment} does not exist")
+
         folder_obj = (
             self._folder_for_name(folder) if folder else self._account.defaultFolder()
         )
-        properties = {
-            "body": f"<div><h1>{name}</h1></div>\n{body}",
-        }
-        note = (
-            notes_app.app.classForScriptingClass_("note")
-            .alloc()
-            .initWithProperties_(properties)
-        )
+        note = self._new_note_object(name, body)
         notes = folder_obj.notes()
         len_before = len(notes)
         notes.addObject_(note)
@@ -385,14 +818,84 @@ class Account:
                 f"Could not create note '{name}' with body '{body}'"
             )
 
-        new_note = Note(note)
+        invalidate_queries(self.name)
+        new_note = Note(note, self.name, self._notes_app)
         if attachments:
-            for attachment in attachments:
-                if not os.path.exists(attachment):
-                    raise FileNotFoundError(f"File {attachment} does not exist")
-                new_note.add_attachment(attachment)
+            new_note.add_attachments(attachments)
         return new_note
 
+    def make_notes(
+        self,
+        notes: Iterable[tuple[str, str] | tuple[str, str, str | None]],
+        folder: str | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> list["Note"]:
+        """Create many new notes in account
+
+        Notes are inserted in batches of consecutive notes that share a folder:
+        each folder is looked up once and the folder's notes are only counted
+        before and after each batch to verify the notes were created.
+
+        Args:
+            notes: iterable of (name, body) or (name, body, folder) tuples; body is HTML;
+                if folder is not provided or None, folder argument is used
+            folder: optional folder to create notes in; if None, uses default folder
+            progress: optional callable called with number of notes created after each note
+
+        Returns:
+            list of Note objects for new notes in same order as notes
+
+        Raises:
+            MakeNotesError: if notes could not be created or a folder could not be found;
+                the error's notes attribute lists the notes that were created so the
+                caller can avoid creating them again
+        """
+        new_notes = []
+        try:
+            for note_folder, batch in itertools.groupby(
+                notes, key=lambda note: (note[2] if len(note) > 2 else None) or folder
+            ):
+                folder_obj = (
+                    self._folder_for_name(note_folder)
+                    if note_folder
+                    else self._account.defaultFolder()
+                )
+                folder_notes = folder_obj.notes()
+                len_before = len(folder_notes)
+                count = 0
+                for name, body, *_ in batch:
+                    note = self._new_note_object(name, body)
+                    folder_notes.addObject_(note)
+                    new_notes.append(Note(note, self.name, self._notes_app))
+                    count += 1
+                    if progress:
+                        progress(1)
+                if (added := len(folder_notes) - len_before) < count:
+                    # assume notes were added in order up to the first that failed
+                    del new_notes[len(new_notes) - count + max(added, 0) :]
+                    raise ScriptingBridgeError(
+                        f"Could not create {count} notes in folder '{note_folder or self.default_folder}'"
+                    )
+        except Exception as e:
+            raise MakeNotesError(str(e), notes=new_notes) from e
+        finally:
+            # invalidate after inserting so a query made during the insert isn't cached
+            if new_notes:
+                invalidate_queries(self.name)
+        return new_notes
+
+    def _new_note_object(self, name: str, body: str) -> ScriptingBridge.SBObject:
+        """Return new ScriptingBridge note object with name and body; note must be added to a folder"""
+        # reference: https://developer.apple.com/documentation/scriptingbridge/sbobject/1423973-initwithproperties
+        properties = {
+            "body": f"<div><h1>{name}</h1></div>\n{body}",
+        }
+        return (
+            self._notes_app.app.classForScriptingClass_("note")
+            .alloc()
+            .initWithProperties_(properties)
+        )
+
     def _noteslist(
         self,
         name: list[str] | None = None,
@@ -438,10 +941,13 @@ class Account:
         return notes
 
     def _folder_for_name(self, folder: str) -> ScriptingBridge.SBObject:
-        """Return ScriptingBridge folder object for folder"""
+        """Return ScriptingBridge folder object for folder; memoized by folder name"""
+        if folder_obj := self._folder_objs.get(folder):
+            return folder_obj
         if folder_objs := self._account.folders().filteredArrayUsingPredicate_(
             AppKit.NSPredicate.predicateWithFormat_("name == %@", folder)
         ):
+            self._folder_objs[folder] = folder_objs[0]
             return folder_objs[0]
         else:
             raise ValueError(f"Could not find folder {folder}")
@@ -459,6 +965,7 @@ class Account:
             Folder object for the new folder
         """
         run_script("folderCreate", self.name, folder_name)
+        invalidate_queries(self.name)
         return self.folder(folder_name)
 
     def delete_folder(self, folder_name: str):
@@ -468,6 +975,45 @@ class Account:
             folder_name: name of folder to delete
         """
         run_script("folderDelete", self.name, folder_name)
+        self._folder_objs.pop(folder_name, None)
+        invalidate_queries(self.name)
+
+    def move_notes(
+        self, notes: Iterable["Note" | str], folder_name: str
+    ) -> list[str | None]:
+        """Move many notes in this account to a folder with a single AppleScript call
+
+        Args:
+            notes: notes, or ids of notes, to move
+            folder_name: name of folder to move notes to
+
+        Returns:
+            list with None for each note moved or the error message if the note
+            could not be moved, in same order as notes
+        """
+        note_ids = [note if isinstance(note, str) else note.id for note in notes]
+        if not note_ids:
+            return []
+        results = self._run_script("accountMoveNotes", note_ids, folder_name)
+        invalidate_queries(self.name)
+        return [str(result) or None for result in results]
+
+    def delete_notes(self, notes: Iterable["Note" | str]) -> list[str | None]:
+        """Delete many notes in this account with a single AppleScript call
+
+        Args:
+            notes: notes, or ids of notes, to delete
+
+        Returns:
+            list with None for each note deleted or the error message if the note
+            could not be deleted, in same order as notes
+        """
+        note_ids = [note if isinstance(note, str) else note.id for note in notes]
+        if not note_ids:
+            return []
+        results = self._run_script("accountDeleteNotes", note_ids)
+        invalidate_queries(self.name)
+        return [str(result) or None for result in results]
 
     def __len__(self) -> int:
         """Return count of notes"""
@@ -477,7 +1023,7 @@ class Account:
     def __iter__(self) -> Generator[Note, None, None]:
         """Generator to yield all notes contained in Notes.app"""
         for note in self._account.notes():
-            yield Note(note)
+            yield Note(note, self.name, self._notes_app)
 
 
 class NotesList:
@@ -501,28 +1047,49 @@ class NotesList:
     @property
     def body(self) -> list[str]:
         """Return body of every note in list as list of strings"""
-        result = self._apply_selector("body")
-        # Fallback for macOS versions where bulk body selector doesn't work
-        if not result:
-            result = []
-            for noteslist in self._noteslist:
-                for note in noteslist:
-                    b = note.body()
-                    result.append(str(b) if b else "")
-        return result
+        return self._body(str)
+
+    @property
+    def stripped_body(self) -> list[str]:
+        """Return body of every note in list with inline data: URIs (e.g. pasted images) replaced by placeholders
+
+        Each body is stripped as it is converted from the result of the single bulk
+        read so a list of the full bodies is never built; see macnotesapp.inline_data for details.
+        """
+        return self._body(lambda body: strip_inline_data(body)[0] if body else "")
+
+    def _body(self, transform: Callable[[Any], str]) -> list[str]:
+        """Return body of every note in list, each passed through transform"""
+        # the bulk body selector doesn't work on some macOS versions; fall back to reading each note
+        return (
+            get_capabilities().call(
+                "noteslist.body",
+                {
+                    STRATEGY_BULK: lambda: self._apply_selector(
+                        "body", transform, strict=True
+                    ),
+                    STRATEGY_PER_NOTE: lambda: self._apply_per_note("body", transform),
+                },
+            )
+            or []
+        )
 
     @property
     def plaintext(self) -> list[str]:
         """Return plaintext of every note in list as list of strings"""
-        result = self._apply_selector("plaintext")
-        # Fallback for macOS versions where bulk plaintext selector doesn't work
-        if not result:
-            result = []
-            for noteslist in self._noteslist:
-                for note in noteslist:
-                    pt = note.plaintext()
-                    result.append(str(pt) if pt else "")
-        return result
+        # the bulk plaintext selector doesn't work on some macOS versions; fall back to reading each note
+        return (
+            get_capabilities().call(
+                "noteslist.plaintext",
+                {
+                    STRATEGY_BULK: lambda: self._apply_selector(
+                        "plaintext", strict=True
+                    ),
+                    STRATEGY_PER_NOTE: lambda: self._apply_per_note("plaintext"),
+                },
+            )
+            or []
+        )
 
     @property
     def container(self) -> list[str]:
@@ -549,44 +1116,202 @@ class NotesList:
         """Return whether every note in list is password protected as list of bools"""
         return self._apply_selector("passwordProtected")
 
-    def asdict(self) -> list[dict[str, str]]:
-        """Return list of dict representations of note"""
+    @property
+    def attachments(self) -> list[list["Attachment"]]:
+        """Return attachments of every note in list as list of lists of Attachment objects"""
         return [
-            {
-                "id": note[0],
-                "name": note[1],
-                "body": note[2],
-                "plaintext": note[3],
-                "creation_date": note[4],
-                "modification_date": note[5],
-                "password_protected": note[6],
-                "folder": note[7],
-            }
-            for note in zip(
-                self.id,
-                self.name,
-                self.body,
-                self.plaintext,
-                self.creation_date,
-                self.modification_date,
-                self.password_protected,
-                self.container,
-            )
+            unique_attachments(r)
+            for results in self._select("attachments")
+            if results is not None
+            for r in results
+        ]
+
+    def grep(
+        self,
+        pattern: str | re.Pattern,
+        ignore_case: bool = False,
+        max_workers: int | None = None,
+        use_cache: bool = True,
+    ) -> Generator[GrepResult, None, None]:
+        """Search plaintext of notes in list for a regular expression
+
+        The plaintext of all notes is read in one request (notes whose plaintext is in
+        the conversion cache and unchanged are not read) and searched locally, in
+        worker processes if there is a lot of text.
+
+        Args:
+            pattern: regular expression to search each line of plaintext for
+            ignore_case: if True, match case-insensitively
+            max_workers: max number of worker processes used to search
+            use_cache: if True, read and update plaintext in the conversion cache
+
+        Yields:
+            GrepResult for each note with a matching line, as soon as it is found
+
+        Raises:
+            re.error: if pattern is not a valid regular expression
+        """
+        ids = self.id
+        names = self.name
+        yield from grep_texts(
+            pattern,
+            ids,
+            names,
+            self._plaintext_for(ids, use_cache),
+            ignore_case=ignore_case,
+            max_workers=max_workers,
+        )
+
+    def duplicates(
+        self,
+        threshold: float = DUPLICATE_THRESHOLD,
+        max_workers: int | None = None,
+        use_cache: bool = True,
+    ) -> list[DuplicateCluster]:
+        """Find groups of notes in list whose plaintext is nearly identical
+
+        Similarity is estimated from MinHash signatures of each note's plaintext and
+        only notes that share a locality-sensitive hash bucket are compared, so the
+        cost grows roughly linearly with the number of notes.
+
+        Args:
+            threshold: min estimated similarity (0.0 to 1.0) for notes to be duplicates
+            max_workers: max number of worker processes used to compute signatures
+            use_cache: if True, read and update plaintext in the conversion cache
+
+        Returns:
+            list of DuplicateCluster, largest first; the notes in each cluster are
+            ordered most recently modified first
+        """
+        ids = self.id
+        dates = self.modification_date
+        texts = self._plaintext_for(ids, use_cache, dates)
+        order = sorted(range(len(ids)), key=lambda i: dates[i], reverse=True)
+        return find_duplicates(
+            [ids[i] for i in order],
+            [texts[i] for i in order],
+            threshold=threshold,
+            max_workers=max_workers,
+        )
+
+    def _plaintext_for(
+        self,
+        ids: list[str],
+        use_cache: bool,
+        dates: list[datetime] | None = None,
+    ) -> list[str]:
+        """Return plaintext of notes in list, using the conversion cache for unchanged notes"""
+        if not use_cache:
+            return self.plaintext
+        dates = dates or self.modification_date
+        cache = get_conversion_cache()
+        cached = cache.get_many(zip(ids, dates), FORMAT_PLAINTEXT)
+        if len(cached) == len(ids):
+            return [cached[note_id] for note_id in ids]
+        # if most notes are missing, read every note rather than build a large predicate
+        missing = [note_id for note_id in ids if note_id not in cached]
+        noteslist = self._with_ids(missing) if len(missing) * 2 < len(ids) else self
+        fetched = dict(zip(noteslist.id, noteslist.plaintext))
+        cache.put_many(
+            (
+                (note_id, date, fetched[note_id])
+                for note_id, date in zip(ids, dates)
+                if note_id not in cached and note_id in fetched
+            ),
+            FORMAT_PLAINTEXT,
+        )
+        return [
+            cached[note_id] if note_id in cached else fetched.get(note_id, "")
+            for note_id in ids
         ]
 
-    def _apply_selector(self, selector) -> list[str]:
-        """Return note properties in list that pass selector"""
+    def asdict(self, strip_inline_data: bool = False) -> list[dict[str, str]]:
+        """Return list of dict representations of note
+
+        Args:
+            strip_inline_data: if True, replace inline data: URIs in body with placeholders
+        """
+        return list(self.iterdicts(strip_inline_data))
+
+    def iterdicts(
+        self, strip_inline_data: bool = False, body: bool = True
+    ) -> Generator[dict[str, Any], None, None]:
+        """Yield dict representation of each note in list
+
+        Each property is read for every note with a single request to Notes.app and
+        the dicts are built one at a time as they are yielded.
+
+        Args:
+            strip_inline_data: if True, replace inline data: URIs in body with placeholders
+            body: if False, body and plaintext are not read or included
+        """
+        columns = {"id": self.id, "name": self.name}
+        if body:
+            columns["body"] = self.stripped_body if strip_inline_data else self.body
+            columns["plaintext"] = self.plaintext
+        columns["creation_date"] = self.creation_date
+        columns["modification_date"] = self.modification_date
+        columns["password_protected"] = self.password_protected
+        columns["folder"] = self.container
+        for note in zip(*columns.values()):
+            yield dict(zip(columns, note))
+
+    def _with_ids(self, ids: list[str]) -> NotesList:
+        """Return NotesList of the notes in list whose id is in ids"""
+        predicate = AppKit.NSPredicate.predicateWithFormat_(
+            " OR ".join(["(id == %@)"] * len(ids)), *ids
+        )
+        return NotesList(
+            *(
+                noteslist.filteredArrayUsingPredicate_(predicate)
+                for noteslist in self._noteslist
+            )
+        )
+
+    def _apply_selector(
+        self, selector, transform: Callable[[Any], str] = str, strict: bool = False
+    ) -> list[str] | None:
+        """Return note properties in list that pass selector; string values are passed through transform
+
+        A SBElementArray for which the selector returns None is skipped or, if strict
+        is True and the array isn't empty, None is returned as the bulk selector doesn't work.
+        """
         results_list = []
-        for noteslist in self._noteslist:
-            results = noteslist.arrayByApplyingSelector_(selector)
+        for noteslist, results in zip(self._noteslist, self._select(selector)):
             if results is None:
+                if strict and len(noteslist):
+                    return None
                 continue
             if selector in ["creationDate", "modificationDate"]:
                 results_list.extend(NSDate_to_datetime(date) for date in results)
             elif selector == "container":
                 results_list.extend(str(container.name()) for container in results)
             else:
-                results_list.extend([str(r) for r in results])
+                results_list.extend([transform(r) for r in results])
+        return results_list
+
+    def _select(self, selector: str) -> list[AppKit.NSArray | None]:
+        """Return results of applying selector to each SBElementArray in list; None for any that return None
+
+        Concurrent calls for the same selector on this NotesList share one request to Notes.app.
+        """
+        return get_singleflight().do(
+            ("noteslist", id(self), selector),
+            lambda: [
+                noteslist.arrayByApplyingSelector_(selector)
+                for noteslist in self._noteslist
+            ],
+        )
+
+    def _apply_per_note(
+        self, selector, transform: Callable[[Any], str] = str
+    ) -> list[str]:
+        """Return note properties in list by calling selector on each note individually"""
+        results_list = []
+        for noteslist in self._noteslist:
+            for note in noteslist:
+                value = getattr(note, selector)()
+                results_list.append(transform(value) if value else "")
         return results_list
 
     def __len__(self) -> int:
@@ -597,8 +1322,25 @@ class NotesList:
 class Note:
     """Note object representing a note in Notes.app"""
 
-    def __init__(self, note: ScriptingBridge.SBObject):
+    def __init__(
+        self,
+        note: ScriptingBridge.SBObject,
+        account_name: str | None = None,
+        notes_app: NotesApp | None = None,
+    ):
+        """Initialize Note object
+
+        Args:
+            note: ScriptingBridge note object
+            account_name: name of account note belongs to, if known; used to invalidate cached queries after writes
+            notes_app: NotesApp the note was read through; created when first needed if not provided
+        """
         self._note = note
+        self._account_name = account_name
+        self._notes_app = notes_app
+        # hash of last value of name/body read or written by this object and the
+        # modification date of the note when it had that value, if known
+        self._content_hashes: dict[str, tuple[str, datetime | None]] = {}
 
     @property
     def account(self) -> str:
@@ -620,91 +1362,160 @@ class Note:
     @property
     def name(self) -> str:
         """Return name of note"""
-        return (
-            str(name)
-            if (name := self._note.name())
-            else self._run_script("noteGetName")
-        )
+        return self._remember_content("name", self._read("name", self._get_name))
 
     @name.setter
     def name(self, name: str):
-        """Set name of note"""
-        self._note.setValue_forKey_(name, "name")
-        if self.name != name:
-            self._run_script("noteSetName", name)
+        """Set name of note
+
+        Nothing is written if name is the same as the last name read or written by this
+        object and the note has not been modified since.
+        """
+        self._set_content("name", name, "noteSetName")
+
+    def _get_name(self) -> str:
+        """Return name of note read from Notes.app"""
+        return get_capabilities().call(
+            "note.name",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    str(name) if (name := self._note.name()) is not None else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: self._run_script("noteGetName"),
+            },
+        )
 
     @property
     def body(self) -> str:
         """Return body of note"""
-        return (
-            str(body)
-            if (body := self._note.body())
-            else str(self._run_script("noteGetBody"))
-        )
+        return self._remember_content("body", self._read("body", self._get_body))
 
     @body.setter
     def body(self, body: str):
-        """Set body of note"""
-        self._note.setValue_forKey_(body, "body")
-        if self.body != body:
-            self._run_script("noteSetBody", body)
+        """Set body of note
+
+        Nothing is written if body is the same as the last body read or written by this
+        object and the note has not been modified since.
+        """
+        self._set_content("body", body, "noteSetBody")
+
+    def _get_body(self) -> str:
+        """Return body of note read from Notes.app"""
+        return get_capabilities().call(
+            "note.body",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    str(body) if (body := self._note.body()) is not None else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: str(self._run_script("noteGetBody")),
+            },
+        )
 
     @property
     def plaintext(self) -> str:
         """Return plaintext of note"""
-        return (
-            str(plaintext)
-            if (plaintext := self._note.plaintext())
-            else str(self._run_script("noteGetPlainText"))
+        return self._read(
+            "plaintext",
+            lambda: get_capabilities().call(
+                "note.plaintext",
+                {
+                    STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                        str(plaintext)
+                        if (plaintext := self._note.plaintext()) is not None
+                        else None
+                    ),
+                    STRATEGY_APPLESCRIPT: lambda: str(
+                        self._run_script("noteGetPlainText")
+                    ),
+                },
+            ),
         )
 
     @property
     def creation_date(self) -> datetime:
         """Return creation date of note as datetime"""
-        if date := self._note.creationDate():
-            return NSDate_to_datetime(date)
-        else:
-            return self._run_script("noteGetCreationDate")
+        return get_capabilities().call(
+            "note.creation_date",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    NSDate_to_datetime(date)
+                    if (date := self._note.creationDate())
+                    else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: self._run_script("noteGetCreationDate"),
+            },
+        )
 
     @property
     def modification_date(self) -> datetime:
         """Return modification date of note as datetime"""
-        if date := self._note.modificationDate():
-            return NSDate_to_datetime(date)
-        else:
-            return self._run_script("noteGetModificationDate")
+        return get_capabilities().call(
+            "note.modification_date",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    NSDate_to_datetime(date)
+                    if (date := self._note.modificationDate())
+                    else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: self._run_script(
+                    "noteGetModificationDate"
+                ),
+            },
+        )
 
     @property
     def password_protected(self) -> bool:
         """Return password protected status of note"""
-        # return self._note.passwordProtected() # returns False even when note is password protected on some OS versions
-        if MAC_OS_VERSION >= 13:
-            return bool(self._note.passwordProtected())
-        return bool(self._run_script("noteGetPasswordProtected"))
+        # self._note.passwordProtected() returns False even when note is password protected on some OS versions
+        # so a False value can't be used to detect that ScriptingBridge doesn't work;
+        # use the OS version to select the strategy instead of probing
+        return get_capabilities().call(
+            "note.password_protected",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: bool(self._note.passwordProtected()),
+                STRATEGY_APPLESCRIPT: lambda: bool(
+                    self._run_script("noteGetPasswordProtected")
+                ),
+            },
+            default=(
+                STRATEGY_SCRIPTINGBRIDGE
+                if MAC_OS_VERSION >= 13
+                else STRATEGY_APPLESCRIPT
+            ),
+        )
 
     @property
     def folder(self) -> str:
         """Return name of folder note is contained in"""
         # calling container() method on note object returns None
         # in many cases, so use AppleScript instead
-        return self._note.container().name() or self._run_script("noteGetContainer")
+        return get_capabilities().call(
+            "note.folder",
+            {
+                STRATEGY_SCRIPTINGBRIDGE: lambda: (
+                    str(container.name())
+                    if (container := self._note.container())
+                    else None
+                ),
+                STRATEGY_APPLESCRIPT: lambda: self._run_script("noteGetContainer"),
+            },
+        )
 
     @property
     def attachments(self) -> list["Attachment"]:
         """Return list of attachments for note as Attachment objects"""
+        return unique_attachments(self._note.attachments())
 
-        # .attachments() method on note object sometimes returns duplicates, e.g each attachment is returned twice
-        # filter out duplicates by comparing attachment ID
-        # this appears to happen only with attachments added via AppleScript or ScriptingBridge
-        # not with those natively added in Notes.app
-        attachments = [
-            Attachment(attachment) for attachment in self._note.attachments()
-        ]
-        return [
-            attachment
-            for i, attachment in enumerate(attachments)
-            if attachment.id not in [a.id for a in attachments[:i]]
-        ]
+    @property
+    def backlinks(self) -> list["Note"]:
+        """Return notes that link to this note, most recently modified first
+
+        Backlinks are read from the link index (see NotesApp.backlinks()), which is
+        refreshed with the notes that changed since it was last used.
+        """
+        if self._notes_app is None:
+            self._notes_app = NotesApp()
+        return self._notes_app.backlinks(self)
 
     def add_attachment(self, path: str | os.PathLike) -> "Attachment":
         """Add attachment to note
@@ -739,6 +1550,94 @@ class Note:
             )
         return Attachment(self._note.attachments().objectWithID_(attachment_id))
 
+    def add_attachments(self, paths: Iterable[str | os.PathLike]) -> list["Attachment"]:
+        """Add multiple attachments to note in a single AppleScript call
+
+        This is much faster than calling add_attachment() for each file.
+
+        Args:
+            paths: paths to files to attach
+
+        Returns:
+            list of Attachment objects for attached files in same order as paths
+
+        Raises:
+            FileNotFoundError: if any file not found; no attachments are added in this case
+        """
+
+        # must pass fully resolved paths to attachments
+        paths = [pathlib.Path(path).expanduser().resolve() for path in paths]
+        if missing := [str(path) for path in paths if not path.exists()]:
+            raise FileNotFoundError(f"File not found: {', '.join(missing)}")
+        if not paths:
+            return []
+
+        results = self._run_script("noteAddAttachments", [str(path) for path in paths])
+
+        # if AppleScript can't read the id of a new attachment, the handler returns the
+        # error message which contains the id (see add_attachment)
+        attachment_ids = [
+            (
+                str(result)
+                if str(result).startswith("x-coredata://")
+                else parse_id_from_error(str(result))
+            )
+            for result in results
+        ]
+        if None in attachment_ids or len(attachment_ids) != len(paths):
+            raise AppleScriptError(
+                f"Could not get attachment ids for attachments at paths {paths}"
+            )
+        attachments = self._note.attachments()
+        return [
+            Attachment(attachments.objectWithID_(attachment_id))
+            for attachment_id in attachment_ids
+        ]
+
+    def update(
+        self,
+        body: str | None = None,
+        name: str | None = None,
+        if_unmodified_since: datetime | None = None,
+    ) -> UpdateResult:
+        """Update body and/or name of note, optionally only if note hasn't been modified since a given date
+
+        If if_unmodified_since is provided, the modification date of the note is checked and
+        the note is updated in a single AppleScript call so the note is not overwritten if it
+        was changed (for example, on another device) after if_unmodified_since.
+        Modification dates are compared with a resolution of one second.
+
+        Args:
+            body: new body of note as HTML; if None, body is not changed
+            name: new name of note; if None, name is not changed
+            if_unmodified_since: only update note if it has not been modified after this date
+
+        Returns:
+            UpdateResult; UpdateResult.conflict is True if note was not updated because it had been modified
+        """
+        if if_unmodified_since is None:
+            if body is not None:
+                self.body = body
+            if name is not None:
+                self.name = name
+            return UpdateResult(updated=True)
+
+        updated, modification_date = self._run_script(
+            "noteUpdateIfUnmodified",
+            if_unmodified_since,
+            name is not None,
+            name or "",
+            body is not None,
+            body or "",
+        )
+        if updated:
+            invalidate_queries(self._account_name)
+            if body is not None:
+                self._remember_content("body", body, modification_date)
+            if name is not None:
+                self._remember_content("name", name, modification_date)
+        return UpdateResult(updated=bool(updated), modification_date=modification_date)
+
     def show(self):
         """Show note in Notes.app UI"""
         self._run_script("noteShow")
@@ -746,6 +1645,7 @@ class Note:
     def delete(self):
         """Delete this note from Notes.app"""
         run_script("noteDelete", self.id)
+        invalidate_queries(self._account_name)
 
     def move(self, folder_name: str):
         """Move this note to a different folder.
@@ -753,16 +1653,43 @@ class Note:
         Args:
             folder_name: name of folder to move note to
         """
-        run_script("noteMove", self.id, folder_name, self.account)
+        account = self.account
+        run_script("noteMove", self.id, folder_name, account)
+        invalidate_queries(account)
+
+    @property
+    def stripped_body(self) -> str:
+        """Return body of note with inline data: URIs (e.g. pasted images) replaced by placeholders"""
+        return strip_inline_data(self.body)[0]
+
+    @property
+    def inline_data(self) -> list[InlineData]:
+        """Return list of InlineData for each inline data: URI in body of note"""
+        return [item for item, *_ in iter_inline_data(self.body)]
+
+    def inline_data_bytes(self, hash: str) -> bytes:
+        """Return decoded bytes of the inline data in body of note with InlineData.hash hash
 
-    def asdict(self) -> dict[str, Any]:
-        """Return dict representation of note"""
+        Raises:
+            KeyError: if note does not contain inline data with hash
+        """
+        return extract_inline_data(self.body, hash)
+
+    def asdict(
+        self, strip_inline_data: bool = False, body: bool = True
+    ) -> dict[str, Any]:
+        """Return dict representation of note
+
+        Args:
+            strip_inline_data: if True, replace inline data: URIs in body with placeholders
+            body: if False, body and plaintext are not read or included
+        """
+        data = {"account": self.account, "id": self.id, "name": self.name}
+        if body:
+            data["body"] = self.stripped_body if strip_inline_data else self.body
+            data["plaintext"] = self.plaintext
         return {
-            "account": self.account,
-            "id": self.id,
-            "name": self.name,
-            "body": self.body,
-            "plaintext": self.plaintext,
+            **data,
             "creation_date": self.creation_date,
             "modification_date": self.modification_date,
             "password_protected": self.password_protected,
@@ -773,6 +1700,60 @@ class Note:
         """Run AppleScript script"""
         return run_script(script, self.account, self.id, *args)
 
+    def _read(self, prop: str, getter: Callable[[], T]) -> T:
+        """Read prop with getter; concurrent reads of the same prop of this note share one read"""
+        return get_singleflight().do(("note", self.id, prop), getter)
+
+    def _set_content(self, prop: str, value: str, script: str):
+        """Set name or body of note, skipping the write if value is unchanged
+
+        The modification date is only read if value is the same as the last value read
+        or written by this object. The write is then skipped if the note's modification
+        date is the same as when the note was known to have that value; if that date
+        isn't known (reads and writes don't fetch it) the current value is read once to
+        check the note still has value and the date is recorded for next time.
+        Otherwise the note may have been changed elsewhere (on another device or through
+        another Note object) and value is written.
+
+        Args:
+            prop: "name" or "body"
+            value: new value
+            script: AppleScript handler used to set the value if ScriptingBridge fails
+        """
+        getter = self._get_name if prop == "name" else self._get_body
+        value_hash = content_hash(value)
+        last_hash, last_modification_date = self._content_hashes.get(prop, (None, None))
+        if last_hash == value_hash:
+            # read the date before the value so a change between the reads isn't missed
+            modification_date = self.modification_date
+            if last_modification_date is None and getter() == value:
+                self._remember_content(prop, value, modification_date)
+                last_modification_date = modification_date
+            if (
+                last_modification_date is not None
+                and last_modification_date == modification_date
+            ):
+                logger.debug(f"Skipping write of unchanged {prop} for note {self.id}")
+                return
+        self._note.setValue_forKey_(value, prop)
+        if _should_verify_write() and getter() != value:
+            self._run_script(script, value)
+        self._remember_content(prop, value)
+        invalidate_queries(self._account_name)
+
+    def _remember_content(
+        self, prop: str, value: str, modification_date: datetime | None = None
+    ) -> str:
+        """Record hash of value of name or body and, if known, the note's modification date
+        when it had value; returns value
+
+        Recorded values let unchanged writes be skipped; modification_date must be read
+        before value so a change made between the two reads is not mistaken for value.
+        """
+        if value is not None:
+            self._content_hashes[prop] = (content_hash(str(value)), modification_date)
+        return value
+
     def _parse_id_from_object(self) -> str:
         """Parse the ID from the object representation when it can't be determined by ScriptingBridge"""
 
@@ -864,6 +1845,25 @@ class Folder:
         return str(self._folder.name())
 
 
+def unique_attachments(
+    attachments: ScriptingBridge.SBElementArray,
+) -> list[Attachment]:
+    """Return list of Attachment objects for attachments with duplicates removed"""
+
+    # .attachments() method on note object sometimes returns duplicates, e.g each attachment is returned twice
+    # filter out duplicates by comparing attachment ID
+    # this appears to happen only with attachments added via AppleScript or ScriptingBridge
+    # not with those natively added in Notes.app
+    seen = set()
+    unique = []
+    for attachment in attachments or []:
+        attachment = Attachment(attachment)
+        if attachment.id not in seen:
+            seen.add(attachment.id)
+            unique.append(attachment)
+    return unique
+
+
 def parse_id_from_error(error: str) -> str | None:
     """Parse the ID from the object representation from an AppleScript error"""
     # there are cases where AppleScript returns an error such as:
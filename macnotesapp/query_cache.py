@@ -0,0 +1,162 @@
+"""In-process cache of NotesApp.notes() query results
+
+Each query filters notes with an NSPredicate that is evaluated by Notes.app; running
+the same query again within a few seconds usually returns the same notes. Results are
+cached keyed by the normalized filter arguments for a short time (TTL) and the least
+recently used results are evicted when the cache is full.
+
+Every write made through the library calls invalidate_queries() for the account that
+was changed which increments that account's generation; a cached result is only used if
+the generations of the accounts it covers are unchanged. Generations are shared by all
+QueryCache instances in the process so a write through one NotesApp invalidates results
+cached by every NotesApp.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+# default number of seconds a query result is cached
+QUERY_CACHE_TTL = 5.0
+
+# default max number of query results cached
+QUERY_CACHE_MAX_ENTRIES = 128
+
+_generation_lock = threading.Lock()
+
+# incremented by every write
+_generation = 0
+
+# incremented by writes when the account written to is not known
+_all_accounts_generation = 0
+
+# incremented by writes to each account
+_account_generations: dict[str, int] = {}
+
+
+def invalidate_queries(account: str | None = None):
+    """Invalidate cached query results that include account or all results if account is None
+
+    Args:
+        account: name of account that was changed; None if not known
+    """
+    global _generation, _all_accounts_generation
+    with _generation_lock:
+        _generation += 1
+        if account is None:
+            _all_accounts_generation += 1
+        else:
+            _account_generations[account] = _account_generations.get(account, 0) + 1
+
+
+def _generations(accounts: tuple[str, ...] | None) -> tuple:
+    """Return generations a result for a query of accounts (None for all accounts) depends on"""
+    with _generation_lock:
+        if accounts is None:
+            return (_generation,)
+        return (
+            _all_accounts_generation,
+            *(_account_generations.get(account, 0) for account in accounts),
+        )
+
+
+def query_key(query: str, **filters: Any) -> tuple:
+    """Return hashable key for query with filters; the order of values in list filters is ignored
+
+    Args:
+        query: name of query, e.g. "notes"
+        **filters: filter arguments passed to the query
+    """
+    return (
+        query,
+        tuple(
+            (name, tuple(sorted(value)) if isinstance(value, list) else value)
+            for name, value in sorted(filters.items())
+        ),
+    )
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires: float
+    accounts: tuple[str, ...] | None
+    generations: tuple
+
+
+class QueryCache:
+    """LRU cache of query results that expire after a TTL or when an account they include is written to"""
+
+    def __init__(
+        self, ttl: float = QUERY_CACHE_TTL, max_entries: int = QUERY_CACHE_MAX_ENTRIES
+    ):
+        """Create QueryCache
+
+        Args:
+            ttl: seconds a result is cached; if 0, results are not cached
+            max_entries: max number of results cached
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_query(
+        self,
+        key: Hashable,
+        accounts: list[str] | None,
+        query: Callable[[], Any],
+        fresh: bool = False,
+    ) -> Any:
+        """Return cached result for key or call query() and cache its result
+
+        Args:
+            key: key for the query, see query_key()
+            accounts: names of accounts the query includes or None for all accounts
+            query: callable that runs the query
+            fresh: if True, always run the query (the result is still cached)
+
+        Returns:
+            result of query
+        """
+        accounts = tuple(sorted(accounts)) if accounts else None
+        if not self.ttl or self.max_entries <= 0:
+            return query()
+        if not fresh:
+            with self._lock:
+                entry = self._entries.get(key)
+                if (
+                    entry
+                    and entry.expires > time.monotonic()
+                    and entry.generations == _generations(entry.accounts)
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self.misses += 1
+        # generations are read before the query so a write made while it runs invalidates the result
+        generations = _generations(accounts)
+        value = query()
+        with self._lock:
+            self._entries[key] = _Entry(
+                value, time.monotonic() + self.ttl, accounts, generations
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Remove all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,425 @@
+"""On-disk TF-IDF index used to find notes related to a note
+
+The name and plaintext of each note are split into words and the count of each word is
+stored in a sparse vector; notes are compared by the cosine similarity of their TF-IDF
+weighted vectors. The vectors and an inverted index of word to the notes that contain
+it are stored as flat arrays in a binary file next to the JSON index so loading the index
+does not parse a large JSON document. To find related notes only the posting lists of
+the query note's highest weighted words are read, so a query does not touch every note.
+
+Rebuilding the arrays takes time proportional to the number of words in all notes so
+they are not rebuilt every time a note changes: notes added or modified since the arrays
+were built are kept in a small delta segment (and the old versions of modified or
+deleted notes are masked) until the delta grows to RELATED_MERGE_FRACTION of the notes,
+when everything is merged into new arrays.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from .local_index import LocalIndex
+from .logging import logger
+from .utils import write_file_atomic
+
+if TYPE_CHECKING:
+    from .notesapp import NotesApp, NotesList
+
+RELATED_INDEX_FILENAME = "related_index.json"
+
+# number of highest weighted words of a note used to find related notes
+RELATED_MAX_QUERY_TERMS = 64
+
+# fraction of notes that may be in the delta segment or masked before arrays are rebuilt
+RELATED_MERGE_FRACTION = 0.1
+
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+_STOP_WORDS = frozenset("""
+    about after all also an and any are as at be been but by can could did do does
+    for from had has have he her his how if in into is it its just me more my no not
+    of on or our out she so some than that the their them then there these they this
+    to up us was we were what when which who will with would you your
+    """.split())
+
+# arrays stored in the binary file, in order, with their typecodes; post_weights are
+# term frequency weights so they do not change when the document frequencies change
+_ARRAYS = {
+    "doc_indptr": "I",
+    "doc_terms": "I",
+    "doc_counts": "I",
+    "norms": "f",
+    "term_indptr": "I",
+    "post_docs": "I",
+    "post_weights": "f",
+    "delta_indptr": "I",
+    "delta_terms": "I",
+    "delta_counts": "I",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Return lower case words in text, excluding numbers, single letters, and common English words"""
+    return [
+        word
+        for word in _WORD.findall((text or "").casefold())
+        if word not in _STOP_WORDS
+    ]
+
+
+class RelatedIndex(LocalIndex):
+    """TF-IDF index of the words in notes for finding related notes"""
+
+    filename = RELATED_INDEX_FILENAME
+    version = 1
+
+    def __init__(self, path=None):
+        self._vocabulary: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._arrays: dict[str, array] = {
+            name: array(typecode) for name, typecode in _ARRAYS.items()
+        }
+        # notes in the arrays and indices of those that were since modified or deleted
+        self._doc_ids: list[str] = []
+        self._doc_index: dict[str, int] = {}
+        self._masked: set[int] = set()
+        # vectors, postings and norms of notes added or modified since arrays were built
+        self._delta: dict[str, tuple[array, array]] = {}
+        self._delta_postings: dict[int, list[tuple[str, float]]] = {}
+        self._delta_norms: dict[str, float] = {}
+        super().__init__(path)
+
+    @property
+    def arrays_path(self):
+        """Path to binary file with the index arrays"""
+        return self.path.with_suffix(".bin")
+
+    def related(
+        self, note_id: str, k: int = 10, accounts: list[str] | None = None
+    ) -> list[tuple[str, float]]:
+        """Return ids of up to k notes most similar to note note_id with their cosine similarity
+
+        Args:
+            note_id: id of note to find related notes for
+            k: max number of notes to return
+            accounts: if provided, only return notes in these accounts
+
+        Returns:
+            list of (note id, similarity) tuples, most similar first; empty if note_id is
+            not in the index or has no indexed words
+        """
+        if note_id in self._delta:
+            terms, counts = self._delta[note_id]
+            norm = self._delta_norms[note_id]
+        elif (doc := self._doc_index.get(note_id)) is not None:
+            terms, counts = self._doc_vector(doc)
+            norm = self._arrays["norms"][doc]
+        else:
+            return []
+        if not norm:
+            return []
+
+        count = self._count()
+        idf = {term: _idf(count, self._frequency(term)) for term in terms}
+        query = heapq.nlargest(
+            RELATED_MAX_QUERY_TERMS,
+            (
+                (_tf_weight(term_count) * idf[term], term)
+                for term, term_count in zip(terms, counts)
+            ),
+        )
+
+        # scores of notes in the arrays are keyed by index, notes in delta by id
+        scores: dict[int | str, float] = {}
+        term_indptr = self._arrays["term_indptr"]
+        post_docs, post_weights = (
+            self._arrays["post_docs"],
+            self._arrays["post_weights"],
+        )
+        masked = self._masked
+        for weight, term in query:
+            weight *= idf[term]
+            if term + 1 < len(term_indptr):
+                start, end = term_indptr[term], term_indptr[term + 1]
+                for other, other_weight in zip(
+                    post_docs[start:end], post_weights[start:end]
+                ):
+                    if other not in masked:
+                        scores[other] = scores.get(other, 0.0) + weight * other_weight
+            for other, other_weight in self._delta_postings.get(term, ()):
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        scores.pop(note_id, None)
+        scores.pop(self._doc_index.get(note_id), None)
+
+        norms = self._arrays["norms"]
+        results = []
+        for other, score in scores.items():
+            if isinstance(other, str):
+                other_id, other_norm = other, self._delta_norms[other]
+            else:
+                other_id, other_norm = self._doc_ids[other], norms[other]
+            if other_norm and (
+                not accounts or self.notes[other_id]["account"] in accounts
+            ):
+                results.append((score / (norm * other_norm), other_id))
+        return [(other_id, score) for score, other_id in heapq.nlargest(k, results)]
+
+    def save(self):
+        """Save index to disk; the arrays are written before the JSON index that refers to them"""
+        arrays = dict(self._arrays)
+        arrays["delta_indptr"] = array("I", [0])
+        arrays["delta_terms"] = array("I")
+        arrays["delta_counts"] = array("I")
+        for terms, counts in self._delta.values():
+            arrays["delta_terms"].extend(terms)
+            arrays["delta_counts"].extend(counts)
+            arrays["delta_indptr"].append(len(arrays["delta_terms"]))
+        header = json.dumps(
+            {
+                "version": self.version,
+                "updated": self.updated,
+                "byteorder": sys.byteorder,
+                "terms": self._terms,
+                "ids": self._doc_ids,
+                "masked": sorted(self._masked),
+                "delta_ids": list(self._delta),
+                "lengths": [len(arrays[name]) for name in _ARRAYS],
+            }
+        ).encode("utf-8")
+        write_file_atomic(
+            self.arrays_path,
+            b"".join(
+                [struct.pack("<Q", len(header)), header]
+                + [arrays[name].tobytes() for name in _ARRAYS]
+            ),
+        )
+        super().save()
+
+    def _index(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        for note_id, data in self._fetch(
+            notesapp, account, noteslist, ids, changed, ["name", "plaintext"]
+        ).items():
+            counts = Counter(
+                self._term_id(word)
+                for word in tokenize(f"{data['name']}\n{data['plaintext']}")
+            )
+            terms = sorted(counts)
+            self._delta[note_id] = (
+                array("I", terms),
+                array("I", (counts[term] for term in terms)),
+            )
+            if (doc := self._doc_index.get(note_id)) is not None:
+                self._masked.add(doc)
+        return {}
+
+    def _rebuild(self):
+        """Mask deleted notes and index the delta segment or, if it is large, merge it into new arrays"""
+        for note_id, doc in self._doc_index.items():
+            if note_id not in self.notes:
+                self._masked.add(doc)
+        for note_id in [
+            note_id for note_id in self._delta if note_id not in self.notes
+        ]:
+            del self._delta[note_id]
+        if len(self._delta) + len(self._masked) > RELATED_MERGE_FRACTION * len(
+            self._doc_ids
+        ):
+            self._merge()
+        self._index_delta()
+
+    def _merge(self):
+        """Build new arrays from the unmasked notes in the arrays and the notes in the delta segment"""
+        vectors = {
+            note_id: self._doc_vector(doc)
+            for doc, note_id in enumerate(self._doc_ids)
+            if doc not in self._masked
+        }
+        vectors.update(self._delta)
+
+        # drop words no longer in any note; ids are remapped in order so vectors stay sorted
+        frequencies = [0] * len(self._terms)
+        for terms, _ in vectors.values():
+            for term in terms:
+                frequencies[term] += 1
+        remap = [0] * len(self._terms)
+        terms_in_use = []
+        for term, frequency in enumerate(frequencies):
+            if frequency:
+                remap[term] = len(terms_in_use)
+                terms_in_use.append(self._terms[term])
+        idf = [_idf(len(vectors), frequency) for frequency in frequencies if frequency]
+        self._terms = terms_in_use
+        self._vocabulary = {word: term for term, word in enumerate(self._terms)}
+
+        arrays = {name: array(typecode) for name, typecode in _ARRAYS.items()}
+        arrays["doc_indptr"].append(0)
+        postings: list[list[int]] = [[] for _ in self._terms]
+        weights: list[list[float]] = [[] for _ in self._terms]
+        for doc, (terms, counts) in enumerate(vectors.values()):
+            terms = array("I", (remap[term] for term in terms))
+            arrays["doc_terms"].extend(terms)
+            arrays["doc_counts"].extend(counts)
+            arrays["doc_indptr"].append(len(arrays["doc_terms"]))
+            squares = 0.0
+            for term, term_count in zip(terms, counts):
+                weight = _tf_weight(term_count)
+                postings[term].append(doc)
+                weights[term].append(weight)
+                squares += (weight * idf[term]) ** 2
+            arrays["norms"].append(math.sqrt(squares))
+        arrays["term_indptr"].append(0)
+        for term_postings, term_weights in zip(postings, weights):
+            arrays["post_docs"].extend(term_postings)
+            arrays["post_weights"].extend(term_weights)
+            arrays["term_indptr"].append(len(arrays["post_docs"]))
+
+        self._arrays = arrays
+        self._doc_ids = list(vectors)
+        self._doc_index = {note_id: doc for doc, note_id in enumerate(self._doc_ids)}
+        self._masked = set()
+        self._delta = {}
+        logger.debug(f"Merged {self.path.name}: {len(self._doc_ids)} notes")
+
+    def _index_delta(self):
+        """Build postings and norms of the notes in the delta segment"""
+        self._delta_postings = {}
+        for note_id, (terms, counts) in self._delta.items():
+            for term, term_count in zip(terms, counts):
+                self._delta_postings.setdefault(term, []).append(
+                    (note_id, _tf_weight(term_count))
+                )
+        count = self._count()
+        self._delta_norms = {
+            note_id: math.sqrt(
+                sum(
+                    (_tf_weight(term_count) * _idf(count, self._frequency(term))) ** 2
+                    for term, term_count in zip(terms, counts)
+                )
+            )
+            for note_id, (terms, counts) in self._delta.items()
+        }
+
+    def _count(self) -> int:
+        """Return number of notes in the index"""
+        return len(self._doc_ids) - len(self._masked) + len(self._delta)
+
+    def _frequency(self, term: int) -> int:
+        """Return number of notes with term; masked notes in the arrays are counted until the next merge"""
+        term_indptr = self._arrays["term_indptr"]
+        frequency = len(self._delta_postings.get(term, ()))
+        if term + 1 < len(term_indptr):
+            frequency += term_indptr[term + 1] - term_indptr[term]
+        return frequency
+
+    def _doc_vector(self, doc: int) -> tuple[array, array]:
+        """Return (terms, counts) of note with index doc in the arrays"""
+        start, end = (
+            self._arrays["doc_indptr"][doc],
+            self._arrays["doc_indptr"][doc + 1],
+        )
+        return (
+            self._arrays["doc_terms"][start:end],
+            self._arrays["doc_counts"][start:end],
+        )
+
+    def _term_id(self, word: str) -> int:
+        """Return id of word in vocabulary, adding it if necessary"""
+        term = self._vocabulary.get(word)
+        if term is None:
+            term = self._vocabulary[word] = len(self._terms)
+            self._terms.append(word)
+        return term
+
+    def _load(self):
+        """Load index from disk; discard it if the arrays are missing or do not match the JSON index"""
+        super()._load()
+        if not self.notes:
+            return
+        try:
+            self._load_arrays()
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.warning(f"Rebuilding index {self.path}: {e}")
+            self.notes = {}
+            self.folders = {}
+            self.updated = 0.0
+
+    def _load_arrays(self):
+        """Load arrays from arrays_path"""
+        data = self.arrays_path.read_bytes()
+        (header_length,) = struct.unpack_from("<Q", data)
+        offset = 8 + header_length
+        header = json.loads(data[8:offset])
+        masked = set(header["masked"])
+        live_ids = {
+            note_id for doc, note_id in enumerate(header["ids"]) if doc not in masked
+        }
+        if (
+            header["version"] != self.version
+            or header["updated"] != self.updated
+            or header["byteorder"] != sys.byteorder
+            or live_ids | set(header["delta_ids"]) != self.notes.keys()
+        ):
+            raise ValueError("arrays do not match index")
+        arrays = {}
+        for (name, typecode), length in zip(_ARRAYS.items(), header["lengths"]):
+            arrays[name] = array(typecode)
+            size = length * arrays[name].itemsize
+            arrays[name].frombytes(data[offset : offset + size])
+            offset += size
+
+        self._terms = header["terms"]
+        self._vocabulary = {word: term for term, word in enumerate(self._terms)}
+        self._doc_ids = header["ids"]
+        self._doc_index = {note_id: doc for doc, note_id in enumerate(self._doc_ids)}
+        self._masked = masked
+        # the delta segment is kept as vectors; its arrays are only used on disk
+        indptr = arrays["delta_indptr"]
+        terms, counts = arrays["delta_terms"], arrays["delta_counts"]
+        self._delta = {
+            note_id: (
+                terms[indptr[delta] : indptr[delta + 1]],
+                counts[indptr[delta] : indptr[delta + 1]],
+            )
+            for delta, note_id in enumerate(header["delta_ids"])
+        }
+        for name in ("delta_indptr", "delta_terms", "delta_counts"):
+            arrays[name] = array(_ARRAYS[name])
+        self._arrays = arrays
+
+
+def _tf_weight(count: int) -> float:
+    """Return sublinear term frequency weight of a word that occurs count times in a note"""
+    return 1.0 + math.log(count)
+
+
+def _idf(count: int, frequency: int) -> float:
+    """Return smoothed inverse document frequency of a word in frequency of count notes"""
+    return math.log((count + 1) / (frequency + 1)) + 1.0
+
+
+def get_related_index(notesapp: NotesApp, max_age: float = 0) -> RelatedIndex:
+    """Return RelatedIndex loaded from the cache directory, refreshing it first if it is older than max_age seconds
+
+    Args:
+        notesapp: NotesApp used to refresh the index
+        max_age: max age in seconds of index before it is refreshed; by default it is always refreshed
+    """
+    index = RelatedIndex()
+    if index.age > max_age:
+        index.refresh(notesapp)
+    return index
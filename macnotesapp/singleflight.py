@@ -0,0 +1,118 @@
+"""Coalesce concurrent identical reads from Notes.app into a single request
+
+When several threads read the same thing at the same time (for example the notes in an
+account or the body of a note), each read would send its own Apple Events to Notes.app.
+SingleFlight.do() runs the first call for a key and makes every call for the same key
+that arrives while it is running wait for and share its result (or exception).
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Counts of calls made through a SingleFlight
+
+    Attributes:
+        calls: total number of calls to do()
+        executions: number of calls that ran their function
+        coalesced: number of calls that shared the result of a call already in flight
+    """
+
+    calls: int
+    executions: int
+    coalesced: int
+
+
+class _Call:
+    """A call in flight"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Runs at most one call at a time for each key; concurrent calls for the key share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._count = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Call fn() and return its result unless a call for key is in flight, in which case wait for and return its result
+
+        Args:
+            key: hashable key identifying the read; calls with equal keys must return the same result
+            fn: callable that performs the read
+
+        Returns:
+            result of fn() or of the call in flight for key
+
+        Raises:
+            any exception raised by fn() or by the call in flight for key
+        """
+        with self._lock:
+            self._count += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """SingleFlightStats for calls made since created or reset_stats() was called"""
+        with self._lock:
+            return SingleFlightStats(self._count, self._executions, self._coalesced)
+
+    def reset_stats(self):
+        """Reset counts of calls to 0"""
+        with self._lock:
+            self._count = self._executions = self._coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently in flight"""
+        with self._lock:
+            return len(self._calls)
+
+
+_singleflight: SingleFlight | None = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    """Return the SingleFlight shared by all reads from Notes.app in this process"""
+    global _singleflight
+    with _singleflight_lock:
+        if _singleflight is None:
+            _singleflight = SingleFlight()
+        return _singleflight
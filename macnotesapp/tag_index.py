@@ -0,0 +1,111 @@
+"""On-disk index of #hashtags and @mentions in notes
+
+Tags are extracted from the plaintext of each note, read from Notes.app in one bulk
+request when the index is built and only for new or modified notes afterwards. An
+inverted index of tag to note ids is built when the index is loaded so notes with a
+tag are found without searching the text of every note.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .local_index import LocalIndex
+
+if TYPE_CHECKING:
+    from .notesapp import NotesApp, NotesList
+
+TAG_INDEX_FILENAME = "tag_index.json"
+
+# #tag or @mention not preceded by a word character (so email addresses and
+# URL fragments are not matched); a tag must contain at least one non-digit
+_TAG = re.compile(r"(?<![\w#@&/])([#@])(\w[\w/-]*\w|\w)")
+
+
+def extract_tags(text: str) -> list[str]:
+    """Return sorted list of unique lower case #hashtags and @mentions in text, including the # or @"""
+    return sorted(
+        {
+            f"{marker}{tag.casefold()}"
+            for marker, tag in _TAG.findall(text or "")
+            if not tag.isdigit()
+        }
+    )
+
+
+def normalize_tag(tag: str) -> str:
+    """Return tag in the form stored in the index: lower case with leading # unless it is an @mention"""
+    tag = tag.strip().casefold()
+    return tag if tag.startswith(("#", "@")) else f"#{tag}"
+
+
+class TagIndex(LocalIndex):
+    """Index of #hashtags and @mentions in notes"""
+
+    filename = TAG_INDEX_FILENAME
+    version = 1
+
+    def tags(self, account: str | None = None) -> dict[str, int]:
+        """Return dict of tag to number of notes with the tag, sorted by tag
+
+        Args:
+            account: if provided, only count notes in this account
+        """
+        return {
+            tag: count
+            for tag, note_ids in sorted(self._postings.items())
+            if (
+                count := sum(
+                    1
+                    for note_id in note_ids
+                    if account is None or self.notes[note_id]["account"] == account
+                )
+            )
+        }
+
+    def note_ids(self, tags: Iterable[str], match_all: bool = False) -> set[str]:
+        """Return ids of notes with any of tags or, if match_all is True, with all of tags
+
+        Tags are case-insensitive; a tag without a leading # or @ is treated as a #hashtag.
+        """
+        postings = [self._postings.get(normalize_tag(tag), set()) for tag in tags]
+        if not postings:
+            return set()
+        if match_all:
+            return set.intersection(*postings)
+        return set.union(*postings)
+
+    def _index(
+        self,
+        notesapp: NotesApp,
+        account: str,
+        noteslist: NotesList,
+        ids: list[str],
+        changed: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        return {
+            note_id: {"tags": extract_tags(data["plaintext"])}
+            for note_id, data in self._fetch(
+                notesapp, account, noteslist, ids, changed, ["plaintext"]
+            ).items()
+        }
+
+    def _rebuild(self):
+        self._postings: dict[str, set[str]] = {}
+        for note_id, entry in self.notes.items():
+            for tag in entry.get("tags", []):
+                self._postings.setdefault(tag, set()).add(note_id)
+
+
+def get_tag_index(notesapp: NotesApp, max_age: float = 0) -> TagIndex:
+    """Return TagIndex loaded from the cache directory, refreshing it first if it is older than max_age seconds
+
+    Args:
+        notesapp: NotesApp used to refresh the index
+        max_age: max age in seconds of index before it is refreshed; by default it is always refreshed
+    """
+    index = TagIndex()
+    if index.age > max_age:
+        index.refresh(notesapp)
+    return index
@@ -1,9 +1,13 @@
 """Utility functions for macnotesapp"""
 
 import datetime
+import os
+import pathlib
 import platform
+import tempfile
 
 import Foundation
+from xdg_base_dirs import xdg_cache_home, xdg_data_home
 
 
 def NSDate_to_datetime(nsdate: Foundation.NSDate) -> datetime.datetime:
@@ -32,3 +36,68 @@ def get_macos_version():
             )
         )
     return (ver, major, minor)
+
+
+# below this many items, converting in-process is faster than starting a process pool
+PROCESS_POOL_THRESHOLD = 50
+
+
+def executor_chunksize(count: int) -> int:
+    """Return chunksize for Executor.map() so each worker process gets a reasonable batch of count items"""
+    return max(1, min(64, count // ((os.cpu_count() or 1) * 4)))
+
+
+def get_cache_dir() -> pathlib.Path:
+    """Get the directory where cache files are stored; create it if necessary."""
+    cache_dir = xdg_cache_home() / "macnotesapp"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_data_dir() -> pathlib.Path:
+    """Get the directory where persistent data such as note history is stored; create it if necessary."""
+    data_dir = xdg_data_home() / "macnotesapp"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def _umask() -> int:
+    """Return the process umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once at import: os.umask() can only be read by setting it, which is not thread safe
+_FILE_MODE = 0o666 & ~_umask()
+
+
+def write_file_atomic(path: str | os.PathLike, content: str | bytes):
+    """Write content to path atomically by writing to a temporary file then renaming it
+
+    The file gets the mode of the file it replaces or, for a new file, the default
+    mode for the umask, rather than the 0600 mode of the temporary file.
+
+    Args:
+        path: path to write; parent directories are created if necessary
+        content: text or bytes to write
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _FILE_MODE
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        os.fchmod(fd, mode)
+        with (
+            os.fdopen(fd, "wb")
+            if isinstance(content, bytes)
+            else os.fdopen(fd, "w", encoding="utf-8")
+        ) as fp:
+            fp.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,195 @@
+"""Write-behind queue that coalesces updates to notes and writes them on a background thread"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    from .notesapp import Note
+
+# default number of seconds an update is held so later updates to the same note can replace it
+WRITE_BEHIND_WINDOW = 1.0
+
+# default max number of notes written concurrently
+WRITE_BEHIND_WORKERS = 2
+
+
+@dataclass
+class _PendingWrite:
+    """Latest name and/or body queued for a note and when it is due to be written"""
+
+    note: Note
+    body: str | None
+    name: str | None
+    due: float
+    count: int = 1
+
+
+class WriteBehindQueue:
+    """Queue of updates to notes that are written to Notes.app on a background thread
+
+    Updates to the same note made within window seconds of the first queued update
+    are coalesced so only the latest name and body are written; the number of writes
+    (and Apple Events) scales with the number of distinct notes updated rather than
+    the number of updates. At most one write to a given note is in flight at a time
+    so writes to a note are never reordered.
+
+    Use NotesApp.write_behind() to create a WriteBehindQueue. Updates are not visible
+    in Notes.app until they are written; call flush() to write all queued updates
+    immediately and close() (or use the queue as a context manager) when done.
+    """
+
+    def __init__(
+        self,
+        window: float = WRITE_BEHIND_WINDOW,
+        max_workers: int = WRITE_BEHIND_WORKERS,
+        on_error: Callable[[Note, Exception], None] | None = None,
+    ):
+        """Create WriteBehindQueue
+
+        Args:
+            window: seconds to hold an update before writing it
+            max_workers: max number of notes to write concurrently
+            on_error: optional callable called with note and exception if a write fails;
+                if None, failed writes are logged
+        """
+        if window < 0:
+            raise ValueError(f"window must be >= 0: {window}")
+        self.window = window
+        self.on_error = on_error
+        self.updates = 0
+        self.writes = 0
+        self.errors = 0
+        self._pending: dict[str, _PendingWrite] = {}
+        self._in_flight: set[str] = set()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="macnotesapp-write"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="macnotesapp-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of notes with updates that have not yet been written"""
+        with self._condition:
+            return len(self._pending) + len(self._in_flight)
+
+    def update(self, note: Note, body: str | None = None, name: str | None = None):
+        """Queue update of body and/or name of note
+
+        If an update to the same note is already queued, it is replaced; a name or
+        body not given in this update is kept from the earlier one.
+
+        Args:
+            note: Note to update
+            body: new body of note as HTML; if None, body is not changed
+            name: new name of note; if None, name is not changed
+        """
+        if body is None and name is None:
+            return
+        note_id = note.id
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self.updates += 1
+            if pending := self._pending.get(note_id):
+                pending.note = note
+                pending.body = body if body is not None else pending.body
+                pending.name = name if name is not None else pending.name
+                pending.count += 1
+                return
+            self._pending[note_id] = _PendingWrite(
+                note, body, name, time.monotonic() + self.window
+            )
+            self._condition.notify()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write all queued updates now and wait for them to complete
+
+        Args:
+            timeout: max seconds to wait; if None, wait until all updates are written
+
+        Returns:
+            True if all updates were written (or failed) before timeout, otherwise False
+        """
+        with self._condition:
+            now = time.monotonic()
+            for pending in self._pending.values():
+                pending.due = now
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout
+            )
+
+    def close(self, timeout: float | None = None):
+        """Write all queued updates and stop the queue; no more updates may be queued
+
+        Args:
+            timeout: max seconds to wait for queued updates to be written
+        """
+        with self._condition:
+            if self._closed:
+                return
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        """Background thread: submit updates to the executor as they become due"""
+        with self._condition:
+            while not (self._closed and not self._pending):
+                now = time.monotonic()
+                due = [
+                    note_id
+                    for note_id, pending in self._pending.items()
+                    if pending.due <= now and note_id not in self._in_flight
+                ]
+                for note_id in due:
+                    pending = self._pending.pop(note_id)
+                    self._in_flight.add(note_id)
+                    self._executor.submit(self._write, note_id, pending)
+                waiting = [
+                    pending.due
+                    for note_id, pending in self._pending.items()
+                    if note_id not in self._in_flight
+                ]
+                self._condition.wait(max(0, min(waiting) - now) if waiting else None)
+
+    def _write(self, note_id: str, pending: _PendingWrite):
+        """Write a pending update to Notes.app"""
+        try:
+            logger.debug(
+                f"Writing {pending.count} coalesced update(s) to note {note_id}"
+            )
+            pending.note.update(body=pending.body, name=pending.name)
+        except Exception as e:
+            with self._condition:
+                self.errors += 1
+            if self.on_error:
+                self.on_error(pending.note, e)
+            else:
+                logger.error(f"Error writing note {note_id}: {e}")
+        finally:
+            with self._condition:
+                self.writes += 1
+                self._in_flight.discard(note_id)
+                self._condition.notify_all()
+
+    def __enter__(self) -> "WriteBehindQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,9 +1,16 @@
 """Test Python to AppleScript interface for macnotesapp """
 
+import datetime
+import threading
+import time
+
 import pytest
 import questionary
 
 from macnotesapp import Account, Note, NotesApp
+from macnotesapp.history import HistoryStore
+from macnotesapp.name_index import MATCH_EXACT, MATCH_FUZZY, NameIndex
+from macnotesapp.singleflight import SingleFlight
 
 from .utils import get_macos_version
 
@@ -51,6 +58,24 @@ def test_notes_account_with_name(notes):
     assert account.name == account_name
 
 
+def test_notes_account_memoized(notes):
+    """Test NotesApp.account() returns the same Account object for the same account"""
+    account_name = notes.accounts[0]
+    assert notes.account(account_name) is notes.account(account_name)
+
+
+def test_notes_account_summaries(notes):
+    """Test NotesApp.account_summaries()"""
+    summaries = notes.account_summaries()
+    assert [summary.name for summary in summaries] == notes.accounts
+    for summary in summaries:
+        account = notes.account(summary.name)
+        assert summary.id == account.id
+        assert summary.notes_count == len(account)
+        assert summary.folders_count == len(account.folders)
+        assert summary.default_folder == account.default_folder
+
+
 def test_notes_len(notes):
     """Test NotesApp.__len__"""
     assert prompt(f"Are there {len(notes)} notes?")
@@ -136,6 +161,20 @@ def test_notes_make_note_with_attachment(notes):
     )
 
 
+@pytest.mark.skipif(get_macos_version() < (13, 0, 0), reason="Requires macOS 13.0 or higher")
+def test_note_add_attachments(notes):
+    """Test Note.add_attachments"""
+    print("This test will make a new note in the default account.")
+    name = "Note with attachments"
+    body = "This note has two attachments. #macnotesapp<br>"
+    note = notes.make_note(name=name, body=body)
+    attachments = note.add_attachments([ATTACHMENT_PATH, ATTACHMENT_PATH])
+    assert len(attachments) == 2
+    assert prompt(
+        f"Was a new note named '{name}' created in default account with 2 attachments?"
+    )
+
+
 def test_notes_quit(notes):
     notes.quit()
     assert prompt("Did Notes.app quit?")
@@ -234,6 +273,51 @@ def test_account_make_note_in_folder(notes):
     )
 
 
+def test_account_make_notes(notes):
+    """Test Account.make_notes"""
+    print("\nThis test will make 3 new notes in an account you choose.")
+    account_name = questionary.select(
+        "\nPlease select name of account to use for test: ",
+        choices=notes.accounts,
+        default=notes.default_account,
+    ).ask()
+    account = notes.account(account_name)
+    new_notes = account.make_notes(
+        (f"macnotesapp test note {i}", f"<div>Test note {i} #macnotesapp</div>")
+        for i in range(1, 4)
+    )
+    assert len(new_notes) == 3
+    assert [note.name for note in new_notes] == [
+        f"macnotesapp test note {i}" for i in range(1, 4)
+    ]
+    assert prompt(
+        f"Were 3 new notes named 'macnotesapp test note 1..3' created in account '{account.name}'?"
+    )
+
+
+def test_account_move_notes(notes):
+    """Test Account.move_notes"""
+    print("\nThis test will move the 3 notes created by test_account_make_notes.")
+    account_name = questionary.select(
+        "\nPlease select name of account to use for test: ",
+        choices=notes.accounts,
+        default=notes.default_account,
+    ).ask()
+    account = notes.account(account_name)
+    folder_name = questionary.select(
+        "\nPlease select folder to move notes to: ",
+        choices=account.folders,
+    ).ask()
+    test_notes = account.notes(
+        name=[f"macnotesapp test note {i}" for i in range(1, 4)]
+    )
+    assert len(test_notes) == 3
+    assert account.move_notes(test_notes, folder_name) == [None, None, None]
+    assert prompt(
+        f"Were notes 'macnotesapp test note 1..3' moved to folder '{folder_name}'?"
+    )
+
+
 ##### Test Note #####
 
 
@@ -285,3 +369,232 @@ def test_note_set_body(notes):
     new_body = input(f"\nEnter new body for note named '{note.name}': ")
     note.body = new_body
     assert prompt(f"Was note body for note '{note.name}' changed to '{new_body}'?")
+
+
+def test_note_update_if_unmodified_since(notes):
+    """Test Note.update() with if_unmodified_since"""
+    assert prompt("Select a note for testing that can be changed")
+    selection = notes.selection
+    assert selection
+    note = selection[0]
+    modification_date = note.modification_date
+    stale = modification_date - datetime.timedelta(seconds=60)
+    result = note.update(body="<div>stale</div>", if_unmodified_since=stale)
+    assert not result.updated
+    assert result.conflict
+    assert result.modification_date == modification_date
+    new_body = input(f"\nEnter new body for note named '{note.name}': ")
+    result = note.update(body=new_body, if_unmodified_since=modification_date)
+    assert result.updated
+    assert prompt(f"Was note body for note '{note.name}' changed to '{new_body}'?")
+
+
+def test_notesapp_write_behind(notes):
+    """Test NotesApp.write_behind()"""
+    assert prompt("Select a note for testing that can be changed")
+    selection = notes.selection
+    assert selection
+    note = selection[0]
+    with notes.write_behind(window=0.5) as queue:
+        for i in range(10):
+            queue.update(note, body=f"<div>{note.name}</div><div>update {i}</div>")
+        assert queue.pending == 1
+    assert queue.updates == 10
+    assert queue.writes == 1
+    assert prompt(f"Does note '{note.name}' end with 'update 9'?")
+
+
+def test_notesapp_query_cache(notes):
+    """Test NotesApp.notes() results are cached and invalidated by writes"""
+    account = notes.account()
+    note = account.make_note("Query Cache Test", "<div>query cache</div>")
+    hits = notes.query_cache.hits
+    found = notes.notes(name=["Query Cache Test"], accounts=[account.name])
+    assert note in found
+    assert notes.notes(name=["Query Cache Test"], accounts=[account.name]) == found
+    assert notes.query_cache.hits == hits + 1
+    note.delete()
+    assert note not in notes.notes(name=["Query Cache Test"], accounts=[account.name])
+    assert notes.query_cache.hits == hits + 1
+
+
+def test_singleflight_coalesces_reads(notes):
+    """Test concurrent reads of the same note body share one read"""
+    note = notes.notes()[0]
+    singleflight = SingleFlight()
+    reads = []
+
+    def read_body():
+        reads.append(1)
+        time.sleep(0.2)
+        return note.body
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(singleflight.do(note.id, read_body))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(reads) == 1
+    assert results == [note.body] * 5
+    assert singleflight.stats.coalesced == 4
+
+
+def test_name_index(notes, tmp_path):
+    """Test NameIndex.refresh() and prefix completion of note names"""
+    index = NameIndex(tmp_path / "name_index.json")
+    assert index.refresh(notes) == len(notes)
+    name = notes.notes()[0].name
+    assert name in index.complete_name(name[:2].lower())
+    assert index.refresh(notes) == 0
+    assert name in NameIndex(tmp_path / "name_index.json").complete_name(name)
+
+
+def test_name_index_match(notes, tmp_path):
+    """Test NameIndex.match() ranks exact, prefix and fuzzy matches"""
+    index = NameIndex(tmp_path / "name_index.json")
+    index.refresh(notes)
+    note = notes.notes()[0]
+    name = note.name
+    matches = index.match(name.upper())
+    assert matches[0].kind == MATCH_EXACT
+    assert note.id in [match.id for match in matches if match.kind == MATCH_EXACT]
+    assert all(match.kind != MATCH_FUZZY for match in matches)
+    misspelled = name[1] + name[0] + name[2:]
+    assert any(
+        match.id == note.id for match in index.match(misspelled, max_distance=1)
+    )
+
+
+def test_notes_tags(notes):
+    """Test NotesApp.tags() and NotesApp.notes_with_tags()"""
+    account = notes.account()
+    note = account.make_note(
+        "Tag Test", "<div>#MacNotesAppTest #macnotesapptest2 @macnotesapp</div>"
+    )
+    try:
+        tags = notes.tags()
+        assert tags["#macnotesapptest"] >= 1
+        assert tags["@macnotesapp"] >= 1
+        assert note in notes.notes_with_tags(["macnotesapptest"])
+        assert note in notes.notes_with_tags(
+            ["#macnotesapptest", "@macnotesapp"], match_all=True
+        )
+        assert note not in notes.notes_with_tags(
+            ["#macnotesapptest", "#notatag"], match_all=True
+        )
+    finally:
+        note.delete()
+
+
+def test_noteslist_grep(notes):
+    """Test NotesList.grep()"""
+    account = notes.account()
+    note = account.make_note(
+        "Grep Test", "<div>first line</div><div>macnotesapp grep 1234</div>"
+    )
+    try:
+        results = list(
+            notes.noteslist(accounts=[account.name]).grep(
+                r"MACNOTESAPP grep \d+", ignore_case=True
+            )
+        )
+        assert [result.id for result in results] == [note.id]
+        result = results[0]
+        assert result.lines[result.matches[0]] == "macnotesapp grep 1234"
+        assert result.blocks(context=1)[0][0] == result.matches[0] - 1
+    finally:
+        note.delete()
+
+
+def test_noteslist_duplicates(notes):
+    """Test NotesList.duplicates()"""
+    account = notes.account()
+    text = "macnotesapp duplicate detection test with enough words to shingle"
+    original = account.make_note("Dupes Test", f"<div>{text}</div>")
+    duplicate = account.make_note("Dupes Test Copy", f"<div>{text}!</div>")
+    try:
+        clusters = notes.noteslist(accounts=[account.name]).duplicates()
+        cluster = next(cluster for cluster in clusters if original.id in cluster.ids)
+        assert sorted(cluster.ids) == sorted([original.id, duplicate.id])
+        assert cluster.similarities[0] == 1.0
+        assert cluster.similarities[1] >= 0.8
+    finally:
+        original.delete()
+        duplicate.delete()
+
+
+def test_notesapp_related(notes):
+    """Test NotesApp.related()"""
+    account = notes.account()
+    note = account.make_note(
+        "Related Test Sourdough", "<div>sourdough starter flour hydration levain</div>"
+    )
+    similar = account.make_note(
+        "Related Test Bread", "<div>feeding the sourdough levain before baking</div>"
+    )
+    other = account.make_note(
+        "Related Test Garden", "<div>planting tomatoes and basil in spring</div>"
+    )
+    try:
+        related = notes.related(note, k=5, accounts=[account.name])
+        assert related[0][0].id == similar.id
+        assert 0 < related[0][1] <= 1
+        scores = {related_note.id: score for related_note, score in related}
+        assert scores[similar.id] > scores.get(other.id, 0)
+    finally:
+        note.delete()
+        similar.delete()
+        other.delete()
+
+
+def test_note_backlinks(notes):
+    """Test Note.backlinks, NotesApp.links() and NotesApp.dead_links()"""
+    account = notes.account()
+    target = account.make_note("Link Test Target", "<div>link target</div>")
+    source = account.make_note(
+        "Link Test Source",
+        '<div>see <a href="applenotes:note/3A1F0C2E-0000-4000-8000-000000000001">'
+        "Link Test Target</a> and "
+        '<a href="applenotes:note/3A1F0C2E-0000-4000-8000-000000000002">'
+        "Link Test Missing</a></div>",
+    )
+    try:
+        assert [note.id for note in target.backlinks] == [source.id]
+        links = notes.links(source)
+        assert [link.target for link in links] == [target.id, None]
+        assert (source.id, "Link Test Missing") in [
+            (note.id, link.text) for note, link in notes.dead_links()
+        ]
+        assert source.id not in [note.id for note in notes.orphans()]
+    finally:
+        source.delete()
+        target.delete()
+
+
+def test_history_store(notes, tmp_path):
+    """Test HistoryStore records and restores versions of a note"""
+    store = HistoryStore(tmp_path / "history.sqlite")
+    account = notes.account()
+    note = account.make_note("History Test", "<div>first version</div>")
+    try:
+        first = note.body
+        assert store.snapshot_notes([note]) == 1
+        assert store.snapshot_notes([note]) == 0
+        time.sleep(1)
+        note.body = f"{first}<div>second version</div>"
+        assert store.snapshot_notes([note]) == 1
+        versions = store.versions(note.id)
+        assert len(versions) == 2
+        assert store.body(versions[0]) == first
+        assert store.body(versions[1]) == note.body
+        assert store.version_at(note.id, versions[0].modification_date) == versions[0]
+        assert versions[1].stored < versions[1].size
+    finally:
+        note.delete()
+        store.close()
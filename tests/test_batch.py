@@ -0,0 +1,188 @@
+"""Test notes batch command runner without Notes.app"""
+
+import json
+from dataclasses import dataclass, field
+
+from macnotesapp.cli.batch import BatchRunner
+from macnotesapp.notesapp import MakeNotesError
+
+
+@dataclass
+class FakeNote:
+    id: str
+    name: str
+    account: str = "iCloud"
+
+
+@dataclass
+class FakeNotesList:
+    notes: list[FakeNote]
+
+    @property
+    def id(self):
+        return [note.id for note in self.notes]
+
+    @property
+    def name(self):
+        return [note.name for note in self.notes]
+
+
+@dataclass
+class FakeAccount:
+    name: str
+    notes: list[FakeNote]
+    fail_after: int | None = None
+    calls: list[tuple] = field(default_factory=list)
+
+    def noteslist(self):
+        self.calls.append(("noteslist",))
+        return FakeNotesList(self.notes)
+
+    def delete_notes(self, note_ids):
+        self.calls.append(("delete_notes", list(note_ids)))
+        return [None for _ in note_ids]
+
+    def move_notes(self, note_ids, folder):
+        self.calls.append(("move_notes", list(note_ids), folder))
+        return [None if folder != "Locked" else "Folder is locked" for _ in note_ids]
+
+    def make_notes(self, notes):
+        created = []
+        for name, _, _ in notes:
+            if self.fail_after is not None and len(created) == self.fail_after:
+                raise MakeNotesError("Notes.app stopped responding", notes=created)
+            created.append(FakeNote(f"new{len(created)}", name, self.name))
+        return created
+
+
+class FakeNotesApp:
+    """Stand-in for NotesApp with the accounts used by grouped batch commands; records calls per account"""
+
+    def __init__(self, names, accounts=None):
+        accounts = accounts or {"iCloud": names}
+        self._accounts = {
+            account: FakeAccount(
+                account,
+                [
+                    FakeNote(f"{account}:{n}", name, account)
+                    for n, name in enumerate(names)
+                ],
+            )
+            for account, names in accounts.items()
+        }
+
+    @property
+    def accounts(self):
+        return list(self._accounts)
+
+    def account(self, name=None):
+        if name and name not in self._accounts:
+            raise ValueError(f"Could not find account {name}")
+        return self._accounts[name or "iCloud"]
+
+    def calls(self, account="iCloud"):
+        return self._accounts[account].calls
+
+
+def run(notes_app, *commands):
+    runner = BatchRunner(notes_app)
+    return list(runner.run(json.dumps(command) for command in commands))
+
+
+def test_batch_delete_by_name_exact_match():
+    """Test delete by name does not delete a note whose name only contains the name"""
+    notes_app = FakeNotesApp(["Todo archive", "todo", "Recipes"])
+    results = run(notes_app, {"op": "delete", "note": "Todo"})
+    assert results[0]["ok"]
+    assert results[0]["id"] == "iCloud:1"
+    assert notes_app.calls() == [("noteslist",), ("delete_notes", ["iCloud:1"])]
+
+
+def test_batch_delete_by_name_not_found():
+    """Test delete by name fails if no note has the exact name"""
+    notes_app = FakeNotesApp(["Todo archive"])
+    results = run(notes_app, {"op": "delete", "note": "Todo"})
+    assert not results[0]["ok"]
+    assert "not found" in results[0]["error"]
+    assert notes_app.calls() == [("noteslist",)]
+
+
+def test_batch_delete_by_name_ambiguous():
+    """Test delete by name fails if more than one note has the name"""
+    notes_app = FakeNotesApp(["Todo", "TODO", "Recipes"])
+    results = run(
+        notes_app, {"op": "delete", "note": "todo"}, {"op": "delete", "id": "iCloud:2"}
+    )
+    assert not results[0]["ok"]
+    assert "2 notes" in results[0]["error"]
+    assert results[1]["ok"]
+    assert notes_app.calls()[-1] == ("delete_notes", ["iCloud:2"])
+
+
+def test_batch_move_grouped():
+    """Test consecutive moves to a folder are resolved with one read and moved with one call"""
+    notes_app = FakeNotesApp(["Todo", "Recipes", "Ideas"])
+    results = run(
+        notes_app,
+        {"op": "move", "note": "todo", "folder": "Archive"},
+        {"op": "move", "note": "Missing", "folder": "Archive"},
+        {"op": "move", "id": "iCloud:2", "folder": "Archive", "ref": 3},
+        {"op": "move", "note": "Recipes", "folder": "Locked"},
+    )
+    assert [result["ok"] for result in results] == [True, False, True, False]
+    assert results[0]["folder"] == "Archive"
+    assert results[0]["name"] == "Todo"
+    assert "not found" in results[1]["error"]
+    assert results[2]["ref"] == 3
+    assert results[3]["error"] == "Folder is locked"
+    assert notes_app.calls() == [
+        ("noteslist",),
+        ("move_notes", ["iCloud:0", "iCloud:2"], "Archive"),
+        ("noteslist",),
+        ("move_notes", ["iCloud:1"], "Locked"),
+    ]
+
+
+def test_batch_delete_mixed_accounts():
+    """Test deletes without an account find notes in every account and delete once per account"""
+    notes_app = FakeNotesApp(
+        None, accounts={"iCloud": ["Todo", "Recipes"], "On My Mac": ["Ideas"]}
+    )
+    results = run(
+        notes_app,
+        {"op": "delete", "note": "Ideas"},
+        {"op": "delete", "note": "Todo"},
+        {"op": "delete", "note": "Recipes", "account": "On My Mac"},
+        {"op": "delete", "note": "Recipes", "account": "Work"},
+    )
+    assert [result["ok"] for result in results] == [True, True, False, False]
+    assert [result.get("account") for result in results[:2]] == ["On My Mac", "iCloud"]
+    assert "not found" in results[2]["error"]
+    assert "Could not find account Work" in results[3]["error"]
+    assert notes_app.calls("iCloud") == [
+        ("noteslist",),
+        ("delete_notes", ["iCloud:0"]),
+    ]
+    assert notes_app.calls("On My Mac") == [
+        ("noteslist",),
+        ("delete_notes", ["On My Mac:0"]),
+        ("noteslist",),
+    ]
+
+
+def test_batch_add_fails_partway():
+    """Test notes created before make_notes fails are reported as created and only the rest as errors"""
+    notes_app = FakeNotesApp(["Todo"])
+    notes_app.account().fail_after = 2
+    results = run(
+        notes_app,
+        {"op": "add", "name": "One"},
+        {"op": "add", "body": "no name"},
+        {"op": "add", "name": "Two"},
+        {"op": "add", "name": "Three"},
+        {"op": "add", "name": "Four"},
+    )
+    assert [result["ok"] for result in results] == [True, False, True, False, False]
+    assert [results[0]["name"], results[2]["name"]] == ["One", "Two"]
+    assert results[1]["error"] == "Missing 'name'"
+    assert results[3]["error"] == "Notes.app stopped responding"
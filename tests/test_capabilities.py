@@ -0,0 +1,96 @@
+"""Test probing and saving of access strategies without Notes.app"""
+
+import json
+
+import pytest
+
+from macnotesapp.capabilities import Capabilities
+
+FAST = "fast"
+SLOW = "slow"
+
+
+class Strategy:
+    """Callable strategy that returns or raises result and counts its calls"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "capabilities.json"
+
+
+def call(capabilities, fast, slow, **kwargs):
+    return capabilities.call("note.name", {FAST: fast, SLOW: slow}, **kwargs)
+
+
+def test_empty_value_is_success(path):
+    """Test a strategy returning an empty value is saved and used without trying others"""
+    capabilities = Capabilities(path, key="test")
+    fast, slow = Strategy(""), Strategy("name")
+    assert call(capabilities, fast, slow) == ""
+    assert call(capabilities, fast, slow) == ""
+    assert (fast.calls, slow.calls) == (2, 0)
+    assert Capabilities(path, key="test").get("note.name") == FAST
+
+
+@pytest.mark.parametrize("failure", [None, ValueError("not supported")])
+def test_probe_skips_failed_strategy(path, failure):
+    """Test a strategy that returns None or raises is not saved"""
+    capabilities = Capabilities(path, key="test")
+    fast, slow = Strategy(failure), Strategy("name")
+    assert call(capabilities, fast, slow) == "name"
+    assert call(capabilities, fast, slow) == "name"
+    assert (fast.calls, slow.calls) == (1, 2)
+    assert json.loads(path.read_text()) == {"test": {"note.name": SLOW}}
+
+
+def test_known_strategy_fails(path):
+    """Test the other strategies are probed and saved if the known strategy stops working"""
+    Capabilities(path, key="test").set("note.name", FAST)
+    capabilities = Capabilities(path, key="test")
+    fast, slow = Strategy(RuntimeError("failed")), Strategy("name")
+    assert call(capabilities, fast, slow) == "name"
+    assert capabilities.get("note.name") == SLOW
+    assert Capabilities(path, key="test").get("note.name") == SLOW
+
+
+def test_every_strategy_fails(path):
+    """Test the last exception is raised, or None returned, and nothing is saved if no strategy works"""
+    capabilities = Capabilities(path, key="test")
+    with pytest.raises(ValueError, match="slow failed"):
+        call(capabilities, Strategy(None), Strategy(ValueError("slow failed")))
+    with pytest.raises(ValueError, match="fast failed"):
+        call(capabilities, Strategy(ValueError("fast failed")), Strategy(None))
+    assert call(capabilities, Strategy(None), Strategy(None)) is None
+    assert capabilities.get("note.name") is None
+    assert not path.exists()
+
+
+def test_default_strategy(path):
+    """Test a default strategy is saved without probing and its result is always returned"""
+    capabilities = Capabilities(path, key="test")
+    fast, slow = Strategy(False), Strategy(True)
+    assert call(capabilities, fast, slow, default=FAST) is False
+    assert (fast.calls, slow.calls) == (1, 0)
+    assert capabilities.get("note.name") == FAST
+
+
+def test_reset(path):
+    """Test reset forgets strategies for this key only"""
+    Capabilities(path, key="other").set("note.body", SLOW)
+    capabilities = Capabilities(path, key="test")
+    capabilities.set("note.name", SLOW)
+    capabilities.reset()
+    assert capabilities.strategies == {}
+    assert json.loads(path.read_text()) == {"other": {"note.body": SLOW}}
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
@@ -0,0 +1,105 @@
+"""Test conversion of Notes.app HTML to Markdown"""
+
+import base64
+import datetime
+
+import pytest
+from markdownify import markdownify
+
+from macnotesapp.conversion_cache import (
+    FORMAT_MARKDOWN,
+    FORMAT_PLAINTEXT,
+    ConversionCache,
+)
+from macnotesapp.convert import (
+    UnsupportedHTMLError,
+    convert_notes_html,
+    html_to_markdown,
+    is_notes_html,
+)
+from macnotesapp.inline_data import extract_inline_data, strip_inline_data
+
+NOTES_HTML = [
+    (
+        "<div><h1>Title</h1></div>\n<div>Hello <b>bold</b> <i>italic</i> <u>underline</u></div>\n"
+        "<div><br></div>\n<div>Second line</div>",
+        "Title\n=====\n\nHello **bold** *italic* underline\n\nSecond line",
+    ),
+    ("<div>line 1<br>line 2</div>", "line 1  \nline 2"),
+    (
+        "<ul>\n<li>one</li>\n<li>two<ul><li>nested</li></ul></li>\n</ul>\n"
+        "<ol><li>first</li><li>second</li></ol>",
+        "* one\n* two\n  + nested\n\n1. first\n2. second",
+    ),
+    (
+        '<div><a href="https://example.com">link</a></div><div><h2>Sub</h2></div>'
+        "<div><h3>Section</h3></div>",
+        "[link](https://example.com)\n\nSub\n---\n\n### Section",
+    ),
+    (
+        '<div><a href="https://example.com">https://example.com</a></div>',
+        "<https://example.com>",
+    ),
+    ("<div>2 * 3 = my_var</div>", r"2 \* 3 = my\_var"),
+    ("<div><tt>my_var</tt></div>", "`my_var`"),
+    ("<div><b>bold </b>text</div>", "**bold** text"),
+    ("<div>&lt;tag&gt; &amp;</div>", "<tag> &"),
+    ('<div><img src="image.png" alt="picture"></div>', "![picture](image.png)"),
+]
+
+
+@pytest.mark.parametrize("html,markdown", NOTES_HTML)
+def test_convert_notes_html(html, markdown):
+    """Test convert_notes_html with HTML used by Notes.app"""
+    assert is_notes_html(html)
+    assert convert_notes_html(html) == markdown
+    assert html_to_markdown(html) == markdown
+
+
+def test_html_to_markdown_fallback():
+    """Test html_to_markdown falls back to markdownify for HTML outside the Notes.app subset"""
+    html = "<div><object><table><tr><td>cell</td></tr></table></object></div>"
+    assert not is_notes_html(html)
+    with pytest.raises(UnsupportedHTMLError):
+        convert_notes_html(html)
+    assert html_to_markdown(html) == markdownify(html)
+
+
+def test_conversion_cache(tmp_path):
+    """Test ConversionCache only returns renderings for unchanged notes and evicts least recently used"""
+    cache = ConversionCache(tmp_path / "conversions.sqlite", max_size=100)
+    modified = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    cache.put("note1", modified, FORMAT_MARKDOWN, "x" * 40)
+    assert cache.get("note1", modified, FORMAT_MARKDOWN) == "x" * 40
+    assert cache.get("note1", modified, FORMAT_PLAINTEXT) is None
+    assert (
+        cache.get("note1", modified + datetime.timedelta(seconds=1), FORMAT_MARKDOWN)
+        is None
+    )
+
+    cache.put("note2", modified, FORMAT_MARKDOWN, "y" * 40)
+    cache.get("note1", modified, FORMAT_MARKDOWN)
+    cache.put("note3", modified, FORMAT_MARKDOWN, "z" * 40)
+    assert cache.size <= 100
+    assert cache.get("note2", modified, FORMAT_MARKDOWN) is None
+    assert cache.get("note1", modified, FORMAT_MARKDOWN) == "x" * 40
+    cache.close()
+
+
+def test_strip_inline_data():
+    """Test strip_inline_data replaces data: URIs with placeholders and extract_inline_data decodes them"""
+    data = bytes(range(256)) * 100
+    html = (
+        f'<div><img src="data:image/png;base64,{base64.b64encode(data).decode()}"></div>'
+        "<div>metadata: not a URI</div>"
+    )
+    stripped, items = strip_inline_data(html)
+    assert len(items) == 1
+    assert items[0].mime_type == "image/png"
+    assert stripped == (
+        f'<div><img src="{items[0].placeholder}"></div><div>metadata: not a URI</div>'
+    )
+    assert strip_inline_data(html)[1] == items
+    assert extract_inline_data(html, items[0].hash) == data
+    with pytest.raises(KeyError):
+        extract_inline_data(html, "missing")
@@ -0,0 +1,77 @@
+"""Test near-duplicate detection without Notes.app"""
+
+import macnotesapp.dupes
+from macnotesapp.dupes import (
+    MINHASH_SIZE,
+    _candidate_pairs,
+    find_duplicates,
+    minhash_signature,
+    similarity,
+)
+
+TEXT = (
+    "Meeting notes for the quarterly planning session. We discussed the roadmap, "
+    "hiring for the platform team, the budget for next year and the launch date "
+    "of the new mobile application. Action items were assigned to each owner."
+)
+
+
+def test_minhash_signature():
+    """Test signatures ignore case and whitespace and are None for text shorter than a shingle"""
+    signature = minhash_signature(TEXT)
+    assert len(signature) == MINHASH_SIZE
+    assert minhash_signature(TEXT.upper().replace(" ", "\n  ")) == signature
+    assert minhash_signature("abc") is None
+    assert minhash_signature(None) is None
+    # short texts leave bins empty but still have a full signature
+    assert len(minhash_signature("short text")) == MINHASH_SIZE
+
+
+def test_similarity():
+    """Test estimated similarity is high for near-duplicates and low for unrelated text"""
+    signature = minhash_signature(TEXT)
+    assert similarity(signature, signature) == 1.0
+    edited = minhash_signature(TEXT.replace("next year", "next quarter"))
+    assert similarity(signature, edited) > 0.8
+    unrelated = minhash_signature(
+        "Pasta recipe: boil water, add salt, cook the spaghetti for nine minutes, "
+        "drain and toss with olive oil, garlic, chili flakes and parsley."
+    )
+    assert similarity(signature, unrelated) < 0.2
+
+
+def test_candidate_pairs():
+    """Test only signatures sharing a band are candidates"""
+    a = [1] * 8
+    b = [1] * 4 + [2] * 4
+    c = [3] * 8
+    assert list(_candidate_pairs([a, b, c, None], bands=2)) == [(0, 1)]
+    assert list(_candidate_pairs([None, None], bands=2)) == []
+
+
+def test_find_duplicates():
+    """Test near-duplicates are clustered in the order given, largest cluster first"""
+    ids = ["a", "b", "c", "d", "e", "f"]
+    texts = [
+        TEXT,
+        "Shopping list: milk, eggs, bread, butter, apples and coffee beans.",
+        TEXT.replace("next year", "next quarter"),
+        "Shopping list: milk, eggs, bread, butter, apples and coffee beans!",
+        TEXT + " Next meeting in two weeks.",
+        "tiny",
+    ]
+    clusters = find_duplicates(ids, texts)
+    assert [cluster.ids for cluster in clusters] == [["a", "c", "e"], ["b", "d"]]
+    assert clusters[0].similarities[0] == 1.0
+    assert all(s >= 0.8 for cluster in clusters for s in cluster.similarities)
+    assert find_duplicates(ids, texts, threshold=1.0) == []
+
+
+def test_find_duplicates_process_pool(monkeypatch):
+    """Test signatures computed in worker processes give the same clusters"""
+    ids = ["a", "b", "c"]
+    texts = [TEXT, "something else entirely, nothing alike", TEXT.upper()]
+    expected = find_duplicates(ids, texts)
+    monkeypatch.setattr(macnotesapp.dupes, "DUPES_PROCESS_POOL_THRESHOLD", 0)
+    assert find_duplicates(ids, texts, max_workers=2) == expected
+    assert [cluster.ids for cluster in expected] == [["a", "c"]]
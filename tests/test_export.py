@@ -0,0 +1,92 @@
+"""Test export of notes to files without Notes.app"""
+
+import os
+import unicodedata
+
+from macnotesapp.export import (
+    EXPORT_FORMAT_HTML,
+    MAX_FILENAME_BYTES,
+    export_notes,
+    sanitize_filename,
+)
+
+from .utils import FakeNotesApp, fake_note
+
+CAFE_NFC = unicodedata.normalize("NFC", "Café")
+CAFE_NFD = unicodedata.normalize("NFD", "Café")
+
+
+def export(notesapp, directory):
+    return export_notes(
+        notesapp, directory, format=EXPORT_FORMAT_HTML, incremental=True, max_workers=1
+    )
+
+
+def exported_files(directory):
+    return sorted(
+        str(path.relative_to(directory))
+        for path in directory.rglob("*.html")
+        if path.is_file()
+    )
+
+
+def test_export_names_differing_in_case(tmp_path):
+    """Test notes whose names differ only in case or normalization get different files"""
+    notesapp = FakeNotesApp(
+        {
+            "iCloud": [
+                fake_note("id1", "Todo", "first"),
+                fake_note("id2", "todo", "second"),
+                fake_note("id3", CAFE_NFC, "composed"),
+                fake_note("id4", CAFE_NFD, "decomposed"),
+            ]
+        }
+    )
+    assert export(notesapp, tmp_path).exported == 4
+    assert exported_files(tmp_path) == sorted(
+        [
+            "iCloud/Notes/Todo.html",
+            "iCloud/Notes/todo (2).html",
+            f"iCloud/Notes/{CAFE_NFC}.html",
+            f"iCloud/Notes/{CAFE_NFD} (2).html",
+        ]
+    )
+
+    # deleting one of the notes must not delete the file of the other
+    del notesapp.notes["iCloud"][1]
+    assert export(notesapp, tmp_path).deleted == 1
+    assert "first" in (tmp_path / "iCloud/Notes/Todo.html").read_text()
+
+
+def test_export_rename_changing_case(tmp_path):
+    """Test renaming a note so only the case of its name changes keeps its file"""
+    notesapp = FakeNotesApp({"iCloud": [fake_note("id1", "Todo", "first")]})
+    export(notesapp, tmp_path)
+    notesapp.notes["iCloud"][0] = fake_note("id1", "TODO", "second", modified=2.0)
+    assert export(notesapp, tmp_path).exported == 1
+    (path,) = exported_files(tmp_path)
+    assert "second" in (tmp_path / path).read_text()
+
+
+def test_sanitize_filename_bytes():
+    """Test long names are truncated to MAX_FILENAME_BYTES of UTF-8 without splitting characters"""
+    name = "笔记" * 100 + "\U0001f600" * 10
+    assert len(sanitize_filename(name).encode()) <= MAX_FILENAME_BYTES
+    assert len(sanitize_filename(name, reserve=9).encode()) <= MAX_FILENAME_BYTES - 9
+    assert sanitize_filename(name).startswith("笔记")
+    assert sanitize_filename("a/b: ..c") == "a_b_ ..c"
+    assert sanitize_filename("..") == "_"
+
+
+def test_export_long_names(tmp_path):
+    """Test notes with long multibyte names are exported with names the file system accepts"""
+    name = "笔记" * 100
+    notesapp = FakeNotesApp(
+        {"iCloud": [fake_note("id1", name, "first"), fake_note("id2", name, "second")]}
+    )
+    assert export(notesapp, tmp_path).exported == 2
+    files = exported_files(tmp_path)
+    assert len(files) == 2
+    assert all(
+        len(os.path.basename(path).encode()) <= MAX_FILENAME_BYTES for path in files
+    )
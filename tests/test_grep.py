@@ -0,0 +1,60 @@
+"""Test regular expression search of note text without Notes.app"""
+
+import re
+
+import pytest
+
+import macnotesapp.grep
+from macnotesapp.grep import GrepResult, grep_texts
+
+IDS = ["id1", "id2", "id3"]
+NAMES = ["Todo", "Recipes", "Empty"]
+TEXTS = [
+    "Todo\nbuy milk\ncall Alice\nbuy bread",
+    "Recipes\nPasta\nMilk and flour",
+    None,
+]
+
+
+def test_grep_texts():
+    """Test only notes with matching lines are returned with the indices of the lines"""
+    results = list(grep_texts(r"milk", IDS, NAMES, TEXTS))
+    assert results == [
+        GrepResult("id1", "Todo", TEXTS[0].splitlines(), [1]),
+    ]
+    results = list(grep_texts(r"milk", IDS, NAMES, TEXTS, ignore_case=True))
+    assert [(result.id, result.matches) for result in results] == [
+        ("id1", [1]),
+        ("id2", [2]),
+    ]
+
+
+def test_grep_texts_compiled_pattern():
+    """Test flags of a compiled pattern are used"""
+    results = list(grep_texts(re.compile(r"^b", re.IGNORECASE), IDS, NAMES, TEXTS))
+    assert [(result.id, result.matches) for result in results] == [("id1", [1, 3])]
+
+
+def test_grep_texts_invalid_pattern():
+    """Test an invalid pattern raises re.error before searching"""
+    with pytest.raises(re.error):
+        list(grep_texts(r"(", IDS, NAMES, TEXTS))
+
+
+def test_grep_texts_process_pool(monkeypatch):
+    """Test searching in worker processes returns results in the order of texts"""
+    monkeypatch.setattr(macnotesapp.grep, "GREP_PROCESS_POOL_THRESHOLD", 0)
+    monkeypatch.setattr(macnotesapp.grep, "GREP_CHUNK_SIZE", 2)
+    ids = [f"id{i}" for i in range(10)]
+    texts = [f"line\nnote {i}" if i % 3 else "line" for i in range(10)]
+    results = list(grep_texts(r"note", ids, ids, texts, max_workers=2))
+    assert [result.id for result in results] == [f"id{i}" for i in range(10) if i % 3]
+    assert all(result.matches == [1] for result in results)
+
+
+def test_grep_result_blocks():
+    """Test context around matches is merged when it overlaps or is adjacent"""
+    result = GrepResult("id", "name", [str(i) for i in range(10)], [1, 3, 8])
+    assert result.blocks() == [(1, 2), (3, 4), (8, 9)]
+    assert result.blocks(context=1) == [(0, 5), (7, 10)]
+    assert result.blocks(context=5) == [(0, 10)]
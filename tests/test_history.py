@@ -0,0 +1,106 @@
+"""Test local note history without Notes.app"""
+
+import datetime
+
+import pytest
+
+import macnotesapp.history
+from macnotesapp.history import HistoryStore, apply_delta, make_delta
+
+from .utils import FakeNotesApp, fake_note
+
+BODY = "".join(f"<div>line {i} of the note</div>\n" for i in range(50))
+
+
+def date(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite")
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "old,new",
+    [
+        (BODY, BODY.replace("line 10 ", "line ten ")),
+        (BODY, BODY + "<div>appended</div>"),
+        (BODY, "<div>new first line</div>\n" + BODY[100:]),
+        (BODY, ""),
+        ("", BODY),
+        ("no markup", "no markup at all"),
+    ],
+)
+def test_delta_round_trip(old, new):
+    """Test applying a delta to the old text gives the new text"""
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_delta_smaller_than_text():
+    """Test a small edit gives a delta much smaller than the text"""
+    delta = make_delta(BODY, BODY.replace("line 10 ", "line ten "))
+    assert len(delta) < len(BODY) // 10
+
+
+def test_history_store_record(store):
+    """Test versions are recorded when the name or body change and can be read back"""
+    assert store.record("id1", "Note", BODY, date(1), "iCloud")
+    assert not store.record("id1", "Note", BODY, date(2))
+    assert store.record("id1", "Renamed", BODY, date(3))
+    edited = BODY.replace("line 10 ", "line ten ")
+    assert store.record("id1", "Renamed", edited, date(4))
+    assert not store.record("id1", "Renamed", None, date(5))
+
+    versions = store.versions("id1")
+    assert [(version.name, version.modification_date) for version in versions] == [
+        ("Note", date(1)),
+        ("Renamed", date(3)),
+        ("Renamed", date(4)),
+    ]
+    assert [store.body(version) for version in versions] == [BODY, BODY, edited]
+    assert versions[2].stored < versions[0].stored
+    assert versions[2].size == len(edited)
+    assert store.version_at("id1", date(3.5)) == versions[1]
+    assert store.version_at("id1", date(0)) is None
+    assert store.versions("missing") == []
+    with pytest.raises(KeyError):
+        store.body(versions[-1].version + 1)
+
+
+def test_history_store_chain(store, monkeypatch):
+    """Test a version is stored in full every HISTORY_MAX_CHAIN versions and every version can be read"""
+    monkeypatch.setattr(macnotesapp.history, "HISTORY_MAX_CHAIN", 2)
+    bodies = [BODY.replace("line 10 ", f"line {i} edit ") for i in range(7)]
+    for timestamp, body in enumerate(bodies, start=1):
+        store.record("id1", "Note", body, date(timestamp))
+    versions = store.versions("id1")
+    assert [store.body(version) for version in versions] == bodies
+    # versions 1, 4 and 7 are stored in full; the others are deltas
+    stored = [version.stored for version in versions]
+    assert stored[0] == stored[3] == stored[6]
+    assert all(stored[i] < stored[0] for i in (1, 2, 4, 5))
+
+
+def test_history_store_snapshot(store):
+    """Test snapshot only records notes modified since they were last recorded"""
+    notesapp = FakeNotesApp(
+        {
+            "iCloud": [
+                fake_note("id1", "Todo", "milk", modified=1.0),
+                fake_note("id2", "Recipes", "pasta", modified=1.0),
+            ]
+        }
+    )
+    assert store.snapshot(notesapp) == 2
+    assert store.snapshot(notesapp) == 0
+    notesapp.notes["iCloud"][0] = fake_note("id1", "Todo", "bread", modified=2.0)
+    assert store.snapshot(notesapp) == 1
+    assert [version.modification_date for version in store.versions("id1")] == [
+        date(1.0),
+        date(2.0),
+    ]
+    assert "bread" in store.body(store.versions("id1")[-1])
+    assert store.size > 0
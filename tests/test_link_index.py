@@ -0,0 +1,110 @@
+"""Test extraction and indexing of links between notes without Notes.app"""
+
+import pytest
+
+from macnotesapp.link_index import (
+    LinkIndex,
+    NoteLink,
+    extract_note_links,
+    note_link_identifier,
+)
+
+from .utils import FakeNotesApp, fake_note
+
+UUID = "3f2a6c1e-8b1d-4e0a-9c55-0a1b2c3d4e5f"
+RECIPES = "x-coredata://ABC/ICNote/p2"
+
+
+def link(url, text):
+    return f'<a href="{url}">{text}</a>'
+
+
+@pytest.mark.parametrize(
+    "url,identifier",
+    [
+        (f"applenotes:note/{UUID}?ownerIdentifier=_abc", UUID.upper()),
+        (f"notes://showNote?identifier={UUID}", UUID.upper()),
+        (f"applenotes:note/{UUID.upper()}/", UUID.upper()),
+        ("x-coredata://ABC/ICNote/p6", "x-coredata://ABC/ICNote/p6"),
+        ("applenotes:folder/123", None),
+        ("https://example.com/note/123", None),
+    ],
+)
+def test_note_link_identifier(url, identifier):
+    """Test identifier of the target note is parsed from Notes.app note links"""
+    assert note_link_identifier(url) == identifier
+
+
+def test_extract_note_links():
+    """Test note links are extracted in order without duplicates and other links are ignored"""
+    body = (
+        f"<div>See {link(f'applenotes:note/{UUID}', '<b>Recipes</b>')} and "
+        f"{link('https://example.com', 'example')} and "
+        f"{link('x-coredata://ABC/ICNote/p6', 'Todo &amp; more')} and again "
+        f"<A HREF='applenotes:note/{UUID}'>Recipes</A></div>"
+    )
+    assert extract_note_links(body) == [
+        NoteLink(UUID.upper(), "Recipes"),
+        NoteLink("x-coredata://ABC/ICNote/p6", "Todo & more"),
+    ]
+    assert extract_note_links(None) == []
+
+
+@pytest.fixture
+def notesapp():
+    return FakeNotesApp(
+        {
+            "iCloud": [
+                fake_note(
+                    "meeting",
+                    "Meeting",
+                    "",
+                    modified=3.0,
+                    body=f"<div>{link(f'applenotes:note/{UUID}', 'Recipes')}</div>"
+                    f"<div>{link('applenotes:note/DEAD', 'Gone')}</div>",
+                ),
+                fake_note(RECIPES, "Recipes", "pasta", modified=1.0),
+                fake_note(
+                    "todo",
+                    "Todo",
+                    "",
+                    modified=2.0,
+                    body=f"<div>{link(RECIPES, 'Cookbook')}</div>",
+                ),
+                fake_note("lonely", "Lonely", "no links", modified=4.0),
+            ]
+        }
+    )
+
+
+def test_link_index(tmp_path, notesapp):
+    """Test links resolve by note id or name, backlinks, orphans and dead links"""
+    path = tmp_path / "link_index.json"
+    index = LinkIndex(path)
+    index.refresh(notesapp)
+
+    assert index.links("meeting") == [
+        NoteLink(UUID.upper(), "Recipes", RECIPES),
+        NoteLink("DEAD", "Gone", None),
+    ]
+    assert index.backlinks(RECIPES) == ["meeting", "todo"]
+    assert index.backlinks("lonely") == []
+    assert index.orphans() == ["lonely"]
+    assert index.orphans(account="On My Mac") == []
+    assert index.dead_links() == [("meeting", NoteLink("DEAD", "Gone", None))]
+    assert LinkIndex(path).backlinks(RECIPES) == ["meeting", "todo"]
+
+
+def test_link_index_rename(tmp_path, notesapp):
+    """Test a resolved link still resolves after its target is renamed"""
+    index = LinkIndex(tmp_path / "link_index.json")
+    index.refresh(notesapp)
+    notesapp.notes["iCloud"][1] = fake_note(RECIPES, "Dinner", "pasta", modified=5.0)
+    index.refresh(notesapp)
+    assert index.links("meeting")[0].target == RECIPES
+    assert index.backlinks(RECIPES) == ["meeting", "todo"]
+
+    del notesapp.notes["iCloud"][1]
+    index.refresh(notesapp)
+    assert index.links("meeting")[0].target is None
+    assert index.backlinks(RECIPES) == []
@@ -0,0 +1,143 @@
+"""Test note name index matching and completion without Notes.app"""
+
+import json
+
+import pytest
+
+import macnotesapp.name_index
+from macnotesapp.name_index import (
+    MATCH_EXACT,
+    MATCH_FUZZY,
+    MATCH_PREFIX,
+    MATCH_SUBSTRING,
+    NameIndex,
+    edit_distance,
+)
+
+NOTES = {
+    "id1": {"account": "iCloud", "modified": 100.0, "name": "Todo"},
+    "id2": {"account": "iCloud", "modified": 300.0, "name": "Todo archive"},
+    "id3": {"account": "On My Mac", "modified": 200.0, "name": "Old todo list"},
+    "id4": {"account": "On My Mac", "modified": 400.0, "name": "todo"},
+    "id5": {"account": "iCloud", "modified": 500.0, "name": "Recipes"},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Return NameIndex saved to and loaded from tmp_path"""
+    path = tmp_path / "name_index.json"
+    index = NameIndex(path)
+    index.notes = NOTES
+    index.folders = {"iCloud": ["Notes", "Archive"], "On My Mac": ["Notes"]}
+    index.updated = 1.0
+    index._rebuild()
+    index.save()
+    return NameIndex(path)
+
+
+@pytest.mark.parametrize(
+    "a,b,distance",
+    [
+        ("recipes", "recipes", 0),
+        ("recipes", "recipe", 1),
+        ("recipes", "recpies", 1),
+        ("recipes", "recipez", 1),
+        ("recipes", "xrecipes", 1),
+        ("kitten", "sitting", 3),
+        ("", "abc", 3),
+    ],
+)
+def test_edit_distance(a, b, distance):
+    """Test edit distance counts insertions, deletions, substitutions and transpositions"""
+    assert edit_distance(a, b, 10) == distance
+    assert edit_distance(b, a, 10) == distance
+
+
+def test_edit_distance_max_distance():
+    """Test edit distance stops at max_distance + 1"""
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("a", "abcdef", 2) == 3
+
+
+def test_name_index_match_kinds(index):
+    """Test exact matches rank before prefix and substring matches, most recent first"""
+    matches = index.match("TODO")
+    assert [(match.id, match.kind) for match in matches] == [
+        ("id4", MATCH_EXACT),
+        ("id1", MATCH_EXACT),
+        ("id2", MATCH_PREFIX),
+        ("id3", MATCH_SUBSTRING),
+    ]
+    assert matches[0].name == "todo"
+    assert matches[0].account == "On My Mac"
+
+
+def test_name_index_match_account(index):
+    """Test matches can be limited to an account"""
+    assert [match.id for match in index.match("todo", account="iCloud")] == [
+        "id1",
+        "id2",
+    ]
+
+
+def test_name_index_match_fuzzy(index):
+    """Test fuzzy matches are only returned if no name contains the name"""
+    matches = index.match("recpies")
+    assert [(match.id, match.kind, match.distance) for match in matches] == [
+        ("id5", MATCH_FUZZY, 1)
+    ]
+    assert not index.match("recpies", max_distance=0)
+    assert not index.match("")
+
+
+def test_name_index_complete(index):
+    """Test completion of note and folder names by case-insensitive prefix"""
+    assert index.complete_name("to") == ["Todo", "todo", "Todo archive"]
+    assert index.complete_name("to", account="On My Mac") == ["todo"]
+    assert index.complete_name("x") == []
+    assert index.complete_folder("") == ["Archive", "Notes"]
+    assert index.complete_folder("n", account="iCloud") == ["Notes"]
+
+
+def test_name_index_load_does_not_sort(index, monkeypatch):
+    """Test the sorted names saved with the index are loaded without rebuilding them"""
+
+    def rebuild(self):
+        raise AssertionError("index was rebuilt on load")
+
+    monkeypatch.setattr(NameIndex, "_rebuild", rebuild)
+    loaded = NameIndex(index.path)
+    assert loaded.complete_name("to") == ["Todo", "todo", "Todo archive"]
+    assert loaded.complete_folder("a") == ["Archive"]
+
+
+def test_name_index_load_without_sorted_names(index):
+    """Test an index saved without sorted names is rebuilt on load"""
+    data = json.loads(index.path.read_text())
+    del data["sorted_names"]
+    index.path.write_text(json.dumps(data))
+    assert NameIndex(index.path).complete_name("re") == ["Recipes"]
+
+
+def test_name_index_fuzzy_candidates(tmp_path, monkeypatch):
+    """Test fuzzy matching only computes edit distance for names that pass the length and character filters"""
+    names = ["Recipes", "Recipe", "Receipts", "Recipes 2024", "Todo", "Reading"]
+    index = NameIndex(tmp_path / "name_index.json")
+    index.notes = {
+        f"id{n}": {"account": "iCloud", "modified": float(n), "name": name}
+        for n, name in enumerate(names)
+    }
+    index._rebuild()
+    compared = []
+
+    def counting_edit_distance(a, b, max_distance):
+        compared.append(b)
+        return edit_distance(a, b, max_distance)
+
+    monkeypatch.setattr(macnotesapp.name_index, "edit_distance", counting_edit_distance)
+    assert [match.name for match in index.match("recpies")] == ["Recipes"]
+    assert sorted(compared) == ["receipts", "recipe", "recipes"]
+    assert [
+        name for name in names if edit_distance("recpies", name.casefold(), 1) <= 1
+    ] == ["Recipes"]
@@ -0,0 +1,94 @@
+"""Test Apple Events sent by Note reads and writes without Notes.app"""
+
+import pytest
+
+import macnotesapp.capabilities
+from macnotesapp.capabilities import Capabilities
+from macnotesapp.notesapp import (
+    WRITE_VERIFY_NEVER,
+    Note,
+    NotesApp,
+    get_write_verify,
+    set_write_verify,
+)
+from macnotesapp.query_cache import invalidate_queries
+
+from .utils import FakeSBApplication, FakeSBNote
+
+
+@pytest.fixture(autouse=True)
+def capabilities(tmp_path, monkeypatch):
+    """Use capabilities saved in tmp_path so the strategies used don't depend on this machine"""
+    capabilities = Capabilities(tmp_path / "capabilities.json", key="test")
+    monkeypatch.setattr(macnotesapp.capabilities, "_capabilities", capabilities)
+    return capabilities
+
+
+@pytest.fixture
+def no_write_verify():
+    policy, sample_rate = get_write_verify()
+    set_write_verify(WRITE_VERIFY_NEVER)
+    yield
+    set_write_verify(policy, sample_rate)
+
+
+@pytest.fixture
+def note():
+    sb_note = FakeSBNote("id1", "Todo", "<div>milk</div>")
+    note = Note(sb_note, "iCloud")
+    assert note.id == "id1"
+    sb_note.calls.clear()
+    return note
+
+
+def test_note_read_is_one_event(note):
+    """Test reading name or body sends one Apple Event each"""
+    assert note.name == "Todo"
+    assert note.body == "<div>milk</div>"
+    assert note._note.calls == ["name", "body"]
+
+
+def test_note_write_unchanged_is_skipped(note, no_write_verify):
+    """Test writing a value the note already has is skipped without writing"""
+    note.body = note.body
+    # date is not known from the read so the value is checked once
+    assert note._note.calls == ["body", "modificationDate", "body"]
+    note._note.calls.clear()
+    note.body = "<div>milk</div>"
+    assert note._note.calls == ["modificationDate"]
+
+
+def test_note_write_changed_elsewhere(note, no_write_verify):
+    """Test a value is written if the note was changed since it was read"""
+    body = note.body
+    note._note.edit("body", "<div>bread</div>")
+    note.body = body
+    assert note._note.calls == [
+        "body",
+        "modificationDate",
+        "body",
+        "setValue_forKey_:body",
+    ]
+    assert note._note.values["body"] == body
+
+
+def test_note_write_new_value(note, no_write_verify):
+    """Test writing a new value doesn't read the modification date"""
+    note.name = "Shopping"
+    note.body = "<div>bread</div>"
+    assert note._note.calls == ["setValue_forKey_:name", "setValue_forKey_:body"]
+    note._note.calls.clear()
+    note.name = "Shopping"
+    note.name = "Shopping"
+    assert note._note.calls == ["modificationDate", "name", "modificationDate"]
+
+
+def test_note_backlinks_use_owning_notesapp(monkeypatch):
+    """Test notes read through a NotesApp look up backlinks with that NotesApp"""
+    notesapp = NotesApp()
+    app = FakeSBApplication({"Backlinks": [("id1", "Todo", "milk")]})
+    monkeypatch.setattr(notesapp, "_app", app)
+    monkeypatch.setattr(notesapp, "backlinks", lambda note: [f"linked to {note.id}"])
+    invalidate_queries()
+    (note,) = notesapp.notes()
+    assert note.backlinks == ["linked to id1"]
@@ -0,0 +1,65 @@
+"""Test Apple Events sent by NotesList without Notes.app"""
+
+import pytest
+
+import macnotesapp.capabilities
+from macnotesapp.capabilities import Capabilities
+from macnotesapp.notesapp import NotesList
+
+from .utils import FakeSBElementArray, FakeSBNote
+
+COLUMNS = [
+    "id",
+    "name",
+    "body",
+    "plaintext",
+    "creationDate",
+    "modificationDate",
+    "passwordProtected",
+    "container",
+]
+
+
+@pytest.fixture(autouse=True)
+def capabilities(tmp_path, monkeypatch):
+    """Use capabilities saved in tmp_path so the strategies used don't depend on this machine"""
+    capabilities = Capabilities(tmp_path / "capabilities.json", key="test")
+    monkeypatch.setattr(macnotesapp.capabilities, "_capabilities", capabilities)
+    return capabilities
+
+
+def fake_noteslist(count: int, calls: list[str]) -> FakeSBElementArray:
+    return FakeSBElementArray(
+        [
+            FakeSBNote(f"id{i}", f"Note {i}", f"<div>{i}</div>", calls=calls)
+            for i in range(count)
+        ],
+        calls,
+    )
+
+
+def test_noteslist_iterdicts_reads_each_column_once():
+    """Test every property of every note is read with one request per SBElementArray"""
+    calls = []
+    noteslist = NotesList(fake_noteslist(250, calls), fake_noteslist(3, calls))
+    dicts = list(noteslist.iterdicts(strip_inline_data=True))
+    assert [d["id"] for d in dicts] == [f"id{i}" for i in range(250)] + [
+        f"id{i}" for i in range(3)
+    ]
+    assert dicts[1]["body"] == "<div>1</div>"
+    assert calls == [
+        f"arrayByApplyingSelector_:{selector}" for selector in COLUMNS for _ in range(2)
+    ]
+
+
+def test_noteslist_iterdicts_no_body():
+    """Test body and plaintext are not read if body is False"""
+    calls = []
+    dicts = list(NotesList(fake_noteslist(5, calls)).iterdicts(body=False))
+    assert len(dicts) == 5
+    assert "body" not in dicts[0]
+    assert calls == [
+        f"arrayByApplyingSelector_:{selector}"
+        for selector in COLUMNS
+        if selector not in ("body", "plaintext")
+    ]
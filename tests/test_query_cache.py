@@ -0,0 +1,109 @@
+"""Test query result cache without Notes.app"""
+
+import itertools
+import time
+
+from macnotesapp.notesapp import NotesApp
+from macnotesapp.query_cache import QueryCache, invalidate_queries, query_key
+
+from .utils import FakeSBApplication
+
+
+def counter():
+    """Return query function that returns 1, 2, 3, ... on successive calls"""
+    count = itertools.count(1)
+    return lambda: next(count)
+
+
+def test_query_key():
+    """Test query_key ignores the order of filters and of values in list filters"""
+    assert query_key("notes", name=["b", "a"], id=None) == query_key(
+        "notes", id=None, name=["a", "b"]
+    )
+    assert query_key("notes", name=["a"]) != query_key("noteslist", name=["a"])
+    assert hash(query_key("notes", name=["a"], password_protected=True))
+
+
+def test_query_cache_hit_and_fresh():
+    """Test cached results are reused until fresh is requested"""
+    cache = QueryCache(ttl=60)
+    query = counter()
+    assert cache.get_or_query("key", ["Test Account"], query) == 1
+    assert cache.get_or_query("key", ["Test Account"], query) == 1
+    assert cache.get_or_query("key", ["Test Account"], query, fresh=True) == 2
+    assert cache.get_or_query("key", ["Test Account"], query) == 2
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_query_cache_invalidate_account():
+    """Test a write to an account only invalidates results that include it"""
+    cache = QueryCache(ttl=60)
+    account_query, other_query, all_query = counter(), counter(), counter()
+    cache.get_or_query("account", ["Test Account"], account_query)
+    cache.get_or_query("other", ["Other Account"], other_query)
+    cache.get_or_query("all", None, all_query)
+
+    invalidate_queries("Test Account")
+    assert cache.get_or_query("account", ["Test Account"], account_query) == 2
+    assert cache.get_or_query("other", ["Other Account"], other_query) == 1
+    assert cache.get_or_query("all", None, all_query) == 2
+
+    invalidate_queries(None)
+    assert cache.get_or_query("other", ["Other Account"], other_query) == 2
+
+
+def test_query_cache_invalidated_during_query():
+    """Test a result is not reused if the account was written to while the query ran"""
+    cache = QueryCache(ttl=60)
+    count = itertools.count(1)
+
+    def query():
+        invalidate_queries("Test Account")
+        return next(count)
+
+    assert cache.get_or_query("key", ["Test Account"], query) == 1
+    assert cache.get_or_query("key", ["Test Account"], query) == 2
+
+
+def test_query_cache_ttl_and_eviction():
+    """Test results expire, least recently used results are evicted and ttl=0 disables caching"""
+    cache = QueryCache(ttl=60, max_entries=2)
+    queries = {key: counter() for key in "abc"}
+    for key in "abc":
+        cache.get_or_query(key, None, queries[key])
+    assert len(cache) == 2
+    assert cache.get_or_query("a", None, queries["a"]) == 2
+    assert cache.get_or_query("c", None, queries["c"]) == 1
+    cache.clear()
+    assert not len(cache)
+
+    expiring = QueryCache(ttl=0.05)
+    query = counter()
+    expiring.get_or_query("key", None, query)
+    time.sleep(0.1)
+    assert expiring.get_or_query("key", None, query) == 2
+
+    uncached = QueryCache(ttl=0)
+    query = counter()
+    uncached.get_or_query("key", None, query)
+    assert uncached.get_or_query("key", None, query) == 2
+    assert not len(uncached)
+
+
+def test_notesapp_notes_cache_hit(monkeypatch):
+    """Test a cached result of NotesApp.notes() is returned without any request to Notes.app"""
+    notesapp = NotesApp()
+    app = FakeSBApplication({"iCloud": [("id1", "Todo", "milk")], "Work": []})
+    monkeypatch.setattr(notesapp, "_app", app)
+
+    notes = notesapp.notes()
+    assert [note.id for note in notes] == ["id1"]
+    app.calls.clear()
+    cached = notesapp.notes()
+    assert len(cached) == 1 and cached[0] is notes[0]
+    assert app.calls == []
+
+    invalidate_queries("iCloud")
+    notesapp.notes()
+    assert "accounts" in app.calls
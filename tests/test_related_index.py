@@ -0,0 +1,107 @@
+"""Test TF-IDF related notes index without Notes.app"""
+
+import pytest
+
+import macnotesapp.related_index
+from macnotesapp.related_index import RelatedIndex, tokenize
+
+from .utils import FakeNotesApp, fake_note
+
+PASTA = "boil spaghetti pasta water salt garlic olive oil parmesan"
+PASTA_SAUCE = "tomato sauce pasta garlic basil olive oil simmer spaghetti"
+TAXES = "income tax return deadline receipts deductions accountant"
+BUDGET = "monthly budget spreadsheet expenses income savings accountant"
+
+
+@pytest.fixture
+def notesapp():
+    return FakeNotesApp(
+        {
+            "iCloud": [
+                fake_note("pasta", "Pasta", PASTA),
+                fake_note("sauce", "Sauce", PASTA_SAUCE),
+                fake_note("taxes", "Taxes", TAXES),
+            ],
+            "On My Mac": [
+                fake_note("budget", "Budget", BUDGET),
+                fake_note("carbonara", "Carbonara", f"{PASTA} eggs pancetta"),
+            ],
+        }
+    )
+
+
+def related_ids(index, note_id, **kwargs):
+    return [other for other, _ in index.related(note_id, **kwargs)]
+
+
+def test_tokenize():
+    """Test numbers, single letters and stop words are not indexed"""
+    assert tokenize("The 2 Quick brown foxes, a fox_trot! Café") == [
+        "quick",
+        "brown",
+        "foxes",
+        "fox",
+        "trot",
+        "café",
+    ]
+    assert tokenize(None) == []
+
+
+def test_related_index(tmp_path, notesapp):
+    """Test related notes are ranked by cosine similarity"""
+    index = RelatedIndex(tmp_path / "related_index.json")
+    assert index.refresh(notesapp) == 5
+
+    related = index.related("pasta")
+    assert [other for other, _ in related][:2] == ["carbonara", "sauce"]
+    assert "pasta" not in dict(related)
+    scores = [score for _, score in related]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < score <= 1 for score in scores)
+    assert dict(related)["sauce"] > dict(related).get("taxes", 0)
+
+    assert related_ids(index, "taxes", k=1) == ["budget"]
+    assert related_ids(index, "pasta", accounts=["iCloud"])[0] == "sauce"
+    assert index.related("missing") == []
+
+
+def test_related_index_incremental(tmp_path, notesapp):
+    """Test modified, added and deleted notes are reflected before and after the index is reloaded"""
+    path = tmp_path / "related_index.json"
+    index = RelatedIndex(path)
+    index.refresh(notesapp)
+
+    notesapp.notes["iCloud"][2] = fake_note(
+        "taxes", "Taxes", f"{PASTA_SAUCE} dinner", modified=2.0
+    )
+    notesapp.notes["iCloud"].append(fake_note("bake", "Bake", "bread flour yeast"))
+    del notesapp.notes["On My Mac"][1]
+    assert index.refresh(notesapp) == 2
+
+    related = related_ids(index, "sauce")
+    assert related[0] == "taxes"
+    assert "carbonara" not in related
+    assert related_ids(index, "bake") == []
+    assert related_ids(RelatedIndex(path), "sauce") == related
+
+
+def test_related_index_merge(tmp_path, notesapp, monkeypatch):
+    """Test merging the delta segment gives the same scores as building the index from scratch"""
+    monkeypatch.setattr(macnotesapp.related_index, "RELATED_MERGE_FRACTION", 0.0)
+    index = RelatedIndex(tmp_path / "related_index.json")
+    index.refresh(notesapp)
+    notesapp.notes["iCloud"][0] = fake_note(
+        "pasta", "Pasta", f"{PASTA} tomato basil", modified=2.0
+    )
+    del notesapp.notes["iCloud"][2]
+    index.refresh(notesapp)
+
+    fresh = RelatedIndex(tmp_path / "fresh_index.json")
+    fresh.refresh(notesapp)
+    for note_id in ["pasta", "sauce", "budget", "carbonara"]:
+        expected = fresh.related(note_id)
+        actual = index.related(note_id)
+        assert [other for other, _ in actual] == [other for other, _ in expected]
+        assert [score for _, score in actual] == pytest.approx(
+            [score for _, score in expected]
+        )
@@ -0,0 +1,82 @@
+"""Test coalescing of concurrent reads without Notes.app"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from macnotesapp.singleflight import SingleFlight
+
+THREADS = 8
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """Test concurrent calls for a key share the result of one call"""
+    singleflight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def read():
+        calls.append(1)
+        started.set()
+        release.wait(10)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        leader = executor.submit(singleflight.do, "key", read)
+        started.wait(10)
+        followers = [
+            executor.submit(singleflight.do, "key", read) for _ in range(THREADS - 1)
+        ]
+        while singleflight.stats.calls < THREADS:
+            time.sleep(0.01)
+        assert singleflight.in_flight == 1
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == ["result"] * THREADS
+    assert len(calls) == 1
+    stats = singleflight.stats
+    assert (stats.calls, stats.executions, stats.coalesced) == (
+        THREADS,
+        1,
+        THREADS - 1,
+    )
+    assert singleflight.in_flight == 0
+
+
+def test_singleflight_sequential_calls_run_again():
+    """Test calls that don't overlap each run and different keys are not coalesced"""
+    singleflight = SingleFlight()
+    assert singleflight.do("key", lambda: 1) == 1
+    assert singleflight.do("key", lambda: 2) == 2
+    assert singleflight.do("other", lambda: 3) == 3
+    assert singleflight.stats.executions == 3
+    singleflight.reset_stats()
+    assert singleflight.stats.calls == 0
+
+
+def test_singleflight_shares_exception():
+    """Test an exception raised by the call in flight is raised by every waiting call"""
+    singleflight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def read():
+        started.set()
+        release.wait(10)
+        raise ValueError("read failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(singleflight.do, "key", read)
+        started.wait(10)
+        follower = executor.submit(singleflight.do, "key", read)
+        while singleflight.stats.calls < 2:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="read failed"):
+                future.result()
+    assert singleflight.in_flight == 0
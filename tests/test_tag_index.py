@@ -0,0 +1,51 @@
+"""Test extraction and indexing of #hashtags and @mentions without Notes.app"""
+
+import pytest
+
+from macnotesapp.tag_index import TagIndex, extract_tags, normalize_tag
+
+
+@pytest.mark.parametrize(
+    "text,tags",
+    [
+        ("Buy milk #Shopping #shopping @Alice", ["#shopping", "@alice"]),
+        ("#work/project-x and #a", ["#a", "#work/project-x"]),
+        ("trailing punctuation #done.", ["#done"]),
+        ("email me@example.com or see example.com/#anchor", []),
+        ("issue #123 and #2024plan", ["#2024plan"]),
+        ("## heading and a#b", []),
+        ("", []),
+        (None, []),
+    ],
+)
+def test_extract_tags(text, tags):
+    """Test tags are extracted case-insensitively without matching emails, URLs or numbers"""
+    assert extract_tags(text) == tags
+
+
+def test_normalize_tag():
+    """Test tags without a marker are treated as #hashtags"""
+    assert normalize_tag(" Work ") == "#work"
+    assert normalize_tag("#Work") == "#work"
+    assert normalize_tag("@Alice") == "@alice"
+
+
+def test_tag_index(tmp_path):
+    """Test counting tags and finding notes with any or all of tags"""
+    path = tmp_path / "tag_index.json"
+    index = TagIndex(path)
+    index.notes = {
+        "id1": {"account": "iCloud", "modified": 1.0, "tags": ["#food", "#work"]},
+        "id2": {"account": "iCloud", "modified": 2.0, "tags": ["#work"]},
+        "id3": {"account": "On My Mac", "modified": 3.0, "tags": ["#work", "@bob"]},
+    }
+    index.save()
+    index = TagIndex(path)
+
+    assert index.tags() == {"#food": 1, "#work": 3, "@bob": 1}
+    assert index.tags(account="iCloud") == {"#food": 1, "#work": 2}
+    assert index.note_ids(["WORK"]) == {"id1", "id2", "id3"}
+    assert index.note_ids(["food", "@bob"]) == {"id1", "id3"}
+    assert index.note_ids(["food", "work"], match_all=True) == {"id1"}
+    assert index.note_ids(["missing"]) == set()
+    assert index.note_ids([]) == set()
@@ -0,0 +1,22 @@
+"""Test utility functions without Notes.app"""
+
+import os
+import stat
+
+from macnotesapp.utils import write_file_atomic
+
+
+def test_write_file_atomic_mode(tmp_path):
+    """Test new files get the default mode for the umask and replaced files keep their mode"""
+    umask = os.umask(0)
+    os.umask(umask)
+    path = tmp_path / "folder" / "note.md"
+    write_file_atomic(path, "text")
+    assert path.read_text() == "text"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    path.chmod(0o640)
+    write_file_atomic(path, b"bytes")
+    assert path.read_bytes() == b"bytes"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert [p.name for p in path.parent.iterdir()] == ["note.md"]
@@ -0,0 +1,74 @@
+"""Test write-behind queue without Notes.app"""
+
+import time
+
+import pytest
+
+from macnotesapp.writequeue import WriteBehindQueue
+
+
+class FakeNote:
+    def __init__(self, id, error=None):
+        self.id = id
+        self.error = error
+        self.updates = []
+
+    def update(self, body=None, name=None):
+        if self.error:
+            raise self.error
+        self.updates.append((body, name))
+
+
+def test_write_behind_coalesces_updates():
+    """Test updates to the same note within the window are written once with the latest values"""
+    note = FakeNote("note1")
+    other = FakeNote("note2")
+    with WriteBehindQueue(window=60) as queue:
+        queue.update(note, body="one", name="first")
+        queue.update(note, body="two")
+        queue.update(note, body="three")
+        queue.update(other, name="other")
+        assert queue.pending == 2
+        assert not note.updates
+        assert queue.flush(timeout=10)
+    assert note.updates == [("three", "first")]
+    assert other.updates == [(None, "other")]
+    assert queue.updates == 4
+    assert queue.writes == 2
+
+
+def test_write_behind_writes_after_window():
+    """Test updates are written without flush once the window has passed"""
+    note = FakeNote("note1")
+    with WriteBehindQueue(window=0) as queue:
+        queue.update(note, body="body")
+        for _ in range(100):
+            if note.updates:
+                break
+            time.sleep(0.05)
+        assert note.updates == [("body", None)]
+
+
+def test_write_behind_errors():
+    """Test failed writes are passed to on_error and counted"""
+    errors = []
+    note = FakeNote("note1", error=ValueError("failed"))
+    with WriteBehindQueue(
+        window=60, on_error=lambda note, e: errors.append((note.id, str(e)))
+    ) as queue:
+        queue.update(note, body="body")
+        queue.flush(timeout=10)
+    assert errors == [("note1", "failed")]
+    assert queue.errors == 1
+
+
+def test_write_behind_closed():
+    """Test updates can't be queued after close and empty updates are ignored"""
+    queue = WriteBehindQueue(window=60)
+    queue.update(FakeNote("note1"))
+    assert queue.pending == 0
+    queue.close()
+    with pytest.raises(RuntimeError):
+        queue.update(FakeNote("note1"), body="body")
+    with pytest.raises(ValueError):
+        WriteBehindQueue(window=-1)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import datetime
 import platform
+import types
 
 
 def get_macos_version() -> tuple[int, int, int]:
@@ -21,3 +23,193 @@ def get_macos_version() -> tuple[int, int, int]:
             )
         )
     return (int(ver), int(major), int(minor))
+
+
+def fake_note(
+    note_id: str,
+    name: str,
+    text: str,
+    modified: float = 1.0,
+    body: str | None = None,
+    folder: str = "Notes",
+) -> dict:
+    """Return dict of the properties of a note read by FakeNotesApp"""
+    return {
+        "id": note_id,
+        "name": name,
+        "folder": folder,
+        "plaintext": f"{name}\n{text}",
+        "body": body if body is not None else f"<div>{name}</div><div>{text}</div>",
+        "modification_date": datetime.datetime.fromtimestamp(modified),
+    }
+
+
+class FakeNotesList:
+    """Stand-in for NotesList that returns a column of note properties for each attribute"""
+
+    def __init__(self, notes: list[dict]):
+        self._notes = notes
+
+    def __getattr__(self, name: str) -> list:
+        return [note[name] for note in self._notes]
+
+
+class FakeNotesApp:
+    """Stand-in for NotesApp with the methods used to refresh a LocalIndex so indexes can be tested without Notes.app
+
+    Attributes:
+        notes: dict of account name to list of notes created with fake_note()
+    """
+
+    def __init__(self, notes: dict[str, list[dict]]):
+        self.notes = notes
+
+    @property
+    def accounts(self) -> list[str]:
+        return list(self.notes)
+
+    def account(self, name: str) -> types.SimpleNamespace:
+        return types.SimpleNamespace(name=name, folders=["Notes"])
+
+    def noteslist(
+        self,
+        id: list[str] | None = None,
+        accounts: list[str] | None = None,
+    ) -> FakeNotesList:
+        return FakeNotesList(
+            [
+                note
+                for account in accounts or self.accounts
+                for note in self.notes[account]
+                if id is None or note["id"] in id
+            ]
+        )
+
+
+class FakeSBDate:
+    """Stand-in for the NSDate returned by ScriptingBridge"""
+
+    def __init__(self, timestamp: float):
+        self.timestamp = timestamp
+
+    def timeIntervalSince1970(self) -> float:
+        return self.timestamp
+
+
+class FakeSBNote:
+    """Stand-in for a ScriptingBridge note object that records each Apple Event sent to it
+
+    Attributes:
+        calls: list of names of the methods called, shared with the FakeSBElementArray
+            the note is in, if any
+    """
+
+    def __init__(
+        self,
+        note_id: str,
+        name: str,
+        body: str,
+        modified: float = 1.0,
+        calls: list[str] | None = None,
+    ):
+        self.values = {"id": note_id, "name": name, "body": body}
+        self.modified = modified
+        self.calls = calls if calls is not None else []
+
+    def id(self) -> str:
+        self.calls.append("id")
+        return self.values["id"]
+
+    def name(self) -> str:
+        self.calls.append("name")
+        return self.values["name"]
+
+    def body(self) -> str:
+        self.calls.append("body")
+        return self.values["body"]
+
+    def modificationDate(self) -> FakeSBDate:
+        self.calls.append("modificationDate")
+        return FakeSBDate(self.modified)
+
+    def setValue_forKey_(self, value: str, key: str):
+        self.calls.append(f"setValue_forKey_:{key}")
+        self.edit(key, value)
+
+    def edit(self, key: str, value: str):
+        """Change the note as if edited in Notes.app; not recorded in calls"""
+        self.values[key] = value
+        self.modified += 1
+
+
+class FakeSBElementArray(list):
+    """Stand-in for a ScriptingBridge SBElementArray of FakeSBNote that records bulk reads"""
+
+    def __init__(self, notes: list[FakeSBNote], calls: list[str]):
+        super().__init__(notes)
+        self.calls = calls
+
+    def arrayByApplyingSelector_(self, selector: str) -> list:
+        self.calls.append(f"arrayByApplyingSelector_:{selector}")
+        return [self._value(note, selector) for note in self]
+
+    @staticmethod
+    def _value(note: FakeSBNote, selector: str):
+        if selector in ("creationDate", "modificationDate"):
+            return FakeSBDate(note.modified)
+        if selector == "plaintext":
+            return note.values["body"]
+        if selector == "passwordProtected":
+            return False
+        if selector == "container":
+            return types.SimpleNamespace(name=lambda: "Notes")
+        return note.values[selector]
+
+    def get(self) -> list[FakeSBNote]:
+        self.calls.append("get")
+        return list(self)
+
+
+class FakeSBAccount:
+    """Stand-in for a ScriptingBridge account object that records each Apple Event sent to it"""
+
+    def __init__(self, name: str, notes: list[FakeSBNote], calls: list[str]):
+        self._name = name
+        self._notes = notes
+        self.calls = calls
+
+    def name(self) -> str:
+        self.calls.append("account.name")
+        return self._name
+
+    def notes(self) -> FakeSBElementArray:
+        self.calls.append("account.notes")
+        return FakeSBElementArray(self._notes, self.calls)
+
+
+class FakeSBApplication:
+    """Stand-in for the ScriptingBridge Notes.app application object
+
+    Attributes:
+        calls: list of names of the methods called on the application, its accounts and notes
+    """
+
+    def __init__(self, notes: dict[str, list[tuple[str, str, str]]]):
+        """Create FakeSBApplication
+
+        Args:
+            notes: dict of account name to list of (id, name, body) of the notes in the account
+        """
+        self.calls: list[str] = []
+        self._accounts = [
+            FakeSBAccount(
+                account,
+                [FakeSBNote(*note, calls=self.calls) for note in account_notes],
+                self.calls,
+            )
+            for account, account_notes in notes.items()
+        ]
+
+    def accounts(self) -> list[FakeSBAccount]:
+        self.calls.append("accounts")
+        return list(self._accounts)